@@ -0,0 +1,315 @@
+"""
+Load-aware admission control for the token server.
+
+Reads worker heartbeats from the local registry (see worker_registry.py) and
+decides whether a new interview session is admitted, queued with an ETA, or
+rejected. Also provides a per-client token bucket rate limiter.
+
+Run `python admission.py` to simulate an arrival surge against a fixed pool of
+workers and compare agent join latency with and without admission control.
+"""
+
+import math
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import worker_registry
+
+# Workers above these limits are considered saturated and take no new rooms
+MAX_LOOP_LAG_MS = float(os.environ.get("ADMISSION_MAX_LOOP_LAG_MS", "150"))
+MAX_CPU_PERCENT = float(os.environ.get("ADMISSION_MAX_CPU_PERCENT", "85"))
+# How long an admitted session holds a slot before its agent shows up in the registry
+RESERVATION_TTL = float(os.environ.get("ADMISSION_RESERVATION_TTL", "30"))
+MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE", "50"))
+# Queued tickets that are not polled again within this window are dropped
+QUEUE_ABANDON_SECONDS = float(os.environ.get("ADMISSION_QUEUE_ABANDON", "30"))
+AVG_SESSION_SECONDS = float(os.environ.get("ADMISSION_AVG_SESSION_SECONDS", "900"))
+
+RATE_LIMIT_PER_MINUTE = float(os.environ.get("RATE_LIMIT_PER_MINUTE", "20"))
+RATE_LIMIT_BURST = float(os.environ.get("RATE_LIMIT_BURST", "5"))
+
+ADMITTED = "admitted"
+QUEUED = "queued"
+REJECTED = "rejected"
+
+
+class RateLimiter:
+    """Token bucket per client key."""
+
+    def __init__(self, rate_per_minute=RATE_LIMIT_PER_MINUTE, burst=RATE_LIMIT_BURST,
+                 clock=time.monotonic, max_clients=10000):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.clock = clock
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, client_id):
+        """Consume one token for the client. Returns (allowed, retry_after_seconds)."""
+        now = self.clock()
+        with self._lock:
+            tokens, last = self._buckets.pop(client_id, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                self._buckets[client_id] = (tokens - 1, now)
+                allowed, retry_after = True, 0.0
+            else:
+                self._buckets[client_id] = (tokens, now)
+                allowed, retry_after = False, (1 - tokens) / self.rate if self.rate else 60.0
+            # Forget the least recently seen clients so memory stays bounded
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+
+class AdmissionDecision:
+    def __init__(self, status, ticket=None, position=None, eta=None, retry_after=None, reason=""):
+        self.status = status
+        self.ticket = ticket
+        self.position = position
+        self.eta = eta
+        self.retry_after = retry_after
+        self.reason = reason
+
+    def to_dict(self):
+        result = {"status": self.status}
+        if self.ticket is not None:
+            result["ticket"] = self.ticket
+        if self.position is not None:
+            result["position"] = self.position
+        if self.eta is not None:
+            result["eta"] = round(self.eta, 1)
+        if self.retry_after is not None:
+            result["retryAfter"] = round(self.retry_after, 1)
+        if self.reason:
+            result["reason"] = self.reason
+        return result
+
+
+class AdmissionController:
+    """Admits sessions only while registered workers have free, healthy slots."""
+
+    def __init__(self, read_workers=worker_registry.read_workers, clock=time.time,
+                 max_queue=MAX_QUEUE, reservation_ttl=RESERVATION_TTL,
+                 avg_session_seconds=AVG_SESSION_SECONDS,
+                 max_loop_lag_ms=MAX_LOOP_LAG_MS, max_cpu_percent=MAX_CPU_PERCENT,
+                 queue_abandon_seconds=QUEUE_ABANDON_SECONDS):
+        self.read_workers = read_workers
+        self.clock = clock
+        self.max_queue = max_queue
+        self.reservation_ttl = reservation_ttl
+        self.avg_session_seconds = avg_session_seconds
+        self.max_loop_lag_ms = max_loop_lag_ms
+        self.max_cpu_percent = max_cpu_percent
+        self.queue_abandon_seconds = queue_abandon_seconds
+        # room_name -> admitted_at, for rooms whose agent has not reported yet
+        self._reservations = {}
+        # ticket -> last_polled_at, in FIFO order
+        self._queue = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _worker_free_slots(self, worker):
+        if worker.get("loop_lag_ms", 0) > self.max_loop_lag_ms:
+            return 0
+        if worker.get("cpu_percent", 0) > self.max_cpu_percent:
+            return 0
+        return max(0, worker.get("max_rooms", 0) - worker.get("active_rooms", 0))
+
+    def capacity(self):
+        """Return (free_slots, total_slots) after pending reservations."""
+        now = self.clock()
+        workers = self.read_workers()
+        reported_rooms = set()
+        for worker in workers:
+            reported_rooms.update(worker.get("rooms", []))
+
+        # A reservation is released once its agent reports the room, or on timeout
+        for room_name, admitted_at in list(self._reservations.items()):
+            if room_name in reported_rooms or now - admitted_at > self.reservation_ttl:
+                del self._reservations[room_name]
+
+        free = sum(self._worker_free_slots(w) for w in workers) - len(self._reservations)
+        total = sum(w.get("max_rooms", 0) for w in workers)
+        return max(0, free), total
+
+    def _expire_queue(self, now):
+        for ticket, last_polled in list(self._queue.items()):
+            if now - last_polled > self.queue_abandon_seconds:
+                del self._queue[ticket]
+
+    def _estimate_wait(self, position, total_slots):
+        # With N busy slots finishing uniformly, one frees every avg/N seconds
+        per_slot = self.avg_session_seconds / max(total_slots, 1)
+        return (position + 1) * per_slot
+
+    def decide(self, room_name, ticket=None):
+        """Admit, queue or reject a session that would use `room_name`."""
+        with self._lock:
+            now = self.clock()
+            self._expire_queue(now)
+            free, total = self.capacity()
+
+            if ticket is not None and ticket not in self._queue:
+                # Unknown or expired ticket: treat as a fresh arrival
+                ticket = None
+
+            if ticket is None:
+                if not self._queue and free > 0:
+                    self._reservations[room_name] = now
+                    return AdmissionDecision(ADMITTED)
+                if len(self._queue) >= self.max_queue:
+                    retry = self._estimate_wait(len(self._queue), total)
+                    return AdmissionDecision(
+                        REJECTED,
+                        retry_after=min(retry, 60.0),
+                        reason="All interviewers are busy and the waiting queue is full",
+                    )
+                ticket = uuid.uuid4().hex[:12]
+
+            self._queue[ticket] = now
+            position = list(self._queue).index(ticket)
+
+            # Serve the queue in order: only the first `free` tickets may enter
+            if position < free:
+                del self._queue[ticket]
+                self._reservations[room_name] = now
+                return AdmissionDecision(ADMITTED)
+
+            eta = self._estimate_wait(position, total)
+            return AdmissionDecision(
+                QUEUED,
+                ticket=ticket,
+                position=position + 1,
+                eta=eta,
+                retry_after=min(max(2.0, eta / 4), 15.0),
+            )
+
+    def is_queued(self, ticket):
+        """Whether `ticket` currently holds a place in the queue."""
+        with self._lock:
+            self._expire_queue(self.clock())
+            return ticket in self._queue
+
+    def next_in_line(self, ticket=None):
+        """Whether nobody is queued ahead of this caller (`ticket` is None for a new arrival)."""
+        with self._lock:
+            self._expire_queue(self.clock())
+            return not self._queue or next(iter(self._queue)) == ticket
+
+    def leave_queue(self, ticket):
+        """Drop a ticket whose holder was served some other way (e.g. a warm room)."""
+        with self._lock:
+            self._queue.pop(ticket, None)
+
+    def reserve(self, room_name):
+        """Claim a free slot for a room created ahead of demand (e.g. the warm pool).
+
+        Never takes a slot a queued candidate is waiting for.
+        """
+        with self._lock:
+            free, _ = self.capacity()
+            if self._queue or free <= 0:
+                return False
+            self._reservations[room_name] = self.clock()
+            return True
+
+    def stats(self):
+        with self._lock:
+            free, total = self.capacity()
+            return {
+                "free_slots": free,
+                "total_slots": total,
+                "reserved": len(self._reservations),
+                "queued": len(self._queue),
+            }
+
+
+def simulate(num_workers=4, arrivals_per_second=2.0, surge_seconds=60,
+             session_seconds=120, use_admission=True, seed=7):
+    """Discrete-time surge simulation.
+
+    Each worker hosts one room at a time. Without admission control every
+    arrival gets a room immediately and waits for a worker; with it, arrivals
+    queue at the token server and only enter once a slot is free. Returns the
+    agent-join latencies (admission -> agent in room) of all sessions.
+    """
+    import random
+
+    rng = random.Random(seed)
+    clock = [0.0]
+    workers = [
+        {"worker_id": f"w{i}", "max_rooms": 1, "active_rooms": 0, "rooms": [],
+         "busy_until": 0.0, "loop_lag_ms": 0, "cpu_percent": 0}
+        for i in range(num_workers)
+    ]
+    controller = AdmissionController(
+        read_workers=lambda: workers,
+        clock=lambda: clock[0],
+        avg_session_seconds=session_seconds,
+        queue_abandon_seconds=float("inf"),
+        max_queue=10**6,
+    )
+    waiting_rooms = []  # (room_name, admitted_at) waiting for an agent
+    polling = []  # (ticket, room_name) queued at the token server
+    latencies = []
+    step = 0.5
+    horizon = surge_seconds + session_seconds * 40
+    next_id = 0
+
+    while clock[0] < horizon:
+        now = clock[0]
+        # Finish sessions
+        for w in workers:
+            if w["rooms"] and w["busy_until"] <= now:
+                w["rooms"], w["active_rooms"] = [], 0
+        # Dispatch agents to rooms in join order
+        for w in workers:
+            if not w["rooms"] and waiting_rooms:
+                room_name, admitted_at = waiting_rooms.pop(0)
+                w["rooms"], w["active_rooms"] = [room_name], 1
+                w["busy_until"] = now + session_seconds * rng.uniform(0.5, 1.5)
+                latencies.append(now - admitted_at)
+        # New arrivals during the surge
+        arrivals = []
+        if now < surge_seconds:
+            count = int(arrivals_per_second * step) + (rng.random() < (arrivals_per_second * step) % 1)
+            for _ in range(count):
+                arrivals.append((None, f"sim-interview-{next_id}"))
+                next_id += 1
+        still_polling = []
+        for ticket, room_name in polling + arrivals:
+            if not use_admission:
+                waiting_rooms.append((room_name, now))
+                continue
+            decision = controller.decide(room_name, ticket=ticket)
+            if decision.status == ADMITTED:
+                waiting_rooms.append((room_name, now))
+            elif decision.status == QUEUED:
+                still_polling.append((decision.ticket, room_name))
+        polling = still_polling
+        if not polling and not waiting_rooms and now >= surge_seconds:
+            break
+        clock[0] += step
+    return latencies
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+if __name__ == "__main__":
+    for label, enabled in (("without admission", False), ("with admission", True)):
+        latencies = simulate(use_admission=enabled)
+        print(
+            f"[SIMULATION] {label:18s} sessions={len(latencies):4d} "
+            f"join p50={_percentile(latencies, 50):7.1f}s "
+            f"p99={_percentile(latencies, 99):7.1f}s max={max(latencies):7.1f}s"
+        )
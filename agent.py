@@ -6,8 +6,20 @@ from livekit.plugins import (
     google,
     noise_cancellation,
 )
-from prompts import INTERVIEW_PROMPTS
+from prompts import INTERVIEW_PROMPTS, ROLE_CONTEXTS
+from prompt_registry import registry as prompt_registry
 from livekit.plugins import tavus, bey
+from worker_registry import load_reporter
+from github_service import get_github_service, GithubError
+from history_store import history_writer
+import scoring
+from transcript_store import save_session
+from question_planner import QuestionPlanner
+from incremental_evaluator import IncrementalEvaluator
+from question_bank import apply_efficiency_baseline, reference_complexity
+from log_sink import log
+from scoring_cascade import get_scorer
+from context_manager import ContextManager, realtime_window_compression
 import os
 import json
 import asyncio
@@ -16,16 +28,37 @@ load_dotenv(".env")
 
 class Assistant(Agent):
     def __init__(self, interview_type="default") -> None:
-        instructions = INTERVIEW_PROMPTS.get(interview_type, INTERVIEW_PROMPTS["default"])
-        super().__init__(instructions=instructions)
+        # Same registered text every session, so the static prefix stays byte-identical
+        template = prompt_registry.get(f"interview.{interview_type}")
+        print(f"[AGENT] Instructions interview.{interview_type} v{template.version} (~{template.prefix_tokens} tokens)")
+        super().__init__(instructions=template.prefix)
+
+def prewarm(proc: agents.JobProcess):
+    # Report this process's load from startup so idle workers count as capacity
+    load_reporter.start()
 
 server = AgentServer()
+server.setup_fnc = prewarm
 
 @server.rtc_session()
 async def my_agent(ctx: agents.JobContext):
+    load_reporter.start()
+    load_reporter.room_started(ctx.room.name)
+    lag_probe = asyncio.create_task(load_reporter.monitor_loop_lag())
+
+    async def release_load_slot():
+        lag_probe.cancel()
+        load_reporter.room_ended(ctx.room.name)
+        await asyncio.to_thread(history_writer.flush)
+
+    ctx.add_shutdown_callback(release_load_slot)
+
     gemini_model = google.realtime.RealtimeModel(
         voice="Puck",
-        model="gemini-2.5-flash-native-audio-preview-09-2025"
+        model="gemini-2.5-flash-native-audio-preview-09-2025",
+        # Bounds the server-side history at CONTEXT_TOKEN_BUDGET; ContextManager
+        # folds older turns into notes before the window drops them
+        context_window_compression=realtime_window_compression(),
     )
 
     session = AgentSession(
@@ -39,26 +72,42 @@ async def my_agent(ctx: agents.JobContext):
     # Store document content for scoring
     resume_content = ""
     github_content = ""
+    code_submissions = []
+    
+    # Scores each answer as it lands so the final report is a cheap combine
+    # Obvious cases are scored locally; only uncertain ones reach the model
+    scorer = get_scorer()
+    evaluator = IncrementalEvaluator(scoring.get_scoring_model(), scorer=scorer)
     
+    @session.on("metrics_collected")
+    def on_metrics_collected(event: agents.MetricsCollectedEvent):
+        context.record_metrics(event.metrics)
+
     @session.on("conversation_item_added")
     def on_item_added(event: agents.ConversationItemAddedEvent):
         nonlocal conversation_history, current_phase
         item = event.item
         if item.type == "message":
             if item.role == "assistant" and item.text_content:
-                print(f"Agent: {item.text_content}")
+                log("TRANSCRIPT", item.text_content, room=ctx.room.name, role="agent")
+                context.turn_added(item.text_content)
                 conversation_history.append({
                     "role": "agent",
                     "content": item.text_content,
                     "phase": current_phase
                 })
             elif item.role == "user" and item.text_content:
-                print(f"User: {item.text_content}")
+                log("TRANSCRIPT", item.text_content, room=ctx.room.name, role="user")
+                context.turn_added(item.text_content)
+                last_question = next(
+                    (msg["content"] for msg in reversed(conversation_history) if msg["role"] == "agent"), ""
+                )
                 conversation_history.append({
                     "role": "user", 
                     "content": item.text_content,
                     "phase": current_phase
                 })
+                evaluator.add_answer(current_phase, last_question, item.text_content)
 
     
     room_name = ctx.room.name
@@ -80,9 +129,70 @@ async def my_agent(ctx: agents.JobContext):
     
     print(f"[AGENT] Final interview type: {interview_type}")
     
+    # Start preparing round questions now so phase transitions don't stall
+    # Uncached: planned questions must not be shared between candidates
+    planner = QuestionPlanner(scoring.get_planning_model(), ROLE_CONTEXTS[interview_type])
+    planner.prime()
+    
+    def current_candidate():
+        # Stable candidate id from token metadata when provided, else the session identity
+        for p in ctx.room.remote_participants.values():
+            if p.identity.startswith("user-"):
+                try:
+                    return json.loads(p.metadata or "{}").get("candidate") or p.identity
+                except ValueError:
+                    return p.identity
+        return room_name
+    
+    def record_result(phase, score, details=None):
+        # Persist alongside the data-channel publish so results outlive the session
+        history_writer.record(room_name, current_candidate(), interview_type, phase, score, details)
+    
+    async def archive_session():
+        # Keep the transcript and documents so the interview can be re-scored offline
+        if not conversation_history and not resume_content and not github_content:
+            return
+        record = {
+            "session_id": room_name,
+            "candidate": current_candidate(),
+            "interview_type": interview_type,
+            "resume": resume_content,
+            "github": github_content,
+            "conversation": conversation_history,
+            "code_submissions": code_submissions,
+        }
+        try:
+            await asyncio.to_thread(save_session, record)
+        except Exception as e:
+            print(f"[AGENT] Failed to archive session: {e}")
+    
+    ctx.add_shutdown_callback(archive_session)
+    
+    async def stop_planner():
+        planner.close()
+        evaluator.close()
+        if scorer is not scoring:
+            log("CASCADE", "Scoring tiers", tiers=scorer.report())
+        log("CONTEXT", "Turn latency by compaction", room=ctx.room.name, **context.latency_report())
+    
+    ctx.add_shutdown_callback(stop_planner)
+    
 
     assistant = Assistant(interview_type=interview_type)
 
+    # Carries older turns and documents forward as notes as the context fills up
+    context = ContextManager(
+        assistant,
+        core_tokens=prompt_registry.get(f"interview.{interview_type}").prefix_tokens,
+        summarizer=scoring.get_summary_model(),
+    )
+
+    def reply_with(kind, instructions, carry=False):
+        # Documents are carried into the context notes; other blocks are dropped once acted on
+        handle = session.generate_reply(instructions=context.instruction(kind, instructions, carry=carry))
+        context.track(kind, handle)
+        return handle
+
    
     avatar = tavus.AvatarSession(
         replica_id=os.environ.get("REPLICA_ID"),
@@ -145,17 +255,19 @@ async def my_agent(ctx: agents.JobContext):
             data_type = payload.get("type", "")
             content = payload.get("content", "")
             
-            print(f"[AGENT] Received data: type={data_type}, length={len(content)}")
+            log("AGENT", f"Received data: type={data_type}, length={len(content)}")
             
             if data_type == "RESUME_DATA":
-                print(f"[AGENT] Processing resume data...")
+                log("AGENT", "Processing resume data...")
                 
                 # Store resume content for scoring later
                 nonlocal resume_content
                 resume_content = content
+                planner.update_document("resume", content)
+                evaluator.set_document("resume", content)
                 
                 # Inject resume context into the session
-                session.generate_reply(
+                reply_with("resume", carry=True,
                     instructions=f"""The candidate has shared their resume. Here is the content:
 
 --- RESUME START ---
@@ -166,22 +278,47 @@ Acknowledge that you received their resume and ask a specific question about som
                 )
                 
             elif data_type == "GITHUB_DATA":
-                print(f"[AGENT] Processing GitHub data...")
-                
-                # Store github content for scoring later
-                nonlocal github_content
-                github_content = content
+                log("AGENT", "Processing GitHub data...")
                 
-                # Inject GitHub context into the session
-                session.generate_reply(
-                    instructions=f"""The candidate has shared their GitHub profile. Here is the summary:
+                def inject_github_context(summary):
+                    # Store github content for scoring later
+                    nonlocal github_content
+                    github_content = summary
+                    planner.update_document("github", summary)
+                    evaluator.set_document("github", summary)
+                    
+                    # Inject GitHub context into the session
+                    reply_with("github", carry=True,
+                        instructions=f"""The candidate has shared their GitHub profile. Here is the summary:
 
 --- GITHUB PROFILE ---
-{content}
+{summary}
 --- GITHUB END ---
 
 Acknowledge that you reviewed their GitHub and ask about a specific repository or project mentioned. Be specific - reference actual repos or technologies from the data."""
-                )
+                    )
+                
+                username = payload.get("username", "")
+                if username:
+                    # Enrich the profile server-side (shared cache + conditional requests)
+                    async def fetch_github_profile():
+                        try:
+                            summary = await get_github_service().fetch_summary(username)
+                            result = {"type": "GITHUB_DATA_RESULT", "ok": True}
+                            inject_github_context(summary)
+                            log("AGENT", f"GitHub profile fetched for {username}")
+                        except Exception as e:
+                            log("AGENT", f"GitHub fetch failed for {username}: {e}", level="error")
+                            message = str(e) if isinstance(e, GithubError) else "Failed to fetch data"
+                            result = {"type": "GITHUB_DATA_RESULT", "ok": False, "error": message}
+                        await ctx.room.local_participant.publish_data(
+                            json.dumps(result).encode(),
+                            reliable=True
+                        )
+                    
+                    asyncio.create_task(fetch_github_profile())
+                else:
+                    inject_github_context(content)
             
             elif data_type == "CODE_ANALYSIS":
                 # Use Gemini to analyze the submitted code
@@ -189,60 +326,25 @@ Acknowledge that you reviewed their GitHub and ask about a specific repository o
                 question = payload.get("question", {})
                 question_title = question.get("title", "Coding Problem")
                 question_desc = question.get("description", "")
+                question_id = question.get("id")
+                code_submissions.append({"id": question_id, "title": question_title, "description": question_desc, "code": code})
                 
-                print(f"[AGENT] Analyzing code with AI for: {question_title}")
+                log("AGENT", f"Analyzing code with AI for: {question_title}")
                 
                 # Define async helper for code analysis
                 async def perform_code_analysis():
-                    analysis_prompt = f"""You are a code reviewer. Analyze this code submission and return a JSON response.
-
-QUESTION: {question_title}
-DESCRIPTION: {question_desc}
-
-SUBMITTED CODE:
-```
-{code}
-```
-
-Analyze the code and return ONLY a valid JSON object (no markdown, no explanation) with this structure:
-{{
-    "overallScore": <0-100>,
-    "verdict": "<Excellent/Good/Needs Work/Incomplete/Failed>",
-    "summary": "<2 sentence summary of the submission>",
-    "logic": {{"score": <0-100>, "feedback": "<1 sentence>"}},
-    "edgeCases": {{"score": <0-100>, "feedback": "<1 sentence>"}},
-    "efficiency": {{"score": <0-100>, "feedback": "<1 sentence>"}},
-    "readability": {{"score": <0-100>, "feedback": "<1 sentence>"}},
-    "suggestions": ["<suggestion 1>", "<suggestion 2>"]
-}}
-
-SCORING RULES:
-- Empty/unchanged code = 0 score
-- No return statement = max 20 score  
-- Code that doesn't solve the problem = max 30 score
-- Partial solution = 30-60 score
-- Working solution with issues = 60-80 score
-- Good solution = 80-100 score
-
-Return ONLY the JSON, nothing else."""
-
                     try:
-                        import google.generativeai as genai
-                        genai.configure(api_key=os.environ.get("GOOGLE_API_KEY"))
-                        model = genai.GenerativeModel('gemini-2.5-flash')
-                        response = model.generate_content(analysis_prompt)
-                        
-                        # Parse the JSON response
-                        response_text = response.text.strip()
-                        # Remove markdown code blocks if present
-                        if response_text.startswith("```"):
-                            response_text = response_text.split("```")[1]
-                            if response_text.startswith("json"):
-                                response_text = response_text[4:]
-                        response_text = response_text.strip()
-                        
-                        analysis_result = json.loads(response_text)
-                        print(f"[AGENT] AI Analysis complete. Score: {analysis_result.get('overallScore', 0)}")
+                        analysis_result = await scoring.analyze_code(
+                            scoring.get_scoring_model(), question_title, question_desc, code,
+                            reference_complexity(question_id)
+                        )
+                        # Bank questions have reference baselines; score efficiency against them
+                        analysis_result = apply_efficiency_baseline(analysis_result, question_id, code)
+                        log("AGENT", f"AI Analysis complete. Score: {analysis_result.get('overallScore', 0)}")
+                        record_result("coding", analysis_result.get("overallScore", 0), {
+                            "question": question_title,
+                            "result": analysis_result
+                        })
                         
                         # Send result back to frontend
                         await ctx.room.local_participant.publish_data(
@@ -253,21 +355,12 @@ Return ONLY the JSON, nothing else."""
                             reliable=True
                         )
                     except Exception as e:
-                        print(f"[AGENT] Code analysis error: {e}")
+                        log("AGENT", f"Code analysis error: {e}", level="error")
                         # Send fallback result
                         await ctx.room.local_participant.publish_data(
                             json.dumps({
                                 "type": "CODE_ANALYSIS_RESULT",
-                                "result": {
-                                    "overallScore": 0,
-                                    "verdict": "Analysis Error",
-                                    "summary": "Unable to analyze code. Please try again.",
-                                    "logic": {"score": 0, "feedback": "Error during analysis"},
-                                    "edgeCases": {"score": 0, "feedback": "Error during analysis"},
-                                    "efficiency": {"score": 0, "feedback": "Error during analysis"},
-                                    "readability": {"score": 0, "feedback": "Error during analysis"},
-                                    "suggestions": ["Check your code and try again"]
-                                }
+                                "result": scoring.CODE_ANALYSIS_ERROR_RESULT
                             }).encode(),
                             reliable=True
                         )
@@ -276,7 +369,7 @@ Return ONLY the JSON, nothing else."""
                 asyncio.create_task(perform_code_analysis())
             
             elif data_type == "CODE_FEEDBACK":
-                print(f"[AGENT] Speaking code feedback to candidate...")
+                log("AGENT", "Speaking code feedback to candidate...")
                 feedback_data = payload.get("feedback", {})
                 score = feedback_data.get("score", 0)
                 verdict = feedback_data.get("verdict", "Unknown")
@@ -288,7 +381,7 @@ Return ONLY the JSON, nothing else."""
                 if suggestions:
                     suggestions_text = "Here are my suggestions for improvement: " + ". ".join(suggestions[:3])
                 
-                session.generate_reply(
+                reply_with("feedback",
                     instructions=f"""You just reviewed the candidate's code submission. Speak naturally as if you're giving verbal feedback.
 
 CODE EVALUATION RESULTS:
@@ -314,7 +407,7 @@ INSTRUCTIONS FOR YOUR RESPONSE:
                 questions_required = payload.get("questionsRequired", 0)
                 previous_phase = current_phase
                 
-                print(f"[AGENT] Phase changing from {previous_phase} to {new_phase}")
+                log("AGENT", f"Phase changing from {previous_phase} to {new_phase}")
                 
                 # Score the previous phase based on conversation
                 async def score_previous_phase():
@@ -323,53 +416,21 @@ INSTRUCTIONS FOR YOUR RESPONSE:
                         phase_conversation = [msg for msg in conversation_history if msg["phase"] == previous_phase]
                         
                         if not phase_conversation:
-                            print(f"[AGENT] No conversation found for {previous_phase}, using default score")
+                            log("AGENT", f"No conversation found for {previous_phase}, using default score")
                             score = 60
                         else:
-                            # Build transcript for AI evaluation
-                            transcript = "\n".join([f"{msg['role'].upper()}: {msg['content']}" for msg in phase_conversation])
-                            
                             try:
-                                import google.generativeai as genai
-                                genai.configure(api_key=os.environ.get("GOOGLE_API_KEY"))
-                                model = genai.GenerativeModel('gemini-2.5-flash')
-                                
-                                phase_descriptions = {
-                                    "resume": "evaluating how well the candidate explained their work experience, projects, and skills from their resume",
-                                    "github": "evaluating how well the candidate explained their GitHub projects, technical decisions, and coding contributions",
-                                    "topic": "evaluating the candidate's technical knowledge and depth of understanding on interview topics"
-                                }
-                                
-                                scoring_prompt = f"""Evaluate this interview conversation for the {previous_phase.upper()} phase.
-
-PHASE DESCRIPTION: {phase_descriptions.get(previous_phase, 'general interview questions')}
-
-CONVERSATION TRANSCRIPT:
-{transcript}
-
-Score the candidate from 0-100 based on:
-- Clarity and depth of explanations (40%)
-- Technical accuracy and knowledge (30%)
-- Communication skills (20%)
-- Engagement and enthusiasm (10%)
-
-Return ONLY this JSON (no markdown, no explanation):
-{{"score": <0-100>}}"""
-
-                                response = model.generate_content(scoring_prompt)
-                                response_text = response.text.strip()
-                                if response_text.startswith("```"):
-                                    response_text = response_text.split("```")[1]
-                                    if response_text.startswith("json"):
-                                        response_text = response_text[4:]
-                                response_text = response_text.strip()
-                                
-                                result = json.loads(response_text)
-                                score = result.get("score", 70)
-                                print(f"[AGENT] {previous_phase} phase scored: {score}")
+                                # Answers were scored as they came in; fall back to a bulk score if none were
+                                score = await evaluator.phase_score(previous_phase)
+                                if score is None:
+                                    score = await scorer.score_phase(
+                                        scoring.get_scoring_model(), previous_phase, phase_conversation
+                                    )
+                                log("AGENT", f"{previous_phase} phase scored: {score}")
+                                record_result(previous_phase, score)
                                 
                             except Exception as e:
-                                print(f"[AGENT] Phase scoring error for {previous_phase}: {e}")
+                                log("AGENT", f"Phase scoring error for {previous_phase}: {e}", level="error")
                                 score = 70  # Default score on error
                         
                         # Send score to frontend
@@ -421,12 +482,27 @@ Wait for their response, then provide constructive feedback if they say yes."""
                 }
                 
                 instruction = phase_instructions.get(new_phase, "Continue the interview. Ask the candidate a relevant question now.")
-                print(f"[AGENT] Sending phase instruction for: {new_phase}")
-                session.generate_reply(instructions=instruction)
+                
+                # Use questions prepared in the background when they are ready
+                prepared = planner.ready_questions(new_phase)
+                if prepared:
+                    backup = "\n".join(f"- {q}" for q in prepared[1:])
+                    instruction += f"""
+
+A question has been prepared for you. Ask this as your FIRST question (you may rephrase it naturally):
+"{prepared[0]}"
+"""
+                    if backup:
+                        instruction += f"""
+Other prepared questions, best first, to use for the rest of this round where they fit:
+{backup}"""
+                    log("AGENT", f"Using {len(prepared)} prepared {new_phase} questions")
+                log("AGENT", f"Sending phase instruction for: {new_phase}")
+                reply_with("phase", instruction)
                 
             elif data_type == "INTERVIEW_SKIPPED":
-                print(f"[AGENT] Interview skipped by candidate")
-                session.generate_reply(
+                log("AGENT", "Interview skipped by candidate")
+                reply_with("phase",
                     instructions="""The candidate has chosen to skip to the final report. 
                     
 Acknowledge this choice politely but note that skipping sections will result in a score of 0. 
@@ -436,104 +512,30 @@ Keep it brief and non-judgmental."""
                 )
             
             elif data_type == "INTERVIEW_COMPLETE":
-                print(f"[AGENT] Interview complete - scoring all phases and showing final report")
+                log("AGENT", "Interview complete - scoring all phases and showing final report")
                 
                 # Score all phases - resume/github based on document content, topic based on conversation
                 async def score_all_phases():
                     try:
-                        import google.generativeai as genai
-                        genai.configure(api_key=os.environ.get("GOOGLE_API_KEY"))
-                        model = genai.GenerativeModel('gemini-2.5-flash')
-                        
-                        scores = {"resume": 0, "github": 0, "topic": 0}
+                        model = scoring.get_scoring_model()
                         
-                        # Score RESUME based on document content
-                        if resume_content:
-                            resume_prompt = f"""Evaluate this resume for a technical interview. Score the DOCUMENT QUALITY.
-
-RESUME CONTENT:
-{resume_content}
-
-Score from 0-100 based on:
-- Technical skills and technologies listed (30%)
-- Quality and relevance of projects described (35%)
-- Work experience and achievements (20%)
-- Education and certifications (15%)
-
-Return ONLY this JSON (no markdown): {{"score": <0-100>}}"""
-
-                            response = model.generate_content(resume_prompt)
-                            response_text = response.text.strip()
-                            if response_text.startswith("```"):
-                                response_text = response_text.split("```")[1]
-                                if response_text.startswith("json"):
-                                    response_text = response_text[4:]
-                            result = json.loads(response_text.strip())
-                            scores["resume"] = result.get("score", 70)
-                            print(f"[AGENT] Resume document scored: {scores['resume']}")
-                        else:
-                            scores["resume"] = 0
-                            print("[AGENT] No resume uploaded, score = 0")
-                        
-                        # Score GITHUB based on document content
-                        if github_content:
-                            github_prompt = f"""Evaluate this GitHub profile for a technical interview. Score the PROFILE QUALITY.
-
-GITHUB PROFILE:
-{github_content}
-
-Score from 0-100 based on:
-- Number and quality of repositories (35%)
-- Technical variety and complexity (30%)
-- Project descriptions and documentation (20%)
-- Recent activity and contributions (15%)
-
-Return ONLY this JSON (no markdown): {{"score": <0-100>}}"""
-
-                            response = model.generate_content(github_prompt)
-                            response_text = response.text.strip()
-                            if response_text.startswith("```"):
-                                response_text = response_text.split("```")[1]
-                                if response_text.startswith("json"):
-                                    response_text = response_text[4:]
-                            result = json.loads(response_text.strip())
-                            scores["github"] = result.get("score", 70)
-                            print(f"[AGENT] GitHub profile scored: {scores['github']}")
-                        else:
-                            scores["github"] = 0
-                            print("[AGENT] No GitHub uploaded, score = 0")
+                        # Documents and answers were scored during the session; this is just the combine step
+                        scores = await evaluator.final_scores()
                         
-                        # Score TOPIC based on conversation quality
-                        transcript = "\n".join([f"{msg['role'].upper()}: {msg['content']}" for msg in conversation_history])
+                        # Bulk-score anything the rolling evaluation could not provide
+                        fallbacks = {
+                            "resume": lambda: scorer.score_resume(model, resume_content),
+                            "github": lambda: scorer.score_github(model, github_content),
+                            "topic": lambda: scorer.score_topic(model, conversation_history),
+                        }
+                        missing = [phase for phase, score in scores.items() if score is None]
+                        if missing:
+                            results = await asyncio.gather(*(fallbacks[phase]() for phase in missing))
+                            scores.update(zip(missing, results))
                         
-                        if transcript:
-                            topic_prompt = f"""Evaluate the candidate's VERBAL ANSWERS during this interview.
-
-INTERVIEW TRANSCRIPT:
-{transcript}
-
-Score from 0-100 based on:
-- Depth and quality of technical explanations (40%)
-- Knowledge accuracy and understanding (30%)
-- Communication clarity (20%)
-- Engagement and confidence (10%)
-
-Return ONLY this JSON (no markdown): {{"score": <0-100>}}"""
-
-                            response = model.generate_content(topic_prompt)
-                            response_text = response.text.strip()
-                            if response_text.startswith("```"):
-                                response_text = response_text.split("```")[1]
-                                if response_text.startswith("json"):
-                                    response_text = response_text[4:]
-                            result = json.loads(response_text.strip())
-                            scores["topic"] = result.get("score", 70)
-                            print(f"[AGENT] Topic conversation scored: {scores['topic']}")
-                        else:
-                            scores["topic"] = 50
-                            print("[AGENT] No conversation to score, using default 50")
-                        
-                        print(f"[AGENT] All phases scored: {scores}")
+                        log("AGENT", f"All phases scored: {scores}")
+                        for phase in ["resume", "github", "topic"]:
+                            record_result(phase, scores[phase])
                         
                         # Send all scores to frontend
                         for phase in ["resume", "github", "topic"]:
@@ -545,10 +547,10 @@ Return ONLY this JSON (no markdown): {{"score": <0-100>}}"""
                                 }).encode(),
                                 reliable=True
                             )
-                            print(f"[AGENT] Sent {phase} score: {scores[phase]}")
+                            log("AGENT", f"Sent {phase} score: {scores[phase]}")
                         
                     except Exception as e:
-                        print(f"[AGENT] Phase scoring error: {e}")
+                        log("AGENT", f"Phase scoring error: {e}", level="error")
                         # Send default scores on error
                         for phase in ["resume", "github", "topic"]:
                             await ctx.room.local_participant.publish_data(
@@ -562,7 +564,7 @@ Return ONLY this JSON (no markdown): {{"score": <0-100>}}"""
                 
                 asyncio.create_task(score_all_phases())
                 
-                session.generate_reply(
+                reply_with("phase",
                     instructions="""START SPEAKING NOW. The interview is officially complete.
 
 Say: "That wraps up our interview! Your complete performance report is now on screen. Thank you for participating today. You can review your scores and then click the End Call button when you're ready to leave. Good luck with everything!"
@@ -571,7 +573,7 @@ Keep it brief and warm - the interview is done."""
                 )
                 
         except Exception as e:
-            print(f"[AGENT] Error processing received data: {e}")
+            log("AGENT", f"Error processing received data: {e}", level="error")
     
     # Wait for a human participant to join before greeting
     print("[AGENT] Checking for human participants...")
@@ -599,8 +601,10 @@ Keep it brief and warm - the interview is done."""
     
     print(f"[AGENT] Generating greeting for interview type: {interview_type}")
     
-    # Wait for session to stabilize before greeting
-    await asyncio.sleep(2)
+    # Wait for session to stabilize before greeting. In a pre-warmed room the
+    # session has been up since before the candidate joined, so greet at once.
+    if human_present:
+        await asyncio.sleep(2)
     
     # Retry greeting up to 3 times if it fails
     for attempt in range(3):
@@ -0,0 +1,326 @@
+"""
+Context compaction for a room's realtime session.
+
+Over an interview the realtime context keeps growing. It holds the resume and
+GitHub summary, one instruction block per phase, code feedback and every spoken
+turn. The Gemini Live session keeps that history server-side and cannot delete
+individual items, so `Agent.update_chat_ctx` never shrinks it. Two pieces work
+together:
+
+- The provider's sliding window (realtime_window_compression) is what actually
+  bounds the context. It is derived from CONTEXT_TOKEN_BUDGET: once the
+  session's input reaches the budget, the oldest turns are discarded down to
+  CONTEXT_WINDOW_TARGET of it.
+- ContextManager makes sure nothing important is lost when they go. Before the
+  window trims, older turns and acted-on resume/GitHub blocks are summarized
+  into a notes message that is sent as a new item. Being newer than everything
+  it replaces, it stays in the window after they fall out. Phase instructions
+  and code feedback are only dropped from the accounting once their reply has
+  played out; they were sent with `generate_reply` and were never chat items.
+
+The local chat context is trimmed to the notes plus the last CONTEXT_KEEP_TURNS
+turns, which models what the window keeps. Compaction is checked against the
+session's reported input tokens, which only the window can lower, so it waits
+for CONTEXT_KEEP_TURNS new turns between rounds instead of re-running every turn.
+
+Model metrics (time to first token, input tokens) are recorded per compaction
+epoch and logged by the room at shutdown. `python context_manager.py --simulate`
+replays a long session against a stand-in chat context from which items can be
+removed. Its numbers are a model of such a context, not a measurement of the
+Gemini session.
+"""
+
+import asyncio
+import os
+
+from log_sink import log
+from prompt_registry import estimate_tokens, registry
+
+# The provider's sliding window trims the session once its input reaches this.
+# Native-audio sessions also spend tokens on audio, so it is checked against the
+# model's reported input tokens whenever they are available
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("CONTEXT_TOKEN_BUDGET", "32000"))
+# Fraction of the budget the window trims back to
+CONTEXT_WINDOW_TARGET = float(os.environ.get("CONTEXT_WINDOW_TARGET", "0.5"))
+# Older turns are folded into the notes from this fraction of the budget, ahead of the window
+CONTEXT_SOFT_LIMIT = float(os.environ.get("CONTEXT_SOFT_LIMIT", "0.75"))
+CONTEXT_KEEP_TURNS = int(os.environ.get("CONTEXT_KEEP_TURNS", "8"))
+SUMMARY_MAX_CHARS = 2400
+
+SUMMARY_ID = "context-notes"
+SUMMARY_HEADER = "Notes on the interview so far (earlier turns were condensed):"
+
+registry.register("context.summary", """You keep running notes for an AI interviewer during a live technical interview.
+Update the notes with the new material below. Keep concrete facts the interviewer may refer back to:
+the candidate's projects, technologies, claims, strong and weak answers, and which topics were already covered.
+Drop greetings, filler and instructions. Write at most 150 words of plain text, no markdown.
+
+""", """CURRENT NOTES:
+{notes}
+
+NEW MATERIAL:
+{material}""")
+
+
+def realtime_window_compression(budget=CONTEXT_TOKEN_BUDGET, target=CONTEXT_WINDOW_TARGET):
+    """Sliding-window compression config for google.realtime.RealtimeModel, sized from the budget."""
+    from google.genai import types
+    return types.ContextWindowCompressionConfig(
+        trigger_tokens=budget,
+        sliding_window=types.SlidingWindow(target_tokens=int(budget * target)),
+    )
+
+
+class _Block:
+    def __init__(self, kind, text, carry):
+        self.kind = kind
+        self.text = text
+        self.tokens = estimate_tokens(text)
+        self.carry = carry
+        self.acted_on = False
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class ContextManager:
+    """Folds one room's older context into notes before the provider window drops it."""
+
+    def __init__(self, agent, core_tokens, summarizer=None, budget=CONTEXT_TOKEN_BUDGET,
+                 soft_limit=CONTEXT_SOFT_LIMIT, keep_turns=CONTEXT_KEEP_TURNS):
+        self.agent = agent
+        self.core_tokens = core_tokens
+        self.summarizer = summarizer
+        self.budget = budget
+        self.soft_limit = soft_limit
+        self.keep_turns = keep_turns
+        self.blocks = []
+        self.turn_tokens = 0
+        self.notes = ""
+        self.reported_input_tokens = None
+        self.compactions = 0
+        self.turns_since_compaction = 0
+        self.turn_metrics = []  # (compactions so far, ttft, input tokens)
+        self._compacting = None
+
+    # ===== ACCOUNTING =====
+
+    def local_tokens(self):
+        """Estimated size of the local context: core, notes, kept turns and pending blocks."""
+        return (self.core_tokens + estimate_tokens(self.notes) + self.turn_tokens
+                + sum(b.tokens for b in self.blocks))
+
+    def context_tokens(self):
+        return max(self.local_tokens(), self.reported_input_tokens or 0)
+
+    def instruction(self, kind, text, carry=False):
+        """Register an instruction block about to be sent; returns the text to send.
+
+        `carry` blocks (documents) are summarized into the notes once acted on;
+        the rest are dropped.
+        """
+        self.blocks.append(_Block(kind, text, carry))
+        return text
+
+    def track(self, kind, handle):
+        """Mark the newest `kind` block as acted on once its reply has played out."""
+        block = next((b for b in reversed(self.blocks) if b.kind == kind), None)
+        if block is None or handle is None:
+            return
+
+        def done(_):
+            block.acted_on = True
+            self.maybe_compact()
+        handle.add_done_callback(done)
+
+    def turn_added(self, text):
+        self.turn_tokens += estimate_tokens(text or "")
+        self.turns_since_compaction += 1
+        self.maybe_compact()
+
+    def record_metrics(self, metrics):
+        """Feed realtime model metrics from the session's metrics_collected event."""
+        ttft = getattr(metrics, "ttft", None)
+        input_tokens = getattr(metrics, "input_tokens", None)
+        if input_tokens:
+            self.reported_input_tokens = input_tokens
+        if ttft is not None and ttft >= 0:
+            self.turn_metrics.append((self.compactions, ttft, input_tokens or 0))
+
+    # ===== COMPACTION =====
+
+    def maybe_compact(self):
+        if self.context_tokens() <= self.budget * self.soft_limit:
+            return None
+        if self._compacting and not self._compacting.done():
+            return None
+        # Compaction can't lower the reported tokens (only the window can), so
+        # wait for enough new turns to be worth a summary
+        if self.turns_since_compaction < self.keep_turns:
+            return None
+        self._compacting = asyncio.ensure_future(self.compact())
+        return self._compacting
+
+    async def compact(self):
+        messages = [item for item in self.agent.chat_ctx.items if getattr(item, "type", "message") == "message"]
+        # System/developer messages are instructions, not turns: never fold or drop them
+        turns = [m for m in messages if m.role in ("user", "assistant") and not m.id.startswith(SUMMARY_ID)]
+        split = max(0, len(turns) - self.keep_turns)
+        old = turns[:split]
+        folded = [b for b in self.blocks if b.acted_on]
+        if not old and not folded:
+            return False
+
+        material = [f"{b.kind.upper()} (shared earlier):\n{b.text}" for b in folded if b.carry]
+        material += [f"{m.role.upper()}: {m.text_content}" for m in old if m.text_content]
+        if material:
+            self.notes = await self._summarize("\n\n".join(material))
+
+        # Re-read the context: turns may have arrived while the summary was written
+        before = self.context_tokens()
+        dropped = {m.id for m in old}
+        ctx = self.agent.chat_ctx.copy()
+        ctx.items[:] = [item for item in ctx.items
+                        if item.id not in dropped and not item.id.startswith(SUMMARY_ID)]
+        if self.notes:
+            # A fresh id each round: the session only sends items it hasn't seen,
+            # so reusing one would never deliver the updated notes
+            notes = ctx.add_message(role="assistant", content=f"{SUMMARY_HEADER}\n{self.notes}",
+                                    id=f"{SUMMARY_ID}-{self.compactions + 1}")
+            # Pinned ahead of the recent turns it summarizes
+            ctx.items.remove(notes)
+            ctx.items.insert(0, notes)
+        await self.agent.update_chat_ctx(ctx)
+
+        self.blocks = [b for b in self.blocks if b not in folded]
+        self.turn_tokens = sum(estimate_tokens(getattr(item, "text_content", None) or "")
+                               for item in ctx.items if not item.id.startswith(SUMMARY_ID))
+        self.turns_since_compaction = 0
+        self.compactions += 1
+        log("CONTEXT", "Compaction", round=self.compactions, tokens_before=before,
+            local_tokens_after=self.local_tokens(), turns=len(old), blocks=len(folded))
+        return True
+
+    async def _summarize(self, material):
+        if self.summarizer is not None:
+            try:
+                prompt = registry.render("context.summary", notes=self.notes or "(none yet)", material=material)
+                text = (await self.summarizer.generate(prompt)).strip()
+                if text:
+                    return text[:SUMMARY_MAX_CHARS]
+            except Exception as e:
+                log("CONTEXT", f"Summary failed, keeping an extract instead: {e}", level="warning")
+        # Extractive fallback: keep the start of each piece, newest last
+        pieces = [self.notes] if self.notes else []
+        pieces += [" ".join(part.split()[:40]) for part in material.split("\n\n")]
+        return " | ".join(pieces)[-SUMMARY_MAX_CHARS:]
+
+    def latency_report(self):
+        """Turn latency and input size before the first compaction and after compacting."""
+        report = {"compactions": self.compactions}
+        for label, rows in (("before", [r for r in self.turn_metrics if r[0] == 0]),
+                            ("after", [r for r in self.turn_metrics if r[0] > 0])):
+            ttfts = [r[1] for r in rows]
+            report[label] = {
+                "turns": len(rows),
+                "ttft_p50": round(_percentile(ttfts, 50), 3) if ttfts else None,
+                "ttft_p90": round(_percentile(ttfts, 90), 3) if ttfts else None,
+                "input_tokens_mean": round(sum(r[2] for r in rows) / len(rows)) if rows else None,
+            }
+        return report
+
+
+# ===== SIMULATION =====
+
+class _Message:
+    type = "message"
+
+    def __init__(self, role, text, id):
+        self.role = role
+        self.text_content = text
+        self.id = id
+
+
+class _ChatContext:
+    """The subset of the livekit ChatContext API the manager uses."""
+
+    def __init__(self, items=None):
+        self.items = list(items or [])
+
+    def copy(self):
+        return _ChatContext(self.items)
+
+    def add_message(self, role, content, id):
+        message = _Message(role, content, id)
+        self.items.append(message)
+        return message
+
+
+class _SimAgent:
+    def __init__(self):
+        self.chat_ctx = _ChatContext()
+
+    async def update_chat_ctx(self, ctx):
+        self.chat_ctx = ctx
+
+
+class _Handle:
+    def add_done_callback(self, callback):
+        asyncio.get_running_loop().call_soon(callback, self)
+
+
+async def simulate(turns=160, budget=6000, compact=True):
+    """Replay a long session against a stand-in context from which items can be removed.
+
+    TTFT is modeled as a fixed cost plus prefill per context token. The result
+    is a model of a removable context, not a measurement of a Gemini session.
+    """
+    from scoring import LocalModel
+
+    class _Notes(LocalModel):
+        async def generate(self, prompt):
+            await super().generate(prompt)
+            return " ".join(prompt.split()[-120:])
+
+    agent = _SimAgent()
+    manager = ContextManager(agent, core_tokens=850, summarizer=_Notes(),
+                             budget=budget if compact else 10 ** 9, keep_turns=CONTEXT_KEEP_TURNS)
+    document = "Built a distributed cache in Go with consistent hashing and a Redis fallback. " * 40
+    sizes, ttfts = [], []
+    for i in range(turns):
+        if i in (4, 30):
+            kind = "resume" if i == 4 else "github"
+            manager.instruction(kind, document, carry=True)
+            manager.track(kind, _Handle())
+        if i % 25 == 0:
+            manager.instruction("phase", "Move to the next round now and ask one question. " * 20)
+            manager.track("phase", _Handle())
+        role = "assistant" if i % 2 == 0 else "user"
+        text = f"Turn {i}: " + "we discussed tradeoffs between latency and consistency in the design " * 6
+        agent.chat_ctx.add_message(role, text, id=f"item-{i}")
+        manager.turn_added(text)
+        await asyncio.sleep(0)
+        if manager._compacting:
+            await manager._compacting
+        size = manager.local_tokens()
+        sizes.append(size)
+        ttft = 0.35 + size * 20e-6
+        ttfts.append(ttft)
+        manager.record_metrics(type("Metrics", (), {"ttft": ttft, "input_tokens": 0})())
+    return sizes, ttfts, manager
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--simulate" in sys.argv:
+        for compact in (False, True):
+            sizes, ttfts, manager = asyncio.run(simulate(compact=compact))
+            label = "with compaction   " if compact else "without compaction"
+            print(f"[CONTEXT] Modeled removable context, {label}: final ~{sizes[-1]} tokens, max ~{max(sizes)}, "
+                  f"modeled TTFT p50 {_percentile(ttfts, 50):.3f}s p90 {_percentile(ttfts, 90):.3f}s, "
+                  f"{manager.compactions} compactions, {len(manager.agent.chat_ctx.items)} items")
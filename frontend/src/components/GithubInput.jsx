@@ -28,58 +28,39 @@ const GithubInput = () => {
         setError('');
 
         try {
-            // Fetch public repos with authentication for higher rate limit
-            const headers = {
-                'Accept': 'application/vnd.github.v3+json'
-            };
-            
-            // Add token if available
-            if (import.meta.env.VITE_GITHUB_TOKEN) {
-                headers['Authorization'] = `token ${import.meta.env.VITE_GITHUB_TOKEN}`;
-            }
-            
-            const response = await fetch(
-                `https://api.github.com/users/${cleanUsername}/repos?per_page=10&sort=updated`,
-                { headers }
-            );
+            // The agent fetches and caches the profile server-side and replies with GITHUB_DATA_RESULT
+            const result = new Promise((resolve, reject) => {
+                const timeout = setTimeout(() => {
+                    room.off('dataReceived', handleResult);
+                    reject(new Error('Timed out fetching GitHub data'));
+                }, 20000);
+
+                const handleResult = (data) => {
+                    try {
+                        const message = JSON.parse(new TextDecoder().decode(data));
+                        if (message.type !== 'GITHUB_DATA_RESULT') return;
+                        clearTimeout(timeout);
+                        room.off('dataReceived', handleResult);
+                        message.ok ? resolve() : reject(new Error(message.error || 'Fetch failed'));
+                    } catch (e) {
+                        // Not a JSON message for us
+                    }
+                };
+                room.on('dataReceived', handleResult);
+            });
 
-            if (!response.ok) {
-                if (response.status === 404) {
-                    throw new Error('User not found');
-                }
-                if (response.status === 403) {
-                    throw new Error('GitHub API rate limit exceeded. Please try again later or use authentication.');
-                }
-                throw new Error('Failed to fetch data');
-            }
-
-            const repos = await response.json();
-
-            // Create a summary
-            const summary = repos.map(repo => ({
-                name: repo.name,
-                description: repo.description || 'No description',
-                language: repo.language || 'Not specified',
-                stars: repo.stargazers_count,
-                url: repo.html_url
-            }));
-
-            const summaryText = `GitHub Username: ${cleanUsername}
-Top Repositories:
-${summary.map((r, i) => `${i + 1}. ${r.name} (${r.language}) - ${r.description} [${r.stars} stars]`).join('\n')}`;
-
-            // Send to backend agent via LiveKit data channel
             const payload = JSON.stringify({
                 type: 'GITHUB_DATA',
-                content: summaryText
+                username: cleanUsername
             });
 
             await room.localParticipant.publishData(
                 new TextEncoder().encode(payload),
                 { reliable: true }
             );
+            await result;
 
-            console.log('[GithubInput] Sent GitHub data to agent');
+            console.log('[GithubInput] Agent fetched GitHub data');
             setStatus('success');
 
         } catch (err) {
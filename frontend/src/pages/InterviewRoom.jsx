@@ -15,6 +15,16 @@ import ParticleBackground from '../components/ParticleBackground';
 
 // LiveKit server URL is fetched dynamically from token server
 
+// Stable per-browser candidate id: groups interview history and avoids repeated questions
+const getCandidateId = () => {
+    let id = localStorage.getItem('candidateId');
+    if (!id) {
+        id = crypto.randomUUID();
+        localStorage.setItem('candidateId', id);
+    }
+    return id;
+};
+
 const InterviewRoom = () => {
     const [token, setToken] = useState("");
     const navigate = useNavigate();
@@ -44,10 +54,20 @@ const InterviewRoom = () => {
         if (hasFetched.current) return;
         hasFetched.current = true;
 
-        const fetchToken = async () => {
+        const fetchToken = async (ticket) => {
             try {
-                const response = await fetch(`http://localhost:3000/getToken?type=${type || 'default'}`);
+                const ticketParam = ticket ? `&ticket=${ticket}` : '';
+                const response = await fetch(`http://localhost:3000/getToken?type=${type || 'default'}&candidate=${getCandidateId()}${ticketParam}`);
                 const data = await response.json();
+
+                // Server is at capacity: keep our place in the queue and poll again
+                if (data.status === 'queued' || data.status === 'rejected' || data.status === 'rate_limited') {
+                    console.log(`[FRONTEND] Session ${data.status}, position ${data.position ?? '-'}, ETA ${data.eta ?? '-'}s`);
+                    // A rate-limited poll must not lose the ticket it already holds
+                    setTimeout(() => fetchToken(data.ticket || ticket), (data.retryAfter || 5) * 1000);
+                    return;
+                }
+
                 setTokenReady(data.token);
                 setServerUrl(data.url);  // Get URL from token server
             } catch (error) {
@@ -60,9 +80,10 @@ const InterviewRoom = () => {
     // 2. Run Sequence Animation
     useEffect(() => {
         if (currentStep < loadingSteps.length - 1) {
+            // Once the token is in hand (e.g. a warm room) race through the remaining steps
             const timer = setTimeout(() => {
                 setCurrentStep(prev => prev + 1);
-            }, 600); // 600ms per step = ~6 seconds total
+            }, tokenReady ? 80 : 600); // 600ms per step = ~6 seconds total
             return () => clearTimeout(timer);
         } else if (currentStep === loadingSteps.length - 1) {
             // Sequence done. Check if token is ready.
@@ -70,7 +91,7 @@ const InterviewRoom = () => {
                 // Add a small delay for the final step to be readable before switching
                 const finalDelay = setTimeout(() => {
                     setToken(tokenReady);
-                }, 800);
+                }, 200);
                 return () => clearTimeout(finalDelay);
             }
             // If token not ready yet, it will wait here until tokenReady changes
@@ -278,54 +299,29 @@ function solution() {
     // Detect track from URL params
     const interviewTrack = type || 'frontend';
 
-    // Track-based question pools
-    const questionPools = {
-        frontend: [
-            {
-                title: "Debounce Function - Medium",
-                description: "Implement a debounce function that delays invoking func until after wait milliseconds have elapsed since the last time the debounced function was invoked.",
-                examples: [
-                    { input: 'debounce(console.log, 100)("hello")', output: 'logs "hello" after 100ms', explanation: 'Function is called after delay' }
-                ],
-                constraints: ['0 ≤ wait ≤ 1000', 'func is a valid function']
-            },
-            {
-                title: "DOM Element Finder - Easy",
-                description: "Write a function that finds all elements with a specific class name and returns them as an array.",
-                examples: [
-                    { input: 'findByClass("active")', output: '[<div class="active">, <span class="active">]', explanation: 'Returns array of matching elements' }
-                ],
-                constraints: ['className is a valid string', 'Return empty array if no matches']
-            }
-        ],
-        backend: [
-            {
-                title: "Rate Limiter - Hard",
-                description: "Design a rate limiter that allows at most N requests per time window.",
-                examples: [
-                    { input: 'RateLimiter(3, 60)', output: 'true/false for each request', explanation: 'Returns false when limit exceeded' }
-                ],
-                constraints: ['1 ≤ N ≤ 1000', '1 ≤ window ≤ 3600']
-            }
-        ],
-        fullstack: [
-            {
-                title: "Real-time Message Queue - Hard",
-                description: "Design a message queue system that handles real-time chat messages with guaranteed delivery.",
-                examples: [
-                    { input: 'MessageQueue with user1 sending to user2', output: 'Messages delivered in order', explanation: 'FIFO guarantee' }
-                ],
-                constraints: ['Handle network failures', 'Maintain message ordering']
-            }
-        ]
-    };
+    // Coding questions come from the server-side question bank, which avoids
+    // repeating a question for the same candidate
+    const [currentQuestion, setCurrentQuestion] = useState({
+        title: 'Loading question...',
+        description: '',
+        examples: [],
+        constraints: []
+    });
 
-    const getRandomQuestion = (track) => {
-        const questions = questionPools[track] || questionPools.frontend;
-        return questions[Math.floor(Math.random() * questions.length)];
-    };
+    React.useEffect(() => {
+        const fetchQuestion = async () => {
+            try {
+                const response = await fetch(`http://localhost:3000/questions/next?track=${interviewTrack}&candidate=${getCandidateId()}`);
+                if (response.ok) {
+                    setCurrentQuestion(await response.json());
+                }
+            } catch (error) {
+                console.error('Failed to fetch coding question:', error);
+            }
+        };
+        fetchQuestion();
+    }, [interviewTrack]);
 
-    const [currentQuestion, setCurrentQuestion] = useState(getRandomQuestion(interviewTrack));
     const [evaluationResult, setEvaluationResult] = useState(null);
     const [isEvaluating, setIsEvaluating] = useState(false);
     const [showAnalysis, setShowAnalysis] = useState(false);
@@ -557,6 +553,7 @@ function solution() {
                     type: 'CODE_ANALYSIS',
                     code: code,
                     question: {
+                        id: currentQuestion.id,
                         title: currentQuestion.title,
                         description: currentQuestion.description
                     }
@@ -0,0 +1,231 @@
+"""
+Server-side GitHub profile enrichment for the agent.
+
+Replaces the browser-side GitHub API calls: one pooled aiohttp session per
+process, conditional requests (ETag / If-None-Match) so unchanged data does not
+count against the rate limit, a host-wide cache with a TTL, and bounded
+concurrency for the per-repo language and README lookups. Repositories without
+a README are cached as such (negative caching), so profiles with few READMEs
+don't spend a rate-limited request per repo on every fetch. The resulting
+summary is what the agent receives as GITHUB_DATA.
+
+Tests in tests/test_github_service.py run against a local stand-in API server.
+"""
+
+import asyncio
+import json
+import os
+import time
+from urllib.parse import quote
+
+from log_sink import log
+
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com")
+GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN", "")
+# Within the TTL cached responses are used without touching the network
+GITHUB_CACHE_TTL = float(os.environ.get("GITHUB_CACHE_TTL", "3600"))
+GITHUB_REPO_LIMIT = int(os.environ.get("GITHUB_REPO_LIMIT", "10"))
+GITHUB_MAX_CONCURRENCY = int(os.environ.get("GITHUB_MAX_CONCURRENCY", "4"))
+README_EXCERPT_CHARS = 300
+
+
+class GithubError(Exception):
+    """Raised for errors that should be shown to the candidate."""
+
+
+class ResponseCache:
+    """GitHub API responses keyed by request path, in the host-wide shared cache.
+
+    SQLite calls can wait on other processes' transactions, so every method runs
+    in a worker thread and never on the room's event loop.
+    """
+
+    NAMESPACE = "github"
+
+    def __init__(self, cache=None):
+        from shared_cache import get_shared_cache
+        self.cache = cache or get_shared_cache()
+
+    def _get(self, key):
+        entry = self.cache.get(self.NAMESPACE, key)
+        if entry is None:
+            return None
+        return entry["etag"], entry["body"], entry["fetched_at"]
+
+    def _set(self, key, etag, body, fetched_at=None):
+        # No TTL: stale entries are still useful for ETag revalidation until evicted
+        self.cache.set(self.NAMESPACE, key, {"etag": etag, "body": body, "fetched_at": fetched_at or time.time()})
+
+    def _touch(self, key, fetched_at=None):
+        entry = self._get(key)
+        if entry is not None:
+            self._set(key, entry[0], entry[1], fetched_at)
+
+    async def get(self, key):
+        """Return (etag, body, fetched_at) or None."""
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key, etag, body, fetched_at=None):
+        await asyncio.to_thread(self._set, key, etag, body, fetched_at)
+
+    async def touch(self, key, fetched_at=None):
+        await asyncio.to_thread(self._touch, key, fetched_at)
+
+    def close(self):
+        self.cache.flush_stats()
+
+
+class GithubService:
+    """Fetches and summarises a candidate's public GitHub profile."""
+
+    def __init__(self, base_url=GITHUB_API_URL, token=GITHUB_TOKEN, cache=None,
+                 ttl=GITHUB_CACHE_TTL, repo_limit=GITHUB_REPO_LIMIT,
+                 max_concurrency=GITHUB_MAX_CONCURRENCY):
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.cache = cache if cache is not None else ResponseCache()
+        self.ttl = ttl
+        self.repo_limit = repo_limit
+        self.max_concurrency = max_concurrency
+        self._session = None
+        self._session_loop = None
+        self.stats = {"fresh_hits": 0, "not_modified": 0, "fetched": 0}
+
+    async def _get_session(self):
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            import aiohttp
+            headers = {"Accept": "application/vnd.github+json", "User-Agent": "PracterViews"}
+            if self.token:
+                headers["Authorization"] = f"Bearer {self.token}"
+            self._session = aiohttp.ClientSession(
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=10),
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency * 2, keepalive_timeout=60),
+            )
+            self._session_loop = loop
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def get_json(self, path, accept=None, missing=None):
+        """GET an API path through the cache, revalidating with If-None-Match.
+
+        With `missing` set, a 404 is cached and answered with `missing` instead of raising.
+        """
+        cached = await self.cache.get(path)
+        if cached is not None and time.time() - cached[2] < self.ttl:
+            self.stats["fresh_hits"] += 1
+            return cached[1]
+
+        headers = {}
+        if accept:
+            headers["Accept"] = accept
+        if cached is not None and cached[0]:
+            headers["If-None-Match"] = cached[0]
+
+        session = await self._get_session()
+        async with session.get(f"{self.base_url}{path}", headers=headers) as response:
+            if response.status == 304 and cached is not None:
+                self.stats["not_modified"] += 1
+                await self.cache.touch(path)
+                return cached[1]
+            if response.status == 404:
+                if missing is not None:
+                    self.stats["fetched"] += 1
+                    await self.cache.set(path, None, missing)
+                    return missing
+                raise GithubError("User not found")
+            if response.status in (403, 429):
+                if cached is not None:
+                    # Rate limited: stale data beats no data
+                    log("GITHUB", "Rate limited, serving stale cache", level="warning", path=path)
+                    return cached[1]
+                raise GithubError("GitHub API rate limit exceeded. Please try again later.")
+            if response.status >= 400:
+                raise GithubError(f"GitHub API error ({response.status})")
+
+            if accept and "raw" in accept:
+                body = await response.text()
+            else:
+                body = await response.json()
+            self.stats["fetched"] += 1
+            await self.cache.set(path, response.headers.get("ETag"), body)
+            return body
+
+    async def _repo_details(self, semaphore, owner, repo):
+        name = quote(repo["name"])
+        async with semaphore:
+            try:
+                languages = await self.get_json(f"/repos/{owner}/{name}/languages")
+            except GithubError:
+                languages = {}
+            try:
+                readme = await self.get_json(
+                    f"/repos/{owner}/{name}/readme", accept="application/vnd.github.raw+json", missing=""
+                )
+            except GithubError:
+                readme = ""
+        return languages, readme
+
+    async def fetch_profile(self, username):
+        """Return a structured profile: repos with languages and README excerpts."""
+        owner = quote(username.strip())
+        repos = await self.get_json(f"/users/{owner}/repos?per_page={self.repo_limit}&sort=updated")
+        repos = repos[: self.repo_limit]
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        details = await asyncio.gather(
+            *(self._repo_details(semaphore, owner, repo) for repo in repos)
+        )
+
+        profile = {"username": username, "repos": []}
+        for repo, (languages, readme) in zip(repos, details):
+            profile["repos"].append({
+                "name": repo.get("name", ""),
+                "description": repo.get("description") or "No description",
+                "language": repo.get("language") or "Not specified",
+                "stars": repo.get("stargazers_count", 0),
+                "forks": repo.get("forks_count", 0),
+                "updated_at": repo.get("pushed_at") or repo.get("updated_at", ""),
+                "url": repo.get("html_url", ""),
+                "languages": languages if isinstance(languages, dict) else {},
+                "readme": readme if isinstance(readme, str) else "",
+            })
+        return profile
+
+    async def fetch_summary(self, username):
+        return format_summary(await self.fetch_profile(username))
+
+
+def format_summary(profile):
+    """Render a profile in the text format the agent prompts expect."""
+    lines = [f"GitHub Username: {profile['username']}", "Top Repositories:"]
+    for i, repo in enumerate(profile["repos"], start=1):
+        lines.append(
+            f"{i}. {repo['name']} ({repo['language']}) - {repo['description']} [{repo['stars']} stars]"
+        )
+        total = sum(repo["languages"].values())
+        if total:
+            breakdown = ", ".join(
+                f"{lang} {count * 100 // total}%"
+                for lang, count in sorted(repo["languages"].items(), key=lambda kv: -kv[1])[:4]
+            )
+            lines.append(f"   Languages: {breakdown}")
+        excerpt = " ".join(repo["readme"].split())[:README_EXCERPT_CHARS]
+        if excerpt:
+            lines.append(f"   README: {excerpt}")
+    return "\n".join(lines)
+
+
+_service = None
+
+
+def get_github_service():
+    """Process-wide service so all rooms share one connection pool and cache."""
+    global _service
+    if _service is None:
+        _service = GithubService()
+    return _service
@@ -0,0 +1,352 @@
+"""
+Interview history store.
+
+Every PHASE_SCORE and CODE_ANALYSIS_RESULT the agent publishes is also written
+here so admins can look at trends across sessions. Storage is a single SQLite
+file (WAL mode) shared by the agent processes (writers) and the token server
+(reader, serves the query API).
+
+Aggregate queries never scan the raw results table: inserts maintain a per-day
+score histogram and per-day totals, so averages and percentiles cost the same
+at a thousand rows as at millions. Scores are 0-100, so histogram percentiles
+are exact to the point.
+
+Run `python history_store.py --bench 1000000` to measure insert throughput and
+query latency on a synthetic data set.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+HISTORY_DB_PATH = os.environ.get("HISTORY_DB_PATH", "interview_history.sqlite3")
+HISTORY_BATCH_SIZE = int(os.environ.get("HISTORY_BATCH_SIZE", "200"))
+HISTORY_FLUSH_INTERVAL = float(os.environ.get("HISTORY_FLUSH_INTERVAL", "1.0"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    candidate TEXT NOT NULL,
+    interview_type TEXT NOT NULL,
+    phase TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    details TEXT,
+    UNIQUE (session_id, phase)
+);
+CREATE INDEX IF NOT EXISTS idx_results_candidate ON results (candidate, created_at);
+CREATE INDEX IF NOT EXISTS idx_results_type_phase_date ON results (interview_type, phase, created_at);
+CREATE INDEX IF NOT EXISTS idx_results_date ON results (created_at);
+
+CREATE TABLE IF NOT EXISTS score_histogram (
+    interview_type TEXT NOT NULL,
+    phase TEXT NOT NULL,
+    day TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (interview_type, phase, day, score)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS daily_totals (
+    interview_type TEXT NOT NULL,
+    phase TEXT NOT NULL,
+    day TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    PRIMARY KEY (interview_type, phase, day)
+) WITHOUT ROWID;
+"""
+
+
+def _day(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _clamp_score(score):
+    try:
+        return max(0, min(100, int(round(float(score)))))
+    except (TypeError, ValueError):
+        return 0
+
+
+def connect(path=HISTORY_DB_PATH):
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class HistoryStore:
+    """Bulk insert and aggregate queries over stored interview results."""
+
+    def __init__(self, path=HISTORY_DB_PATH):
+        self.path = path
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def insert_many(self, records):
+        """Insert result records in one transaction.
+
+        A record is a dict with session_id, candidate, interview_type, phase,
+        score and optional created_at/details. A later record for the same
+        session and phase replaces the earlier one (e.g. the final re-score at
+        INTERVIEW_COMPLETE), and the rollups are adjusted to match.
+        """
+        if not records:
+            return 0
+        rows = []
+        for r in records:
+            created_at = r.get("created_at") or time.time()
+            details = r.get("details")
+            rows.append((
+                r["session_id"], r.get("candidate") or r["session_id"], r["interview_type"],
+                r["phase"], _clamp_score(r.get("score")), created_at,
+                json.dumps(details) if details is not None else None,
+            ))
+
+        # Net rollup changes for the whole batch, applied once per key
+        histogram = {}
+        totals = {}
+
+        def add_rollup(interview_type, phase, created_at, score, sign):
+            day = _day(created_at)
+            key = (interview_type, phase, day, score)
+            histogram[key] = histogram.get(key, 0) + sign
+            count, total = totals.get(key[:3], (0, 0))
+            totals[key[:3]] = (count + sign, total + sign * score)
+
+        with self._lock, self._conn:
+            cur = self._conn.cursor()
+            for row in rows:
+                session_id, _, interview_type, phase, score, created_at, _ = row
+                previous = cur.execute(
+                    "SELECT interview_type, score, created_at FROM results WHERE session_id = ? AND phase = ?",
+                    (session_id, phase),
+                ).fetchone()
+                if previous is not None:
+                    add_rollup(previous[0], phase, previous[2], previous[1], -1)
+                cur.execute(
+                    """INSERT INTO results (session_id, candidate, interview_type, phase, score, created_at, details)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT (session_id, phase) DO UPDATE SET
+                           candidate = excluded.candidate,
+                           interview_type = excluded.interview_type,
+                           score = excluded.score,
+                           created_at = excluded.created_at,
+                           details = excluded.details""",
+                    row,
+                )
+                add_rollup(interview_type, phase, created_at, score, 1)
+
+            cur.executemany(
+                """INSERT INTO score_histogram (interview_type, phase, day, score, count) VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT DO UPDATE SET count = count + excluded.count""",
+                [key + (delta,) for key, delta in histogram.items() if delta],
+            )
+            cur.executemany(
+                """INSERT INTO daily_totals (interview_type, phase, day, count, total) VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT DO UPDATE SET count = count + excluded.count, total = total + excluded.total""",
+                [key + delta for key, delta in totals.items() if delta != (0, 0)],
+            )
+        return len(rows)
+
+    def _day_range(self, since=None, until=None):
+        return (
+            _day(since) if since is not None else "0000-00-00",
+            _day(until) if until is not None else "9999-99-99",
+        )
+
+    def averages_by_type(self, phase=None, since=None, until=None):
+        """Average score and count per interview type (optionally for one phase)."""
+        first, last = self._day_range(since, until)
+        query = """SELECT interview_type, SUM(count), SUM(total) FROM daily_totals
+                   WHERE day BETWEEN ? AND ?"""
+        params = [first, last]
+        if phase:
+            query += " AND phase = ?"
+            params.append(phase)
+        query += " GROUP BY interview_type ORDER BY interview_type"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return {
+            t: {"count": count, "average": round(total / count, 2)}
+            for t, count, total in rows if count
+        }
+
+    def percentiles(self, interview_type, phase, percentiles=(50, 90, 99), since=None, until=None):
+        """Exact score percentiles for one interview type and phase, from the histogram."""
+        first, last = self._day_range(since, until)
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT score, SUM(count) FROM score_histogram
+                   WHERE interview_type = ? AND phase = ? AND day BETWEEN ? AND ?
+                   GROUP BY score ORDER BY score""",
+                (interview_type, phase, first, last),
+            ).fetchall()
+        total = sum(count for _, count in rows)
+        result = {"count": total}
+        for p in percentiles:
+            if not total:
+                result[f"p{p}"] = None
+                continue
+            # Nearest-rank percentile
+            rank = max(1, -(-p * total // 100))
+            seen = 0
+            for score, count in rows:
+                seen += count
+                if seen >= rank:
+                    result[f"p{p}"] = score
+                    break
+        return result
+
+    def candidate_history(self, candidate, limit=50):
+        """Most recent results for a candidate, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT session_id, interview_type, phase, score, created_at, details
+                   FROM results WHERE candidate = ?
+                   ORDER BY created_at DESC LIMIT ?""",
+                (candidate, limit),
+            ).fetchall()
+        return [
+            {
+                "session_id": session_id,
+                "interview_type": interview_type,
+                "phase": phase,
+                "score": score,
+                "created_at": created_at,
+                "details": json.loads(details) if details else None,
+            }
+            for session_id, interview_type, phase, score, created_at, details in rows
+        ]
+
+
+class HistoryWriter:
+    """Buffers results in the agent process and flushes them in batches.
+
+    `record()` only appends to a list, so it is safe to call from event-loop
+    callbacks; the SQLite write happens on a background thread.
+    """
+
+    def __init__(self, path=HISTORY_DB_PATH, batch_size=HISTORY_BATCH_SIZE,
+                 flush_interval=HISTORY_FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._store = None
+        self._thread = None
+
+    def record(self, session_id, candidate, interview_type, phase, score, details=None):
+        with self._lock:
+            self._buffer.append({
+                "session_id": session_id,
+                "candidate": candidate,
+                "interview_type": interview_type,
+                "phase": phase,
+                "score": score,
+                "details": details,
+                "created_at": time.time(),
+            })
+            full = len(self._buffer) >= self.batch_size
+        self._ensure_started()
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return 0
+        try:
+            if self._store is None:
+                self._store = HistoryStore(self.path)
+            return self._store.insert_many(batch)
+        except Exception as e:
+            print(f"[HISTORY] Failed to write {len(batch)} results: {e}")
+            with self._lock:
+                # Keep them for the next attempt
+                self._buffer[:0] = batch
+            return 0
+
+    def _ensure_started(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+
+# Process-wide writer used by agent.py
+history_writer = HistoryWriter()
+
+
+def benchmark(num_rows=1_000_000, path=None, batch_size=5000):
+    import random
+    import tempfile
+
+    path = path or os.path.join(tempfile.mkdtemp(), "history_bench.sqlite3")
+    store = HistoryStore(path)
+    rng = random.Random(42)
+    types = ["frontend", "backend", "fullstack", "devops", "aiml", "dsa", "hackathon", "hr", "general"]
+    phases = ["resume", "github", "topic", "coding"]
+    now = time.time()
+    candidates = 50_000
+
+    started = time.perf_counter()
+    for offset in range(0, num_rows, batch_size):
+        batch = []
+        for i in range(offset, min(num_rows, offset + batch_size)):
+            session = i // len(phases)
+            batch.append({
+                "session_id": f"s{session}",
+                "candidate": f"user-{session % candidates}",
+                "interview_type": types[session % len(types)],
+                "phase": phases[i % len(phases)],
+                "score": rng.gauss(65, 15),
+                "created_at": now - rng.random() * 365 * 86400,
+            })
+        store.insert_many(batch)
+    insert_seconds = time.perf_counter() - started
+    print(f"[BENCH] Inserted {num_rows} rows in {insert_seconds:.1f}s ({num_rows / insert_seconds:.0f} rows/s)")
+
+    def timed(label, fn, repeat=20):
+        fn()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        print(f"[BENCH] {label:40s} {(time.perf_counter() - started) / repeat * 1000:7.2f} ms")
+
+    timed("averages_by_type (all time)", lambda: store.averages_by_type())
+    timed("averages_by_type (topic, last 30 days)",
+          lambda: store.averages_by_type(phase="topic", since=now - 30 * 86400))
+    timed("percentiles (backend/coding, all time)", lambda: store.percentiles("backend", "coding"))
+    timed("percentiles (dsa/topic, last 90 days)",
+          lambda: store.percentiles("dsa", "topic", since=now - 90 * 86400))
+    timed("candidate_history", lambda: store.candidate_history(f"user-{rng.randrange(candidates)}"))
+    store.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Interview history store benchmark")
+    parser.add_argument("--bench", type=int, default=1_000_000, help="number of rows to generate")
+    parser.add_argument("--db", default=None, help="database path (defaults to a temp file)")
+    args = parser.parse_args()
+    benchmark(args.bench, args.db)
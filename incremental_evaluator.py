@@ -0,0 +1,151 @@
+"""
+Rolling evaluation of a live interview.
+
+Instead of re-reading the whole transcript at PHASE_CHANGE and again at
+INTERVIEW_COMPLETE, each completed candidate answer is scored in the background
+as soon as it is added to the conversation, and resume/GitHub documents are
+scored as soon as they arrive. Running per-phase aggregates make the phase and
+final scores a cheap combine step, so the report is ready when the interview
+ends and model load is spread across the session instead of bursting at the end.
+
+Background jobs run through a small per-room worker pool (one worker by
+default) so they never compete heavily with the interactive work in the room.
+
+The topic score is the mean over answers in the substantive phases only;
+introduction, coding and report chatter ("yes, I'm ready") is scored per phase
+but kept out of it. `rescore.py --kinds answers` computes the same aggregate
+offline.
+"""
+
+import asyncio
+
+import scoring
+from log_sink import log
+
+EVALUATOR_WORKERS = 1
+# Extra workers started when a score is needed now and answers are still queued
+EVALUATOR_BURST_WORKERS = 4
+# Phases whose answers make up the overall topic score
+SUBSTANTIVE_PHASES = ("resume", "github", "topic")
+
+
+class PhaseAggregate:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, score):
+        self.count += 1
+        self.total += score
+
+    def mean(self):
+        return round(self.total / self.count) if self.count else None
+
+
+class IncrementalEvaluator:
+    """Scores answers and documents in the background for one room."""
+
+    def __init__(self, model, workers=EVALUATOR_WORKERS, scorer=scoring):
+        self.model = model
+        # scoring itself, or anything with the same scorer functions (see scoring_cascade.py)
+        self.scorer = scorer
+        self.aggregates = {}
+        self.overall = PhaseAggregate()
+        self._queue = asyncio.Queue()
+        self._pending = {}  # phase -> list of futures for answers not yet scored
+        self._documents = {}  # kind -> (content, future)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(workers)]
+
+    async def _worker(self, stop_when_empty=False):
+        while True:
+            if stop_when_empty:
+                if self._queue.empty():
+                    return
+                future, make_coro = self._queue.get_nowait()
+            else:
+                future, make_coro = await self._queue.get()
+            try:
+                # Superseded jobs (e.g. a replaced document) are skipped entirely
+                if not future.done():
+                    result = await make_coro()
+                    if not future.done():
+                        future.set_result(result)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    def _submit(self, make_coro):
+        future = asyncio.get_running_loop().create_future()
+        # Retrieve exceptions so failed jobs don't log "never retrieved" warnings
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._queue.put_nowait((future, make_coro))
+        return future
+
+    def add_answer(self, phase, question, answer):
+        """Queue a completed candidate answer for scoring."""
+        async def evaluate():
+            score = await self.scorer.score_answer(self.model, phase, question, answer)
+            self.aggregates.setdefault(phase, PhaseAggregate()).add(score)
+            if phase in SUBSTANTIVE_PHASES:
+                self.overall.add(score)
+            log("EVALUATOR", "Answer scored", phase=phase, score=score)
+            return score
+
+        self._pending.setdefault(phase, []).append(self._submit(evaluate))
+
+    def set_document(self, kind, content):
+        """Score a resume/GitHub document now; a changed document replaces the old score."""
+        current = self._documents.get(kind)
+        if current is not None:
+            if current[0] == content:
+                return
+            current[1].cancel()
+        scorer = self.scorer.score_resume if kind == "resume" else self.scorer.score_github
+        self._documents[kind] = (content, self._submit(lambda: scorer(self.model, content)))
+
+    async def _drain(self, futures):
+        if not futures:
+            return
+        # The report is waiting: clear any backlog in parallel
+        burst = min(self._queue.qsize(), EVALUATOR_BURST_WORKERS)
+        for _ in range(burst):
+            self._workers.append(asyncio.create_task(self._worker(stop_when_empty=True)))
+        await asyncio.gather(*futures, return_exceptions=True)
+
+    async def phase_score(self, phase):
+        """Mean answer score for a phase once its answers are scored, or None if it had none."""
+        await self._drain(self._pending.get(phase, []))
+        aggregate = self.aggregates.get(phase)
+        return aggregate.mean() if aggregate else None
+
+    async def final_scores(self):
+        """Combine running aggregates into the report scores.
+
+        Returns a dict with resume, github and topic. A value is None when it
+        could not be computed incrementally and the caller should fall back to
+        a bulk score.
+        """
+        await self._drain([f for futures in self._pending.values() for f in futures])
+        scores = {}
+        for kind in ("resume", "github"):
+            document = self._documents.get(kind)
+            if document is None:
+                scores[kind] = None
+                continue
+            content, future = document
+            await self._drain([future])
+            if future.cancelled() or future.exception() is not None:
+                scores[kind] = None
+            else:
+                scores[kind] = future.result()
+        scores["topic"] = self.overall.mean()
+        return scores
+
+    def close(self):
+        for worker in self._workers:
+            worker.cancel()
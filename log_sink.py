@@ -0,0 +1,212 @@
+"""
+Non-blocking log and transcript sink.
+
+`print` writes to stdout synchronously. When stdout is a pipe to a slow log
+collector, every utterance logged in `on_item_added` and every data packet in
+`on_data_received` can stall the event loop that carries the room's realtime
+audio. `log()` only appends a small record to a bounded in-memory ring buffer.
+A background thread drains the buffer in batches, encodes the records as JSON
+lines and writes each batch with a single write.
+
+When the buffer is under pressure, LOG_SINK_POLICY decides what is lost:
+- `drop_newest`: incoming records are dropped while the buffer is full.
+- `drop_oldest`: the oldest buffered record makes room for the new one.
+- `sample` (default): above half full, only every LOG_SINK_SAMPLE_EVERY-th
+  info record per tag is kept. Warnings and errors always get in while there
+  is room. When the buffer is full, incoming records are dropped.
+
+Nothing is lost silently. Every drop is counted by reason, and the writer
+emits a `LOG` record with the counts after each batch that had drops.
+
+Run `python log_sink.py --bench` to compare callback latency with print and
+with the sink against a slow collector.
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+LOG_SINK_PATH = os.environ.get("LOG_SINK_PATH", "")  # empty: stdout
+LOG_SINK_CAPACITY = int(os.environ.get("LOG_SINK_CAPACITY", "10000"))
+LOG_SINK_POLICY = os.environ.get("LOG_SINK_POLICY", "sample")
+LOG_SINK_SAMPLE_EVERY = int(os.environ.get("LOG_SINK_SAMPLE_EVERY", "10"))
+LOG_SINK_FLUSH_INTERVAL = float(os.environ.get("LOG_SINK_FLUSH_INTERVAL", "0.2"))
+LOG_SINK_BATCH = int(os.environ.get("LOG_SINK_BATCH", "500"))
+
+POLICIES = ("drop_newest", "drop_oldest", "sample")
+_ALWAYS_KEEP = ("warning", "error")
+
+
+class LogSink:
+    """Bounded ring buffer of log records drained by a background writer thread."""
+
+    def __init__(self, stream=None, path=LOG_SINK_PATH, capacity=LOG_SINK_CAPACITY,
+                 policy=LOG_SINK_POLICY, sample_every=LOG_SINK_SAMPLE_EVERY,
+                 flush_interval=LOG_SINK_FLUSH_INTERVAL, batch_size=LOG_SINK_BATCH):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown log sink policy {policy!r}, expected one of {POLICIES}")
+        self.stream = stream
+        self.path = path
+        self.capacity = capacity
+        self.policy = policy
+        self.sample_every = max(1, sample_every)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._buffer = deque(maxlen=capacity)
+        self._sample_counts = Counter()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.dropped = Counter()
+        self.written = 0
+        self._reported_drops = 0
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            if self.stream is None:
+                self.stream = open(self.path, "a", encoding="utf-8") if self.path else sys.stdout
+            self._thread = threading.Thread(target=self._run, name="log-sink", daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def log(self, tag, message, level="info", **fields):
+        """Queue one record. Never blocks and never raises."""
+        if self._thread is None:
+            self.start()
+        size = len(self._buffer)
+        if size >= self.capacity:
+            if self.policy != "drop_oldest":
+                self.dropped["overflow"] += 1
+                return
+            # The deque's maxlen discards the oldest record on append
+            self.dropped["overwritten"] += 1
+        elif self.policy == "sample" and level not in _ALWAYS_KEEP and size >= self.capacity // 2:
+            self._sample_counts[tag] += 1
+            if self._sample_counts[tag] % self.sample_every:
+                self.dropped["sampled"] += 1
+                return
+        record = {"ts": round(time.time(), 3), "tag": tag, "level": level, "msg": message}
+        if fields:
+            record.update(fields)
+        self._buffer.append(record)
+        if size + 1 >= self.batch_size:
+            self._wake.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._drain()
+        self._drain()
+
+    def _drain(self):
+        while self._buffer:
+            lines = []
+            while self._buffer and len(lines) < self.batch_size:
+                try:
+                    record = self._buffer.popleft()
+                except IndexError:
+                    break
+                lines.append(json.dumps(record, default=str))
+            self._write(lines)
+        total_dropped = sum(self.dropped.values())
+        if total_dropped != self._reported_drops:
+            self._reported_drops = total_dropped
+            self._write([json.dumps({"ts": round(time.time(), 3), "tag": "LOG", "level": "warning",
+                                     "msg": "records dropped under load", "dropped": dict(self.dropped)})])
+
+    def _write(self, lines):
+        if not lines:
+            return
+        try:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+            self.written += len(lines)
+        except Exception as e:
+            self.dropped["write_error"] += len(lines)
+            print(f"[LOG] Sink write failed: {e}", file=sys.stderr)
+
+    def stop(self):
+        """Flush what is buffered and stop the writer."""
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._wake.set()
+        self._thread.join(timeout=5)
+
+    def stats(self):
+        return {"buffered": len(self._buffer), "written": self.written, "dropped": dict(self.dropped),
+                "policy": self.policy, "capacity": self.capacity}
+
+
+log_sink = LogSink()
+
+
+def log(tag, message, level="info", **fields):
+    log_sink.log(tag, message, level, **fields)
+
+
+# ===== BENCHMARK =====
+
+class _SlowStream:
+    """Stands in for stdout piped to a collector that applies back-pressure."""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def write(self, text):
+        time.sleep(self.delay)
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def benchmark(calls=2000, delay=0.001, interval=0.0005):
+    def report(label, latencies, extra=""):
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] * 1e6
+        p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+        print(f"[LOG] {label:28} p50 {p50:8.1f}us  p99 {p99:8.1f}us  max {latencies[-1] * 1e6:9.1f}us {extra}")
+
+    slow = _SlowStream(delay)
+    history = []
+
+    # The shape of on_item_added: one log line plus a list append per utterance
+    latencies = []
+    for i in range(calls):
+        start = time.perf_counter()
+        print(f"User: answer number {i} with some words in it", file=slow)
+        history.append(i)
+        latencies.append(time.perf_counter() - start)
+        time.sleep(interval)
+    report("print (blocking)", latencies)
+
+    # A slow collector, then one that stalls long enough to fill the buffer
+    for label, write_delay in (("slow", delay), ("stalled", delay * 100)):
+        for policy in POLICIES:
+            sink = LogSink(stream=_SlowStream(write_delay), capacity=256, policy=policy, batch_size=64)
+            sink.start()
+            latencies = []
+            for i in range(calls):
+                start = time.perf_counter()
+                sink.log("TRANSCRIPT", f"answer number {i} with some words in it", role="user")
+                history.append(i)
+                latencies.append(time.perf_counter() - start)
+                time.sleep(interval)
+            sink.stop()
+            report(f"sink {label} ({policy})", latencies, f"written {sink.written} dropped {dict(sink.dropped)}")
+
+
+if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        benchmark()
+    else:
+        print(json.dumps(log_sink.stats()))
@@ -0,0 +1,276 @@
+"""
+Micro-batching of scoring prompts into multi-item model calls.
+
+BatchingModel wraps any scoring model (same async `generate(prompt)` interface)
+and collects prompts of the same kind that arrive within a short window. It
+sends them as one multi-item request whose reply is a JSON array, and routes
+each element back to its caller. Prompts built from the same template share
+their first line, which is used as the batching key.
+
+Both the collection window and the batch size adapt per kind. The window grows
+when waiting actually gathers more items and shrinks when it doesn't. The size
+limit backs off when a combined reply can't be split and creeps back up after
+successes. A batch whose reply doesn't parse is retried item by item, so a
+caller never sees a worse result than an unbatched call.
+
+When every item comes from the same registered template, its static prefix is
+sent once at the start of the combined request instead of once per item.
+
+A batcher only sees the prompts of its own process, and the live agent runs
+one room per job process. So the agent batches through a host-level service
+instead. `python micro_batcher.py --serve` runs one BatchingModel for the
+host, and each process's BatchClient posts its prompts there, so same-kind
+prompts from different rooms share a request. While the service is
+unreachable, the client batches in-process (which only helps when a process
+hosts several rooms, as in `rescore.py --batch`).
+"""
+
+import asyncio
+import json
+import os
+import time
+
+from log_sink import log
+from prompt_registry import registry
+from scoring import parse_model_json
+
+BATCH_MAX_SIZE = int(os.environ.get("SCORING_BATCH_MAX_SIZE", "16"))
+BATCH_MIN_WAIT = float(os.environ.get("SCORING_BATCH_MIN_WAIT", "0.002"))
+BATCH_MAX_WAIT = float(os.environ.get("SCORING_BATCH_MAX_WAIT", "0.05"))
+# Keep combined prompts well inside the model's context window
+BATCH_MAX_CHARS = int(os.environ.get("SCORING_BATCH_MAX_CHARS", "200000"))
+# Host batching service shared by all agent processes; empty batches in-process only
+SCORING_BATCH_URL = os.environ.get("SCORING_BATCH_URL", "http://127.0.0.1:3001")
+SCORING_BATCH_PORT = int(os.environ.get("SCORING_BATCH_PORT", "3001"))
+# After a failed connection, score in-process this long before trying the service again
+BATCH_SERVICE_RETRY = 30.0
+
+BATCH_HEADER = "You will receive several independent evaluation tasks."
+TASK_MARKER = "### TASK "
+
+
+def combine_prompts(prompts):
+    # Items built from the same template send its static prefix once, first, so the
+    # combined request still starts with a cacheable prefix
+    template = registry.match_prefix(prompts[0])
+    shared = template.prefix if template and all(p.startswith(template.prefix) for p in prompts) else ""
+    parts = [
+        shared + BATCH_HEADER,
+        f"Complete each of the {len(prompts)} tasks separately, following its own instructions.",
+        f"Return ONLY a JSON array with exactly {len(prompts)} elements, in task order, where each",
+        "element is the JSON object that task asks for. No markdown, no explanation.",
+    ]
+    if shared:
+        parts.append("Every task follows the instructions given before this paragraph.")
+    for i, prompt in enumerate(prompts, start=1):
+        parts.append(f"\n{TASK_MARKER}{i}\n{prompt[len(shared):]}")
+    return "\n".join(parts)
+
+
+def split_prompts(combined):
+    """Inverse of combine_prompts, used by stand-in models."""
+    shared = combined[:combined.index(BATCH_HEADER)]
+    chunks = combined.split(f"\n\n{TASK_MARKER}")[1:]
+    return [shared + (chunk.split("\n", 1)[1] if "\n" in chunk else "") for chunk in chunks]
+
+
+class _KindState:
+    def __init__(self):
+        self.items = []  # (prompt, future)
+        self.chars = 0
+        self.timer = None
+        self.wait = BATCH_MIN_WAIT
+        self.size_limit = BATCH_MAX_SIZE
+
+
+class BatchingModel:
+    """Collects same-kind prompts and sends them as multi-item requests."""
+
+    def __init__(self, model, max_size=BATCH_MAX_SIZE, min_wait=BATCH_MIN_WAIT,
+                 max_wait=BATCH_MAX_WAIT, max_chars=BATCH_MAX_CHARS):
+        self.model = model
+        self.max_size = max_size
+        self.min_wait = min_wait
+        self.max_wait = max_wait
+        self.max_chars = max_chars
+        self._kinds = {}
+        self.stats = {"items": 0, "requests": 0, "batches": 0, "fallbacks": 0}
+
+    @staticmethod
+    def kind_of(prompt):
+        return prompt.lstrip().split("\n", 1)[0]
+
+    def _state(self, kind):
+        state = self._kinds.get(kind)
+        if state is None:
+            state = self._kinds[kind] = _KindState()
+            state.wait = self.min_wait
+            state.size_limit = self.max_size
+        return state
+
+    async def generate(self, prompt):
+        loop = asyncio.get_running_loop()
+        kind = self.kind_of(prompt)
+        state = self._state(kind)
+        future = loop.create_future()
+        self.stats["items"] += 1
+
+        if state.items and state.chars + len(prompt) > self.max_chars:
+            self._flush(kind, by_timer=False)
+        state.items.append((prompt, future))
+        state.chars += len(prompt)
+
+        if len(state.items) >= state.size_limit:
+            self._flush(kind, by_timer=False)
+        elif state.timer is None:
+            state.timer = loop.call_later(state.wait, self._flush, kind, True)
+        return await future
+
+    def _flush(self, kind, by_timer):
+        state = self._kinds[kind]
+        if state.timer is not None:
+            state.timer.cancel()
+            state.timer = None
+        items, state.items, state.chars = state.items, [], 0
+        if not items:
+            return
+
+        # Adapt the window: widen it when waiting gathered company, narrow it when it didn't
+        if by_timer and len(items) > 1:
+            state.wait = min(self.max_wait, state.wait * 1.5)
+        elif by_timer:
+            state.wait = max(self.min_wait, state.wait / 2)
+        asyncio.ensure_future(self._dispatch(kind, items))
+
+    async def _dispatch(self, kind, items):
+        state = self._kinds[kind]
+        if len(items) == 1:
+            await self._run_single(*items[0])
+            return
+
+        self.stats["batches"] += 1
+        self.stats["requests"] += 1
+        try:
+            reply = await self.model.generate(combine_prompts([p for p, _ in items]))
+            results = parse_model_json(reply)
+            if not isinstance(results, list) or len(results) != len(items):
+                raise ValueError(f"expected {len(items)} results, got {type(results).__name__}")
+        except Exception as e:
+            log("BATCHER", f"Batch failed ({e}), retrying individually", level="warning", items=len(items))
+            self.stats["fallbacks"] += 1
+            state.size_limit = max(2, state.size_limit // 2)
+            await asyncio.gather(*(self._run_single(p, f) for p, f in items))
+            return
+
+        if len(items) >= state.size_limit:
+            state.size_limit = min(self.max_size, state.size_limit + 1)
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                # Callers parse model text, so hand back each element as JSON text
+                future.set_result(json.dumps(result))
+
+    async def _run_single(self, prompt, future):
+        self.stats["requests"] += 1
+        try:
+            result = await self.model.generate(prompt)
+            if not future.done():
+                future.set_result(result)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+
+
+class BatchClient:
+    """Sends scoring prompts to the host batching service (see serve)."""
+
+    def __init__(self, url=SCORING_BATCH_URL, fallback=None, retry_after=BATCH_SERVICE_RETRY, timeout=120):
+        self.url = url.rstrip("/")
+        self.fallback = fallback
+        self.retry_after = retry_after
+        self.timeout = timeout
+        self._session = None
+        self._session_loop = None
+        self._down_until = 0.0
+        self.stats = {"remote": 0, "fallback": 0}
+
+    async def _get_session(self):
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            import aiohttp
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._session_loop = loop
+        return self._session
+
+    async def generate(self, prompt):
+        import aiohttp
+        if time.monotonic() >= self._down_until:
+            try:
+                session = await self._get_session()
+                async with session.post(f"{self.url}/generate", json={"prompt": prompt}) as response:
+                    body = await response.json()
+                    if response.status != 200:
+                        # The model call itself failed; same as an unbatched call failing
+                        raise RuntimeError(body.get("error", f"batch service error ({response.status})"))
+                    self.stats["remote"] += 1
+                    return body["text"]
+            except aiohttp.ClientConnectionError as e:
+                self._down_until = time.monotonic() + self.retry_after
+                log("BATCHER", f"Batch service unreachable, batching in-process for {self.retry_after:.0f}s: {e}",
+                    level="warning")
+        self.stats["fallback"] += 1
+        return await self.fallback.generate(prompt)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+def serve(model, port=SCORING_BATCH_PORT):
+    """Run the host batching service in front of `model`."""
+    from aiohttp import web
+
+    batcher = BatchingModel(model)
+
+    async def generate(request):
+        try:
+            prompt = (await request.json())["prompt"]
+        except (ValueError, KeyError, TypeError):
+            return web.json_response({"error": "expected {\"prompt\": ...}"}, status=400)
+        if not isinstance(prompt, str):
+            return web.json_response({"error": "prompt must be a string"}, status=400)
+        try:
+            return web.json_response({"text": await batcher.generate(prompt)})
+        except Exception as e:
+            return web.json_response({"error": str(e)}, status=502)
+
+    async def stats(request):
+        return web.json_response(batcher.stats)
+
+    app = web.Application(client_max_size=BATCH_MAX_CHARS * 4)
+    app.router.add_post("/generate", generate)
+    app.router.add_get("/stats", stats)
+    log("BATCHER", f"Batch service listening on 127.0.0.1:{port}")
+    web.run_app(app, host="127.0.0.1", port=port, print=None)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Host batching service for scoring prompts")
+    parser.add_argument("--serve", action="store_true", help="run the service")
+    parser.add_argument("--port", type=int, default=SCORING_BATCH_PORT)
+    parser.add_argument("--model", choices=("gemini", "local"), default="gemini",
+                        help="'local' uses the deterministic stand-in model")
+    args = parser.parse_args()
+
+    import scoring
+    if args.model == "local":
+        backend = scoring.LocalModel()
+    else:
+        from dotenv import load_dotenv
+        load_dotenv(".env")
+        backend = scoring.GeminiModel(context_cache=scoring.GeminiContextCache())
+    if args.serve:
+        serve(backend, args.port)
+    else:
+        parser.print_help()
@@ -0,0 +1,197 @@
+"""
+Registry of versioned prompt templates with shared static prefixes.
+
+Each template is a static prefix (instructions, rubric, persona) followed by an
+optional dynamic part filled per call. Templates are registered once per
+process, so their version (a content hash) and estimated token count are
+computed up front.
+
+Because every call of a template starts with the same bytes, the prefix can be
+uploaded to the provider once and referenced afterwards. GeminiContextCache
+creates an explicit context cache per (model, template version) when the prefix
+is large enough for the provider to accept. Smaller prefixes are still sent
+first and byte-identical, which is what implicit prefix caching keys on.
+LocalContextCache is an in-memory stand-in that records uploads and reuses.
+
+The realtime interview instructions are registered too (`interview.<type>`).
+The realtime API accepts only plain instructions, so for those the registry
+provides the stable text and token accounting, not a cache handle.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from datetime import timedelta
+
+from log_sink import log
+from prompts import INTERVIEW_PROMPTS
+
+# Explicit context caches are rejected by the provider below this size
+MIN_CACHE_TOKENS = int(os.environ.get("PROMPT_CACHE_MIN_TOKENS", "1024"))
+PROMPT_CACHE_TTL = float(os.environ.get("PROMPT_CACHE_TTL", "3600"))
+
+
+def estimate_tokens(text):
+    # ~4 characters per token for English prose and code
+    return (len(text) + 3) // 4
+
+
+class PromptTemplate:
+    def __init__(self, name, prefix, template=""):
+        self.name = name
+        self.prefix = prefix
+        self.template = template
+        self.version = hashlib.sha256((prefix + "\0" + template).encode()).hexdigest()[:12]
+        self.prefix_tokens = estimate_tokens(prefix)
+
+    def render(self, **values):
+        return self.prefix + self.template.format(**values)
+
+
+class PromptRegistry:
+    def __init__(self):
+        self._templates = {}
+        # Longest prefixes first so the most specific template wins
+        self._by_prefix = []
+
+    def register(self, name, prefix, template=""):
+        existing = self._templates.get(name)
+        template_obj = PromptTemplate(name, prefix, template)
+        if existing is not None and existing.version == template_obj.version:
+            return existing
+        self._templates[name] = template_obj
+        self._by_prefix = sorted(self._templates.values(), key=lambda t: -len(t.prefix))
+        return template_obj
+
+    def get(self, name):
+        return self._templates[name]
+
+    def render(self, name, **values):
+        return self._templates[name].render(**values)
+
+    def match_prefix(self, prompt):
+        """The registered template whose static prefix `prompt` starts with, if any."""
+        for template in self._by_prefix:
+            if template.prefix and prompt.startswith(template.prefix):
+                return template
+        return None
+
+    def shared_prefix(self, names):
+        """Longest static prefix common to all the named templates."""
+        return os.path.commonprefix([self._templates[name].prefix for name in names])
+
+    def describe(self):
+        return {
+            name: {"version": t.version, "prefix_tokens": t.prefix_tokens}
+            for name, t in sorted(self._templates.items())
+        }
+
+
+class LocalCachedContent:
+    """What LocalContextCache hands out: the attributes GeminiModel uses of a CachedContent."""
+
+    def __init__(self, name, model, system_instruction):
+        self.name = name
+        self.model = model
+        self.system_instruction = system_instruction
+
+
+class LocalContextCache:
+    """In-memory stand-in for provider context caching; plugs into GeminiModel(context_cache=...)."""
+
+    def __init__(self, min_tokens=0):
+        self.min_tokens = min_tokens
+        self.handles = {}
+        self.stats = {"uploads": 0, "hits": 0, "prefix_tokens_saved": 0}
+
+    async def handle_for(self, model_name, template):
+        if template is None or template.prefix_tokens < self.min_tokens:
+            return None
+        key = (model_name, template.version)
+        if key in self.handles:
+            self.stats["hits"] += 1
+            self.stats["prefix_tokens_saved"] += template.prefix_tokens
+        else:
+            self.stats["uploads"] += 1
+            self.handles[key] = LocalCachedContent(
+                f"cachedContents/local-{template.name}-{template.version}", model_name, template.prefix
+            )
+        return self.handles[key]
+
+
+class GeminiContextCache:
+    """Creates one Gemini context cache per (model, template version) and reuses it.
+
+    The cache name is published in the host-wide shared cache, so other agent
+    processes attach to the existing cache instead of uploading the prefix again.
+    """
+
+    def __init__(self, min_tokens=MIN_CACHE_TOKENS, ttl=PROMPT_CACHE_TTL, shared=None):
+        from shared_cache import get_shared_cache
+        self.min_tokens = min_tokens
+        self.ttl = ttl
+        # Handle names are published host-wide so each prefix is uploaded once per host
+        self.shared = shared or get_shared_cache()
+        self._handles = {}  # key -> (cached_content, expires_at)
+        self._lock = threading.Lock()
+        self.stats = {"uploads": 0, "hits": 0, "prefix_tokens_saved": 0}
+
+    def _create(self, model_name, template):
+        from google.generativeai import caching
+        key = f"{model_name}:{template.version}"
+        published = self.shared.get("prompt_cache", key)
+        if published is not None and published["expires_at"] - time.time() > 60:
+            return caching.CachedContent.get(published["name"]), published["expires_at"]
+        cached = caching.CachedContent.create(
+            model=model_name if model_name.startswith("models/") else f"models/{model_name}",
+            display_name=f"{template.name}-{template.version}",
+            system_instruction=template.prefix,
+            ttl=timedelta(seconds=self.ttl),
+        )
+        expires_at = time.time() + self.ttl
+        self.shared.set("prompt_cache", key, {"name": cached.name, "expires_at": expires_at}, ttl=self.ttl)
+        self.stats["uploads"] += 1
+        log("PROMPTS", "Cached prefix", name=template.name, version=template.version, tokens=template.prefix_tokens)
+        return cached, expires_at
+
+    async def handle_for(self, model_name, template):
+        import asyncio
+
+        if template is None or template.prefix_tokens < self.min_tokens:
+            return None
+        key = (model_name, template.version)
+        with self._lock:
+            entry = self._handles.get(key)
+        # Refresh a little before the provider expires it
+        if entry is not None and entry[1] - time.time() > 60:
+            self.stats["hits"] += 1
+            self.stats["prefix_tokens_saved"] += template.prefix_tokens
+            return entry[0]
+        try:
+            cached, expires_at = await asyncio.to_thread(self._create, model_name, template)
+        except Exception as e:
+            log("PROMPTS", f"Context cache unavailable: {e}", level="warning", name=template.name)
+            return None
+        with self._lock:
+            self._handles[key] = (cached, expires_at)
+        return cached
+
+
+registry = PromptRegistry()
+
+for _interview_type, _instructions in INTERVIEW_PROMPTS.items():
+    registry.register(f"interview.{_interview_type}", _instructions)
+
+
+if __name__ == "__main__":
+    # Import through the module name so scoring registers into the same registry
+    import scoring  # noqa: F401
+    from prompt_registry import MIN_CACHE_TOKENS, estimate_tokens, registry
+
+    for name, info in registry.describe().items():
+        cacheable = "explicit cache" if info["prefix_tokens"] >= MIN_CACHE_TOKENS else "implicit only"
+        print(f"{name:28} v{info['version']}  {info['prefix_tokens']:5} tokens  {cacheable}")
+    interview = [name for name in registry.describe() if name.startswith("interview.")]
+    shared = registry.shared_prefix(interview)
+    print(f"\nShared prefix across {len(interview)} interview prompts: ~{estimate_tokens(shared)} tokens")
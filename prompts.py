@@ -106,37 +106,42 @@ DIRECT_SEGMENT = """
 # -------------------------------------------------------------------------
 
 # Standard roles use CORE + DOCUMENT_SEGMENT
-PROMPT_FRONTEND = CORE_IDENTITY + DOCUMENT_SEGMENT + """
+ROLE_FRONTEND = """
 ## ROLE CONTEXT: FRONTEND DEVELOPER
 - Focus Areas: React.js internals, DOM manipulation, CSS mastery, Performance optimization, Accessibility (a11y).
 - Questions: Ask 5 questions blending theory and practical scenarios (e.g., "How would you optimize a list with 10,000 items?").
 """
+PROMPT_FRONTEND = CORE_IDENTITY + DOCUMENT_SEGMENT + ROLE_FRONTEND
 
-PROMPT_BACKEND = CORE_IDENTITY + DOCUMENT_SEGMENT + """
+ROLE_BACKEND = """
 ## ROLE CONTEXT: BACKEND DEVELOPER
 - Focus Areas: Distributed Systems, Database design (SQL vs NoSQL), API Scalability, Concurrency, Caching strategies.
 - Questions: Focus on system design and architectural trade-offs.
 """
+PROMPT_BACKEND = CORE_IDENTITY + DOCUMENT_SEGMENT + ROLE_BACKEND
 
-PROMPT_FULLSTACK = CORE_IDENTITY + DOCUMENT_SEGMENT + """
+ROLE_FULLSTACK = """
 ## ROLE CONTEXT: FULL STACK DEVELOPER
 - Focus Areas: End-to-end architecture, Frontend-Backend communication, Database modeling, Deployment pipelines.
 - Questions: Test knowledge of connecting systems and data flow.
 """
+PROMPT_FULLSTACK = CORE_IDENTITY + DOCUMENT_SEGMENT + ROLE_FULLSTACK
 
-PROMPT_DEVOPS = CORE_IDENTITY + DOCUMENT_SEGMENT + """
+ROLE_DEVOPS = """
 ## ROLE CONTEXT: DEVOPS ENGINEER
 - Focus Areas: CI/CD, Containerization (Docker/K8s), Cloud Infrastructure (AWS/Azure), Infrastructure as Code (Terraform).
 """
+PROMPT_DEVOPS = CORE_IDENTITY + DOCUMENT_SEGMENT + ROLE_DEVOPS
 
-PROMPT_AIML = CORE_IDENTITY + DOCUMENT_SEGMENT + """
+ROLE_AIML = """
 ## ROLE CONTEXT: AI/ML ENGINEER
 - Focus Areas: Model Architectures (Transformers), Training pipelines, Inference optimization, RAG, Vector DBs.
 """
+PROMPT_AIML = CORE_IDENTITY + DOCUMENT_SEGMENT + ROLE_AIML
 
 # Specialized modes use CORE + DIRECT_SEGMENT (No docs)
 
-PROMPT_DSA = CORE_IDENTITY + DIRECT_SEGMENT + """
+ROLE_DSA = """
 ## ROLE CONTEXT: DATA STRUCTURES & ALGORITHMS (DSA)
 - **GOAL**: Assess raw problem-solving skills and algorithmic thinking.
 - **STRATEGY**:
@@ -145,8 +150,9 @@ PROMPT_DSA = CORE_IDENTITY + DIRECT_SEGMENT + """
   3. If they solve it, optimize it or ask a harder variant.
   4. Do NOT ask framework-specific questions (No React or Django). Pure logic only.
 """
+PROMPT_DSA = CORE_IDENTITY + DIRECT_SEGMENT + ROLE_DSA
 
-PROMPT_HACKATHON = CORE_IDENTITY + DIRECT_SEGMENT + """
+ROLE_HACKATHON = """
 ## ROLE CONTEXT: HACKATHON JUDGE
 - **GOAL**: Evaluate a project pitch and technical implementation.
 - **STRATEGY**:
@@ -155,25 +161,42 @@ PROMPT_HACKATHON = CORE_IDENTITY + DIRECT_SEGMENT + """
   3. Ask about the potential impact and future scalability.
   4. Be encouraging but critical of technical claims.
 """
+PROMPT_HACKATHON = CORE_IDENTITY + DIRECT_SEGMENT + ROLE_HACKATHON
 
-PROMPT_HR = CORE_IDENTITY + DIRECT_SEGMENT + """
+ROLE_HR = """
 ## ROLE CONTEXT: BEHAVIORAL / HR
 - **GOAL**: Assess culture fit and soft skills.
 - **STRATEGY**:
   - Ask behavioral questions (STAR method).
   - e.g., "Tell me about a time you had a conflict with a teammate."
 """
+PROMPT_HR = CORE_IDENTITY + DIRECT_SEGMENT + ROLE_HR
 
 # Default Fallback
-PROMPT_DEFAULT = CORE_IDENTITY + DOCUMENT_SEGMENT + """
+ROLE_DEFAULT = """
 ## ROLE CONTEXT: GENERAL SOFTWARE ENGINEER
 - Ask standard software engineering questions covering basic algorithms and system design concepts.
 """
+PROMPT_DEFAULT = CORE_IDENTITY + DOCUMENT_SEGMENT + ROLE_DEFAULT
 
 # -------------------------------------------------------------------------
 # EXPORT
 # -------------------------------------------------------------------------
 
+# Role text on its own, for features that tailor content to the role
+ROLE_CONTEXTS = {
+    "frontend": ROLE_FRONTEND,
+    "backend": ROLE_BACKEND,
+    "fullstack": ROLE_FULLSTACK,
+    "devops": ROLE_DEVOPS,
+    "aiml": ROLE_AIML,
+    "dsa": ROLE_DSA,
+    "hackathon": ROLE_HACKATHON,
+    "hr": ROLE_HR,
+    "general": ROLE_DEFAULT,
+    "default": ROLE_DEFAULT
+}
+
 INTERVIEW_PROMPTS = {
     "frontend": PROMPT_FRONTEND,
     "backend": PROMPT_BACKEND,
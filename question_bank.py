@@ -0,0 +1,875 @@
+"""
+Coding question bank for the coding round.
+
+Questions used to be hardcoded per track in the frontend. Now they live here,
+indexed by track, difficulty and tag, and the token server hands them out
+(GET /questions/next). Sampling is non-repeating per candidate: each candidate
+and filter gets its own pool of remaining question ids, and a draw is an O(1)
+swap-and-pop from that pool. A candidate sees a question again only after
+they have seen every other question that matches the filter.
+
+Each question declares the complexity of a good solution (`rank`), and the
+code analysis prompt gives it to the model as the reference to score
+efficiency against. Candidate code is never executed on the agent host. For
+questions measured per input, a static complexity estimate of the submission
+(loop nesting, linear scans inside loops, sorting) replaces the model's
+efficiency score; design questions and recursive code keep the model's score
+(see apply_efficiency_baseline). Measured runtimes do not enter the score.
+There is no measurement of the candidate's code to compare them with.
+
+Each question also has a reference solution in Python with a workload
+generator. `python question_bank.py --build` times the references at a few
+input sizes and writes the runtimes and fitted growth exponent to
+question_baselines.json. It warns when a reference doesn't scale as its
+declared rank says, so the declared baselines stay honest.
+"""
+
+import bisect
+import heapq
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+
+BASELINES_PATH = os.environ.get(
+    "QUESTION_BASELINES_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "question_baselines.json")
+)
+# Per-candidate sampling state kept in memory; the least recently seen candidates are forgotten first
+MAX_TRACKED_CANDIDATES = int(os.environ.get("QUESTION_BANK_MAX_CANDIDATES", "10000"))
+BASELINE_SIZES = (1000, 10000, 100000)
+
+# Tracks without their own coding questions draw from general algorithm questions
+TRACK_FALLBACK = {"default": "dsa", "general": "dsa", "hr": "dsa", "hackathon": "fullstack"}
+
+# Complexity classes by rank, so classes can be compared numerically
+COMPLEXITY_LABELS = {0: "O(1)", 0.5: "O(log n)", 1: "O(n)", 1.5: "O(n log n)", 2: "O(n^2)", 2.5: "O(n^2 log n)"}
+
+
+def complexity_label(rank):
+    return COMPLEXITY_LABELS.get(rank, f"O(n^{rank:g})")
+
+
+# ===== REFERENCE SOLUTIONS =====
+# Each reference takes the output of its workload generator for input size n.
+
+def _debounce_workload(n):
+    rng = random.Random(n)
+    t, calls = 0, []
+    for i in range(n):
+        t += rng.choice((10, 40, 150))
+        calls.append((t, i))
+    return calls, 100
+
+
+def _debounce(args):
+    calls, wait = args
+    fired, pending, deadline = [], None, None
+    for t, value in calls:
+        if pending is not None and t >= deadline:
+            fired.append(pending)
+        pending, deadline = value, t + wait
+    if pending is not None:
+        fired.append(pending)
+    return fired
+
+
+def _dom_workload(n):
+    rng = random.Random(n)
+    nodes = [{"class": "root", "children": []}]
+    for _ in range(n - 1):
+        node = {"class": rng.choice(("active", "item", "row")), "children": []}
+        rng.choice(nodes)["children"].append(node)
+        nodes.append(node)
+    return nodes[0], "active"
+
+
+def _find_by_class(args):
+    root, class_name = args
+    found, stack = [], [root]
+    while stack:
+        node = stack.pop()
+        if node["class"] == class_name:
+            found.append(node)
+        stack.extend(node["children"])
+    return found
+
+
+def _requests_workload(n):
+    rng = random.Random(n)
+    t, times = 0.0, []
+    for _ in range(n):
+        t += rng.random()
+        times.append(t)
+    return times, 50, 60.0
+
+
+def _rate_limiter(args):
+    times, limit, window = args
+    log, allowed = deque(), 0
+    for t in times:
+        while log and log[0] <= t - window:
+            log.popleft()
+        if len(log) < limit:
+            log.append(t)
+            allowed += 1
+    return allowed
+
+
+def _messages_workload(n):
+    rng = random.Random(n)
+    return [(rng.randrange(50), f"m{i}") for i in range(n)]
+
+
+def _message_queue(messages):
+    queues, delivered = {}, 0
+    for user, message in messages:
+        queues.setdefault(user, deque()).append(message)
+        # The recipient acknowledges in order, so the head is removed once delivered
+        if len(queues[user]) > 8:
+            queues[user].popleft()
+            delivered += 1
+    return delivered + sum(len(q) for q in queues.values())
+
+
+def _two_sum_workload(n):
+    rng = random.Random(n)
+    # The pair is at the very end, so a solution has to scan the whole array
+    nums = [rng.randrange(10 * n) for _ in range(n - 2)] + [-1, -2]
+    return nums, -3
+
+
+def _two_sum(args):
+    nums, target = args
+    seen = {}
+    for i, x in enumerate(nums):
+        if target - x in seen:
+            return [seen[target - x], i]
+        seen[x] = i
+    return []
+
+
+def _intervals_workload(n):
+    rng = random.Random(n)
+    intervals = []
+    for _ in range(n):
+        start = rng.randrange(10 * n)
+        intervals.append([start, start + rng.randrange(1, 20)])
+    return intervals
+
+
+def _merge_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _lru_workload(n):
+    rng = random.Random(n)
+    return 100, [(rng.random() < 0.5, rng.randrange(300)) for _ in range(n)]
+
+
+def _lru_cache(args):
+    capacity, operations = args
+    cache, hits = OrderedDict(), 0
+    for is_put, key in operations:
+        if is_put:
+            cache[key] = key
+            cache.move_to_end(key)
+            if len(cache) > capacity:
+                cache.popitem(last=False)
+        elif key in cache:
+            cache.move_to_end(key)
+            hits += 1
+    return hits
+
+
+def _numbers_workload(n):
+    rng = random.Random(n)
+    return [rng.randrange(1000000) for _ in range(n)], 10
+
+
+def _top_k(args):
+    values, k = args
+    return heapq.nlargest(k, values)
+
+
+def _flatten_workload(n):
+    rng = random.Random(n)
+    nodes = [{}]
+    for i in range(n):
+        parent = rng.choice(nodes)
+        if rng.random() < 0.2:
+            child = {}
+            parent[f"k{i}"] = child
+            nodes.append(child)
+        else:
+            parent[f"k{i}"] = i
+    return nodes[0]
+
+
+def _flatten(obj):
+    flat, stack = {}, [("", obj)]
+    while stack:
+        prefix, value = stack.pop()
+        for key, item in value.items():
+            path = f"{prefix}.{key}" if prefix else key
+            if isinstance(item, dict):
+                stack.append((path, item))
+            else:
+                flat[path] = item
+    return flat
+
+
+def _endpoints_workload(n):
+    rng = random.Random(n)
+    return [f"GET /api/v1/items/{rng.randrange(200)} 200" for _ in range(n)], 5
+
+
+def _top_endpoints(args):
+    lines, k = args
+    counts = Counter(line.split(" ", 2)[1] for line in lines)
+    return heapq.nlargest(k, counts.items(), key=lambda item: item[1])
+
+
+def _vectors_workload(n):
+    rng = random.Random(n)
+    dim = 16
+    return [rng.random() for _ in range(dim)], [[rng.random() for _ in range(dim)] for _ in range(n)], 5
+
+
+def _cosine_top_k(args):
+    query, vectors, k = args
+    query_norm = math.sqrt(sum(q * q for q in query))
+
+    def similarity(v):
+        return sum(a * b for a, b in zip(query, v)) / (query_norm * math.sqrt(sum(x * x for x in v)))
+    return heapq.nlargest(k, range(len(vectors)), key=lambda i: similarity(vectors[i]))
+
+
+def _labels_workload(n):
+    rng = random.Random(n)
+    return [(rng.randrange(3), rng.randrange(3)) for _ in range(n)], 3
+
+
+def _confusion_matrix(args):
+    pairs, classes = args
+    matrix = [[0] * classes for _ in range(classes)]
+    for actual, predicted in pairs:
+        matrix[actual][predicted] += 1
+    return matrix
+
+
+def _log_lines_workload(n):
+    rng = random.Random(n)
+    levels = ("INFO", "WARN", "ERROR", "DEBUG")
+    return [f"2024-05-01T10:00:00Z {rng.choice(levels)} service started worker {i}" for i in range(n)]
+
+
+def _level_counts(lines):
+    counts = {}
+    for line in lines:
+        parts = line.split(" ", 2)
+        if len(parts) > 1:
+            counts[parts[1]] = counts.get(parts[1], 0) + 1
+    return counts
+
+
+def _pages_workload(n):
+    return list(range(0, 2 * n, 2)), [(i * 7) % (2 * n) for i in range(n)], 20
+
+
+def _cursor_pages(args):
+    ids, cursors, page_size = args
+    pages = 0
+    for cursor in cursors:
+        start = bisect.bisect_right(ids, cursor)
+        pages += len(ids[start:start + page_size]) > 0
+    return pages
+
+
+# ===== QUESTIONS =====
+# `rank` is the expected complexity of the solution code in terms of its input:
+# per call for design questions, per input otherwise (see COMPLEXITY_LABELS).
+# Workloads of design questions ("per ..." units) make n calls.
+
+QUESTIONS = [
+    {
+        "id": "fe-debounce",
+        "track": "frontend", "difficulty": "medium", "tags": ["timers", "closures"],
+        "title": "Debounce Function - Medium",
+        "description": "Implement a debounce function that delays invoking func until after wait milliseconds have elapsed since the last time the debounced function was invoked.",
+        "examples": [
+            {"input": 'debounce(console.log, 100)("hello")', "output": 'logs "hello" after 100ms', "explanation": "Function is called after delay"}
+        ],
+        "constraints": ["0 ≤ wait ≤ 1000", "func is a valid function"],
+        "rank": 0, "unit": "per call", "reference": (_debounce, _debounce_workload),
+    },
+    {
+        "id": "fe-dom-finder",
+        "track": "frontend", "difficulty": "easy", "tags": ["dom", "traversal"],
+        "title": "DOM Element Finder - Easy",
+        "description": "Write a function that finds all elements with a specific class name and returns them as an array.",
+        "examples": [
+            {"input": 'findByClass("active")', "output": '[<div class="active">, <span class="active">]', "explanation": "Returns array of matching elements"}
+        ],
+        "constraints": ["className is a valid string", "Return empty array if no matches"],
+        "rank": 1, "unit": "elements", "reference": (_find_by_class, _dom_workload),
+    },
+    {
+        "id": "fe-flatten-object",
+        "track": "frontend", "difficulty": "easy", "tags": ["recursion", "objects"],
+        "title": "Flatten Nested Object - Easy",
+        "description": "Write a function that flattens a nested object into a single-level object whose keys are dot-separated paths.",
+        "examples": [
+            {"input": "flatten({a: {b: 1}, c: 2})", "output": '{"a.b": 1, "c": 2}', "explanation": "Nested keys are joined with dots"}
+        ],
+        "constraints": ["Values are numbers, strings or plain objects", "Up to 10^5 keys in total"],
+        "rank": 1, "unit": "keys", "reference": (_flatten, _flatten_workload),
+    },
+    {
+        "id": "be-rate-limiter",
+        "track": "backend", "difficulty": "hard", "tags": ["design", "queues", "sliding-window"],
+        "title": "Rate Limiter - Hard",
+        "description": "Design a rate limiter that allows at most N requests per time window.",
+        "examples": [
+            {"input": "RateLimiter(3, 60)", "output": "true/false for each request", "explanation": "Returns false when limit exceeded"}
+        ],
+        "constraints": ["1 ≤ N ≤ 1000", "1 ≤ window ≤ 3600"],
+        "rank": 0, "unit": "per request (amortized)", "reference": (_rate_limiter, _requests_workload),
+    },
+    {
+        "id": "be-top-endpoints",
+        "track": "backend", "difficulty": "medium", "tags": ["hash-map", "heap", "logs"],
+        "title": "Top K Endpoints - Medium",
+        "description": "Given access log lines of the form \"METHOD PATH STATUS\", return the k most requested paths with their counts.",
+        "examples": [
+            {"input": 'topEndpoints(["GET /a 200", "GET /b 200", "GET /a 500"], 1)', "output": '[["/a", 2]]', "explanation": "/a was requested twice"}
+        ],
+        "constraints": ["1 ≤ lines.length ≤ 10^6", "1 ≤ k ≤ 100"],
+        "rank": 1, "unit": "log lines", "reference": (_top_endpoints, _endpoints_workload),
+    },
+    {
+        "id": "fs-message-queue",
+        "track": "fullstack", "difficulty": "hard", "tags": ["design", "queues", "ordering"],
+        "title": "Real-time Message Queue - Hard",
+        "description": "Design a message queue system that handles real-time chat messages with guaranteed delivery.",
+        "examples": [
+            {"input": "MessageQueue with user1 sending to user2", "output": "Messages delivered in order", "explanation": "FIFO guarantee"}
+        ],
+        "constraints": ["Handle network failures", "Maintain message ordering"],
+        "rank": 0, "unit": "per message", "reference": (_message_queue, _messages_workload),
+    },
+    {
+        "id": "fs-cursor-pagination",
+        "track": "fullstack", "difficulty": "medium", "tags": ["pagination", "binary-search"],
+        "title": "Cursor Pagination - Medium",
+        "description": "Given a sorted array of record ids, return the page of pageSize ids that comes after a cursor id, plus the cursor for the next page.",
+        "examples": [
+            {"input": "page([2, 4, 6, 8], 4, 2)", "output": "{ items: [6, 8], next: null }", "explanation": "Items after id 4; no further page"}
+        ],
+        "constraints": ["ids are sorted and unique", "1 ≤ ids.length ≤ 10^6"],
+        "rank": 0.5, "unit": "per page", "reference": (_cursor_pages, _pages_workload),
+    },
+    {
+        "id": "dsa-two-sum",
+        "track": "dsa", "difficulty": "easy", "tags": ["hash-map", "arrays"],
+        "title": "Two Sum - Easy",
+        "description": "Given an array of integers and a target, return the indices of the two numbers that add up to the target.",
+        "examples": [
+            {"input": "twoSum([2, 7, 11, 15], 9)", "output": "[0, 1]", "explanation": "2 + 7 = 9"}
+        ],
+        "constraints": ["2 ≤ nums.length ≤ 10^5", "Exactly one solution exists"],
+        "rank": 1, "unit": "elements", "reference": (_two_sum, _two_sum_workload),
+    },
+    {
+        "id": "dsa-merge-intervals",
+        "track": "dsa", "difficulty": "medium", "tags": ["sorting", "intervals"],
+        "title": "Merge Intervals - Medium",
+        "description": "Given an array of intervals [start, end], merge all overlapping intervals and return the result sorted by start.",
+        "examples": [
+            {"input": "merge([[1, 3], [2, 6], [8, 10]])", "output": "[[1, 6], [8, 10]]", "explanation": "[1, 3] and [2, 6] overlap"}
+        ],
+        "constraints": ["1 ≤ intervals.length ≤ 10^5", "start ≤ end"],
+        "rank": 1.5, "unit": "intervals", "reference": (_merge_intervals, _intervals_workload),
+    },
+    {
+        "id": "dsa-lru-cache",
+        "track": "dsa", "difficulty": "medium", "tags": ["design", "hash-map", "linked-list"],
+        "title": "LRU Cache - Medium",
+        "description": "Design a cache with a fixed capacity that supports get and put, evicting the least recently used key when full.",
+        "examples": [
+            {"input": "cache = LRUCache(2); put(1, 1); put(2, 2); get(1); put(3, 3); get(2)", "output": "1, -1", "explanation": "Key 2 was least recently used when 3 was added"}
+        ],
+        "constraints": ["1 ≤ capacity ≤ 3000", "get and put must run in O(1)"],
+        "rank": 0, "unit": "per operation", "reference": (_lru_cache, _lru_workload),
+    },
+    {
+        "id": "dsa-kth-largest",
+        "track": "dsa", "difficulty": "medium", "tags": ["heap", "arrays"],
+        "title": "K Largest Elements - Medium",
+        "description": "Return the k largest numbers of an unsorted array, largest first.",
+        "examples": [
+            {"input": "kLargest([3, 1, 5, 12, 2, 11], 3)", "output": "[12, 11, 5]", "explanation": "The three largest values"}
+        ],
+        "constraints": ["1 ≤ k ≤ nums.length ≤ 10^6"],
+        "rank": 1, "unit": "elements (k small)", "reference": (_top_k, _numbers_workload),
+    },
+    {
+        "id": "ml-cosine-top-k",
+        "track": "aiml", "difficulty": "medium", "tags": ["vectors", "heap", "similarity"],
+        "title": "Nearest Embeddings - Medium",
+        "description": "Given a query vector and a list of embedding vectors, return the indices of the k vectors with the highest cosine similarity to the query.",
+        "examples": [
+            {"input": "nearest([1, 0], [[1, 0], [0, 1], [1, 1]], 2)", "output": "[0, 2]", "explanation": "Similarities are 1, 0 and 0.71"}
+        ],
+        "constraints": ["All vectors have the same dimension", "1 ≤ k ≤ vectors.length ≤ 10^5"],
+        "rank": 1, "unit": "vectors", "reference": (_cosine_top_k, _vectors_workload),
+    },
+    {
+        "id": "ml-confusion-matrix",
+        "track": "aiml", "difficulty": "easy", "tags": ["metrics", "arrays"],
+        "title": "Confusion Matrix - Easy",
+        "description": "Given arrays of actual and predicted class labels, build the confusion matrix and return it together with overall accuracy.",
+        "examples": [
+            {"input": "confusion([0, 1, 1], [0, 1, 0], 2)", "output": "{ matrix: [[1, 0], [1, 1]], accuracy: 0.67 }", "explanation": "Two of three predictions are correct"}
+        ],
+        "constraints": ["Labels are integers in [0, classes)", "1 ≤ length ≤ 10^6"],
+        "rank": 1, "unit": "predictions", "reference": (_confusion_matrix, _labels_workload),
+    },
+    {
+        "id": "ops-log-levels",
+        "track": "devops", "difficulty": "easy", "tags": ["parsing", "hash-map", "logs"],
+        "title": "Log Level Counter - Easy",
+        "description": "Given log lines of the form \"TIMESTAMP LEVEL message\", count how many lines there are per level.",
+        "examples": [
+            {"input": 'countLevels(["t INFO a", "t ERROR b", "t INFO c"])', "output": '{"INFO": 2, "ERROR": 1}', "explanation": "Two INFO lines and one ERROR line"}
+        ],
+        "constraints": ["1 ≤ lines.length ≤ 10^6", "Malformed lines are skipped"],
+        "rank": 1, "unit": "log lines", "reference": (_level_counts, _log_lines_workload),
+    },
+]
+
+
+# ===== REFERENCE BASELINES =====
+
+def measure_reference(question, sizes=BASELINE_SIZES, repeats=3):
+    """Time the reference solution at each input size (best of `repeats`)."""
+    solve, workload = question["reference"]
+    runtimes = {}
+    for n in sizes:
+        data = workload(n)
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            solve(data)
+            best = min(best, time.perf_counter() - start)
+        runtimes[str(n)] = round(best * 1000, 3)
+    # Growth exponent from the smallest to the largest size, on a log-log scale
+    first, last = runtimes[str(sizes[0])], runtimes[str(sizes[-1])]
+    exponent = math.log(max(last, 1e-6) / max(first, 1e-6)) / math.log(sizes[-1] / sizes[0])
+    return {"runtimes_ms": runtimes, "growth_exponent": round(exponent, 2)}
+
+
+def expected_growth(question):
+    """Polynomial degree the reference workload should show for the declared rank.
+
+    Log factors barely move a fit over two decades, so only the degree is checked.
+    """
+    calls = 1 if question["unit"].startswith("per ") else 0
+    return math.floor(question["rank"]) + calls
+
+
+def build_baselines(path=BASELINES_PATH):
+    baselines = {}
+    for question in QUESTIONS:
+        measured = measure_reference(question)
+        baselines[question["id"]] = {
+            "complexity": complexity_label(question["rank"]),
+            "rank": question["rank"],
+            "unit": question["unit"],
+            **measured,
+        }
+        print(f"[QUESTIONS] {question['id']:22} {baselines[question['id']]['complexity']:11} "
+              f"{measured['runtimes_ms']} growth {measured['growth_exponent']}")
+        if abs(measured["growth_exponent"] - expected_growth(question)) > 0.5:
+            print(f"[QUESTIONS] WARNING {question['id']}: reference grows like n^{measured['growth_exponent']}, "
+                  f"declared {complexity_label(question['rank'])} {question['unit']} expects n^{expected_growth(question)}")
+    with open(path, "w") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+    return baselines
+
+
+def load_baselines(path=BASELINES_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        print(f"[QUESTIONS] No baselines at {path}; run `python question_bank.py --build`")
+        return {}
+
+
+# ===== STATIC COMPLEXITY ESTIMATE =====
+
+# Loop statements, and do-while heads
+_LOOP_STATEMENT = re.compile(r"(for|while|do)\b")
+# Loops written inline: comprehensions and array callbacks (the callback is the bracket that follows)
+_INLINE_LOOP = re.compile(r"\bfor\b|\.(?:forEach|map|filter|reduce|some|every|find|findIndex|flatMap)\s*\(")
+_LINEAR_SCAN = re.compile(r"\.(?:indexOf|lastIndexOf|includes|splice|shift|unshift|index|remove)\s*\(|\.pop\(\s*0\s*\)"
+                          r"|\.insert\(\s*0\s*,|\b(?:nlargest|nsmallest|heapify)\s*\(")
+_LOG_SEARCH = re.compile(r"\bbisect(?:_left|_right)?\s*\(|\bbinarySearch\s*\(|\bheap(?:push|pop|replace)\s*\(")
+_SORT = re.compile(r"\.sort\s*\(|\bsorted\s*\(")
+_CONSTRUCT = re.compile("|".join(f"(?P<{name}>{pattern.pattern})" for name, pattern in (
+    ("loop", _INLINE_LOOP), ("scan", _LINEAR_SCAN), ("log", _LOG_SEARCH), ("sort", _SORT))))
+_CONSTRUCT_COST = {"loop": 1, "scan": 1, "log": 0.5, "sort": 1.5}
+# `while (lo <= hi)` halves its range every pass
+_BISECT_CONDITION = re.compile(r"^\(?\s*(?:lo|low|left|l|start)\s*<=?\s*(?:hi|high|right|r|end)\b")
+# A loop body that only drops an element: amortized against the inserts, so no extra level
+_EVICTION = re.compile(r"^\{?\s*(?:del\s+[\w.\[\]]+|[\w.\[\]]+\.(?:shift|popleft|popitem|pop|delete)\([^;]*\))\s*;?\s*\}?$")
+# A loop body that starts by taking the next item off the container it loops on
+_WORKLIST = re.compile(r"^\{?\s*(?:(?:const|let|var)\s+)?[\w\[\], ]+=\s*(\w+)\.(?:pop|popleft|shift)\(\s*\)")
+_FUNCTION = re.compile(
+    r"^\s*(?:async\s+)?(?:def|function)\s*\*?\s*(\w+)\s*\("
+    r"|^\s*(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?(?:function\b|\([^)]*\)\s*=>|\w+\s*=>)"
+    r"|^\s*(?:static\s+|async\s+)*(\w+)\s*\([^)]*\)\s*\{"
+)
+_NOT_FUNCTIONS = {"if", "for", "while", "switch", "catch", "with", "return", "function"}
+_COMMENTS = re.compile(r"/\*.*?\*/|//[^\n]*|#[^\n]*", re.S)
+_STRINGS = re.compile(r"'(?:\\.|[^'\\\n])*'|\"(?:\\.|[^\"\\\n])*\"|`(?:\\.|[^`\\])*`")
+_BRACKETS = {"(": ")", "[": "]", "{": "}"}
+_DO_WHILE_TAIL = re.compile(r"^\}\s*while\b.*;$")
+# Rank a while loop adds, by the kind _loop_kind finds
+_LOOP_WEIGHT = {"loop": 1, "bisect": 0.5, "eviction": 0, "worklist": 1}
+
+
+def _closing(text, start):
+    """Index just past the bracket opened at `start`, or len(text) if it spans lines."""
+    depth = 0
+    for i in range(start, len(text)):
+        if text[i] in _BRACKETS:
+            depth += 1
+        elif text[i] in _BRACKETS.values():
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return len(text)
+
+
+def _split_statement(text):
+    """Split a line into (keyword, header, body) if it starts a loop, else (None, "", text)."""
+    match = _LOOP_STATEMENT.match(text)
+    if not match:
+        return None, "", text
+    keyword, rest = match.group(1), text[match.end():]
+    offset = len(text) - len(rest.lstrip())
+    if keyword == "do":
+        return keyword, "", text[offset:]
+    if text[offset:offset + 1] == "(":
+        end = _closing(text, offset)
+        return keyword, text[offset:end], text[end:]
+    # Python: the header runs to the colon outside brackets
+    depth = 0
+    for i in range(offset, len(text)):
+        if text[i] in _BRACKETS:
+            depth += 1
+        elif text[i] in _BRACKETS.values():
+            depth -= 1
+        elif text[i] == ":" and depth == 0:
+            return keyword, text[offset:i], text[i + 1:]
+    return keyword, text[offset:], ""
+
+
+def _recurses(lines, braces):
+    """Whether any function calls itself. Depth and branching of recursion aren't visible to a line scan."""
+    for i, line in enumerate(lines):
+        match = _FUNCTION.match(line)
+        name = match and next(g for g in match.groups() if g)
+        if not name or name in _NOT_FUNCTIONS:
+            continue
+        body = [line[match.end():]]
+        if braces:
+            depth = line.count("{") - line.count("}")
+            for following in lines[i + 1:]:
+                if depth <= 0:
+                    break
+                body.append(following)
+                depth += following.count("{") - following.count("}")
+        else:
+            indent = len(line) - len(line.lstrip())
+            for following in lines[i + 1:]:
+                if len(following) - len(following.lstrip()) <= indent:
+                    break
+                body.append(following)
+        call = re.compile(rf"(?<![\w.]){name}\s*\(|\b(?:this|self)\.{name}\s*\(")
+        if call.search("\n".join(body)):
+            return True
+    return False
+
+
+def _loop_kind(keyword, header, body, next_line):
+    """Classify a while loop from its condition and first body statement."""
+    if keyword != "while":
+        return "loop"
+    condition = header.strip()
+    first = body.strip(" {") or next_line.strip()
+    if _BISECT_CONDITION.match(condition):
+        return "bisect"
+    if _EVICTION.match(first):
+        return "eviction"
+    worklist = _WORKLIST.match(first)
+    if worklist and re.search(rf"\b{worklist.group(1)}\b", condition):
+        return "worklist"
+    return "loop"
+
+
+def _line_cost(text, base, keyword, body, weight, in_worklist, exempt_scans):
+    """Highest rank reached on one line, and the loop weight owning a block it opens."""
+    body_start = len(text) - len(body)
+    worst = base + weight
+    block = 0
+    owned = []  # loop weight owned by each open bracket
+    constructs = {m.start(): m for m in _CONSTRUCT.finditer(text) if not (keyword and m.start() == 0)}
+    i = 0
+    while i < len(text):
+        # A for header runs once; a while condition runs on every pass
+        inside = weight if keyword and (i >= body_start or keyword == "while") else 0
+        match = constructs.get(i)
+        if match:
+            kind = match.lastgroup
+            cost = 0 if kind == "loop" and in_worklist else _CONSTRUCT_COST[kind]
+            if not (kind == "scan" and exempt_scans):
+                worst = max(worst, base + inside + sum(owned) + cost)
+            if kind == "loop":
+                if match.group().endswith("("):
+                    # The callback is the bracket this match opens
+                    owned.append(cost)
+                    i = match.end()
+                    continue
+                if owned:
+                    # A comprehension loops over the rest of its bracket
+                    owned[-1] += cost
+        char = text[i]
+        if char in _BRACKETS:
+            if char == "{":
+                block = inside + sum(owned)
+            owned.append(0)
+        elif char in _BRACKETS.values() and owned:
+            owned.pop()
+        i += 1
+    return worst, block
+
+
+def estimate_complexity(code):
+    """Rough complexity rank of `code` from loop nesting, or None if it can't be estimated.
+
+    Handles brace languages (JavaScript) by brace depth, including loops whose body
+    is a single statement without braces, and Python by indentation. Linear scans
+    such as includes/indexOf count as a loop, binary search adds a log factor and
+    sorting an n log n pass. A while loop that only evicts (`log.shift()` while the
+    head is stale) is amortized and adds nothing; loops over items taken off a
+    worklist (`while stack: node = stack.pop()`) share that worklist's level.
+    Recursive code returns None, since its cost depends on branching and depth.
+    """
+    code = _COMMENTS.sub("", _STRINGS.sub('""', code or ""))
+    lines = [line for line in code.splitlines() if line.strip()]
+    if not lines:
+        return None
+    braces = "{" in code
+    if _recurses(lines, braces):
+        return None
+    # (depth or indent, weight, worklist)
+    stack, depth, worst, pending, exempt = [], 0, 0, [], None
+    for index, line in enumerate(lines):
+        indent = len(line) - len(line.lstrip())
+        if braces:
+            while stack and depth < stack[-1][0]:
+                stack.pop()
+        else:
+            while stack and indent <= stack[-1][0]:
+                stack.pop()
+        text = line.strip()
+        do_while_tail = braces and _DO_WHILE_TAIL.match(text)
+        keyword, header, body = _split_statement(text.lstrip("}").lstrip() if do_while_tail else text)
+        if do_while_tail:
+            keyword = None
+        in_worklist = any(entry[2] for entry in stack)
+        kind = None
+        if keyword:
+            next_line = lines[index + 1] if index + 1 < len(lines) else ""
+            kind = _loop_kind(keyword, header, body, next_line)
+            weight = 0 if in_worklist else _LOOP_WEIGHT[kind]
+            if kind in ("eviction", "worklist"):
+                # Taking the head off a queue here is part of the amortized pattern
+                exempt = index if body.strip(" {") else index + 1
+        else:
+            weight = 0
+        base = sum(entry[1] for entry in stack) + sum(pending)
+        rank, block = _line_cost(text, base, keyword, body, weight, in_worklist, exempt == index)
+        worst = max(worst, rank)
+        if braces:
+            depth += line.count("{") - line.count("}")
+            if line.count("{") > line.count("}"):
+                # The block belongs to this line's loops and to any brace-less loops around it
+                stack.extend((depth, w, False) for w in pending)
+                stack.append((depth, block, kind == "worklist"))
+                pending = []
+            elif keyword and not body.strip():
+                pending.append(weight)
+            elif text != "}":
+                pending = []
+            while stack and depth < stack[-1][0]:
+                stack.pop()
+        elif keyword and not body.strip():
+            stack.append((indent, weight, kind == "worklist"))
+    return worst
+
+
+def efficiency_score(estimated_rank, baseline_rank):
+    gap = estimated_rank - baseline_rank
+    if gap <= 0:
+        return 95
+    if gap <= 0.5:
+        return 80
+    if gap <= 1:
+        return 55
+    if gap <= 1.5:
+        return 40
+    return 25
+
+
+class QuestionBank:
+    """Questions indexed by track, difficulty and tag with per-candidate sampling."""
+
+    def __init__(self, questions=QUESTIONS, baselines=None, max_candidates=MAX_TRACKED_CANDIDATES):
+        self.questions = {q["id"]: q for q in questions}
+        self.baselines = load_baselines() if baselines is None else baselines
+        self.max_candidates = max_candidates
+        self.by_track, self.by_difficulty, self.by_tag = {}, {}, {}
+        for q in questions:
+            self.by_track.setdefault(q["track"], []).append(q["id"])
+            self.by_difficulty.setdefault(q["difficulty"], []).append(q["id"])
+            for tag in q["tags"]:
+                self.by_tag.setdefault(tag, []).append(q["id"])
+        self._pools = {}  # (track, difficulty, tag) -> matching ids
+        self._remaining = OrderedDict()  # (candidate, filter key) -> ids not yet drawn this cycle
+        self._lock = threading.Lock()
+        self._rng = random.Random()
+
+    def get(self, question_id):
+        return self.questions.get(question_id)
+
+    def baseline(self, question_id):
+        question = self.questions.get(question_id)
+        if question is None:
+            return None
+        measured = self.baselines.get(question_id, {})
+        return {"complexity": complexity_label(question["rank"]), "rank": question["rank"],
+                "unit": question["unit"], **{k: v for k, v in measured.items() if k not in ("complexity", "rank", "unit")}}
+
+    def _pool(self, track, difficulty, tag):
+        key = (track, difficulty, tag)
+        pool = self._pools.get(key)
+        if pool is None:
+            track_ids = self.by_track.get(track) or self.by_track.get(TRACK_FALLBACK.get(track, "dsa"), [])
+            ids = set(track_ids)
+            if difficulty:
+                ids &= set(self.by_difficulty.get(difficulty, []))
+            if tag:
+                ids &= set(self.by_tag.get(tag, []))
+            # Keep bank order so pools are deterministic
+            pool = self._pools[key] = [qid for qid in track_ids if qid in ids]
+        return pool
+
+    def sample(self, candidate, track, difficulty=None, tag=None):
+        """Draw a question the candidate hasn't seen this cycle, or None if nothing matches."""
+        with self._lock:
+            pool = self._pool(track, difficulty, tag)
+            if not pool:
+                return None
+            key = (candidate, track, difficulty, tag)
+            remaining = self._remaining.get(key)
+            if not remaining:
+                remaining = list(pool)
+            self._remaining[key] = remaining
+            self._remaining.move_to_end(key)
+            while len(self._remaining) > self.max_candidates:
+                self._remaining.popitem(last=False)
+            # Swap a random remaining id to the end and pop it
+            i = self._rng.randrange(len(remaining))
+            remaining[i], remaining[-1] = remaining[-1], remaining[i]
+            return self.questions[remaining.pop()]
+
+    def index(self):
+        return {
+            "tracks": {k: len(v) for k, v in self.by_track.items()},
+            "difficulties": {k: len(v) for k, v in self.by_difficulty.items()},
+            "tags": {k: len(v) for k, v in self.by_tag.items()},
+        }
+
+
+def public_question(question):
+    """The fields the candidate sees; reference solutions and baselines stay server-side."""
+    return {k: question[k] for k in ("id", "track", "difficulty", "tags", "title", "description", "examples", "constraints")}
+
+
+def reference_complexity(question_id, bank=None):
+    """Declared complexity of a bank question for the analysis prompt, e.g. "O(n) elements", or None."""
+    bank = bank or get_question_bank()
+    baseline = bank.baseline(question_id) if question_id else None
+    return f"{baseline['complexity']} {baseline['unit']}" if baseline else None
+
+
+def apply_efficiency_baseline(analysis, question_id, code, bank=None):
+    """Score efficiency from the static estimate where it is reliable; otherwise keep the model's score.
+
+    The model already scores efficiency against the declared complexity (see
+    reference_complexity). The estimate takes over only for questions measured
+    per input, where loops in the submission are loops over that input. Design
+    questions ("per ..." units) are called one operation at a time, so a loop
+    there may walk internal state or be a test driver; there, and for code the
+    estimator can't read (recursion), the model's score stands. The overall
+    score moves by a quarter of the change, since efficiency is one of four
+    scored dimensions. Analyses of empty or failed submissions are left as they are.
+    """
+    bank = bank or get_question_bank()
+    baseline = bank.baseline(question_id) if question_id else None
+    if baseline is None or baseline["unit"].startswith("per ") or not analysis.get("overallScore"):
+        return analysis
+    estimated = estimate_complexity(code)
+    if estimated is None:
+        return analysis
+    score = efficiency_score(estimated, baseline["rank"])
+    previous = (analysis.get("efficiency") or {}).get("score", score)
+    analysis["efficiency"] = {
+        "score": score,
+        "feedback": f"Estimated {complexity_label(estimated)} against a reference of {baseline['complexity']} {baseline['unit']}."
+    }
+    analysis["overallScore"] = max(0, min(100, round(analysis["overallScore"] + (score - previous) / 4)))
+    return analysis
+
+
+_bank = None
+
+
+def get_question_bank():
+    global _bank
+    if _bank is None:
+        _bank = QuestionBank()
+    return _bank
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--build" in sys.argv:
+        build_baselines()
+    else:
+        bank = get_question_bank()
+        print(json.dumps(bank.index(), indent=2))
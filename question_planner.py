@@ -0,0 +1,124 @@
+"""
+Speculative question planning for upcoming interview rounds.
+
+As soon as the interview type is known, and again whenever RESUME_DATA or
+GITHUB_DATA arrive, a background task asks the text model for a ranked list of
+tailored questions for each upcoming round. On PHASE_CHANGE the agent injects a
+ready question instead of making the realtime model invent one on the spot.
+
+Plans are keyed by the role context and the documents they were built from, so
+a new or changed document invalidates (and cancels) the affected plan. Nothing
+here ever blocks the phase change: if a plan is not ready, the agent falls back
+to its generic instruction.
+"""
+
+import asyncio
+import hashlib
+
+from log_sink import log
+from scoring import parse_model_json
+
+QUESTIONS_PER_PHASE = 4
+
+PHASE_FOCUS = {
+    "resume": "their resume: specific projects, roles, technologies and achievements it mentions",
+    "github": "their GitHub profile: specific repositories, technical decisions and languages it shows",
+    "topic": "core technical knowledge for this role, testing depth of understanding rather than trivia",
+}
+
+
+def planning_prompt(phase, role_context, document, count):
+    source = ""
+    if document:
+        source = f"""
+CANDIDATE MATERIAL:
+{document}
+"""
+    return f"""You are preparing questions for a live technical interview.
+
+{role_context.strip()}
+{source}
+Write {count} interview questions for the {phase.upper()} round, focused on {PHASE_FOCUS[phase]}.
+Each question must be one or two spoken sentences and reference concrete details where material is given.
+Rank them best first.
+
+Return ONLY this JSON (no markdown): {{"questions": ["<question 1>", "<question 2>"]}}"""
+
+
+class QuestionPlanner:
+    """Prepares ranked questions per phase in the background."""
+
+    def __init__(self, model, role_context, questions_per_phase=QUESTIONS_PER_PHASE):
+        self.model = model
+        self.role_context = role_context
+        self.questions_per_phase = questions_per_phase
+        self.documents = {"resume": "", "github": ""}
+        # phase -> (plan key, task)
+        self._plans = {}
+
+    def _plan_key(self, phase):
+        document = self.documents.get(phase, "")
+        digest = hashlib.sha256(f"{phase}\0{self.role_context}\0{document}".encode()).hexdigest()
+        return digest[:16]
+
+    def _document_for(self, phase):
+        return self.documents.get(phase, "")
+
+    def prime(self):
+        """Start planning every phase whose inputs are available."""
+        self._schedule("topic")
+        for phase in ("resume", "github"):
+            if self.documents[phase]:
+                self._schedule(phase)
+
+    def update_document(self, phase, content):
+        """Record a new resume/GitHub document and re-plan that phase if it changed."""
+        if self.documents.get(phase) == content:
+            return
+        self.documents[phase] = content
+        if content:
+            self._schedule(phase)
+        else:
+            self._cancel(phase)
+
+    def _cancel(self, phase):
+        plan = self._plans.pop(phase, None)
+        if plan is not None and not plan[1].done():
+            plan[1].cancel()
+
+    def _schedule(self, phase):
+        key = self._plan_key(phase)
+        current = self._plans.get(phase)
+        if current is not None and current[0] == key:
+            return
+        # Inputs changed: the old plan is stale
+        self._cancel(phase)
+        task = asyncio.create_task(self._generate(phase))
+        self._plans[phase] = (key, task)
+
+    async def _generate(self, phase):
+        prompt = planning_prompt(phase, self.role_context, self._document_for(phase), self.questions_per_phase)
+        try:
+            result = parse_model_json(await self.model.generate(prompt))
+            questions = [q.strip() for q in result.get("questions", []) if isinstance(q, str) and q.strip()]
+            log("PLANNER", "Questions prepared", phase=phase, count=len(questions))
+            return questions
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log("PLANNER", f"Planning failed: {e}", level="warning", phase=phase)
+            return []
+
+    def ready_questions(self, phase):
+        """Return the prepared questions for a phase, or [] if none are ready yet."""
+        plan = self._plans.get(phase)
+        if plan is None or plan[0] != self._plan_key(phase):
+            return []
+        task = plan[1]
+        if not task.done() or task.cancelled() or task.exception() is not None:
+            return []
+        return list(task.result())
+
+    def close(self):
+        for phase in list(self._plans):
+            self._cancel(phase)
@@ -0,0 +1,253 @@
+"""
+Offline batch re-scoring of archived interviews.
+
+Streams session records written by the agent (see transcript_store.py) and
+runs the same scoring logic as a live room (scoring.py) over them with bounded
+concurrency and a request rate limit. Results are appended to a JSONL file with
+one flat row per session. The output file doubles as the checkpoint: sessions
+already scored successfully are skipped, so an interrupted run picks up where
+it stopped.
+
+`topic` is the bulk transcript score. A live room reports the per-answer
+aggregate instead (see incremental_evaluator.py); the opt-in `answers` kind
+computes that as `answer_topic_score`, so offline calibration can compare
+against what candidates were actually shown. It costs one request per answer.
+
+Usage:
+    python rescore.py transcripts/ -o rescored.jsonl --concurrency 8 --rps 5
+    python rescore.py transcripts/ -o dry_run.jsonl --model local
+    python rescore.py transcripts/ -o answers.jsonl --kinds topic,answers
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import scoring
+from incremental_evaluator import IncrementalEvaluator
+from question_bank import apply_efficiency_baseline, reference_complexity
+from scoring_cascade import get_scorer
+from transcript_store import iter_sessions
+
+KINDS = ("resume", "github", "topic", "phases", "code", "answers")
+DEFAULT_KINDS = ("resume", "github", "topic", "phases", "code")
+
+
+class ThrottledModel:
+    """Caps in-flight requests and spaces them to at most `rps` per second."""
+
+    def __init__(self, model, concurrency=8, rps=0.0):
+        self.model = model
+        self.interval = 1.0 / rps if rps > 0 else 0.0
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+        self.requests = 0
+
+    async def _wait_for_slot(self):
+        if not self.interval:
+            return
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def generate(self, prompt):
+        async with self._semaphore:
+            await self._wait_for_slot()
+            self.requests += 1
+            return await self.model.generate(prompt)
+
+
+def load_completed(output_path):
+    """Session ids already scored successfully in a previous run."""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                # Partial line from an interrupted write
+                continue
+            if row.get("status") == "ok":
+                completed.add(row.get("session_id"))
+    return completed
+
+
+async def score_answers(model, conversation, workers=4):
+    """Per-answer topic aggregate, computed the way a live room does (cascade included)."""
+    evaluator = IncrementalEvaluator(model, workers=workers, scorer=get_scorer())
+    question = ""
+    try:
+        for msg in conversation:
+            if msg.get("role") == "agent":
+                question = msg.get("content", "")
+            elif msg.get("role") == "user":
+                evaluator.add_answer(msg.get("phase", "topic"), question, msg.get("content", ""))
+        score = (await evaluator.final_scores())["topic"]
+    finally:
+        evaluator.close()
+    # Like the live room, fall back to the bulk score when no answer could be scored
+    return score if score is not None else await scoring.score_topic(model, conversation)
+
+
+async def rescore_session(model, record, kinds=DEFAULT_KINDS):
+    """Score one archived session. Returns a flat result row."""
+    conversation = record.get("conversation", [])
+    row = {
+        "session_id": record.get("session_id"),
+        "candidate": record.get("candidate"),
+        "interview_type": record.get("interview_type"),
+        "ended_at": record.get("ended_at"),
+    }
+    jobs = {}
+    if "resume" in kinds:
+        jobs["resume_score"] = scoring.score_resume(model, record.get("resume", ""))
+    if "github" in kinds:
+        jobs["github_score"] = scoring.score_github(model, record.get("github", ""))
+    if "topic" in kinds:
+        jobs["topic_score"] = scoring.score_topic(model, conversation)
+    if "answers" in kinds:
+        jobs["answer_topic_score"] = score_answers(model, conversation)
+    if "phases" in kinds:
+        for phase in ("resume", "github", "topic"):
+            messages = [msg for msg in conversation if msg.get("phase") == phase]
+            jobs[f"{phase}_phase_score"] = scoring.score_phase(model, phase, messages)
+    if "code" in kinds:
+        for i, submission in enumerate(record.get("code_submissions", [])):
+            jobs[f"code_{i}"] = scoring.analyze_code(
+                model, submission.get("title", "Coding Problem"),
+                submission.get("description", ""), submission.get("code", ""),
+                reference_complexity(submission.get("id"))
+            )
+
+    results = await asyncio.gather(*jobs.values(), return_exceptions=True)
+    errors = []
+    code_results = []
+    for column, result in zip(jobs, results):
+        if isinstance(result, Exception):
+            errors.append(f"{column}: {result}")
+        elif column.startswith("code_"):
+            submission = record["code_submissions"][int(column[len("code_"):])]
+            code_results.append(apply_efficiency_baseline(result, submission.get("id"), submission.get("code", "")))
+        else:
+            row[column] = result
+
+    if code_results:
+        row["code_score"] = code_results[-1].get("overallScore", 0)
+        row["code_results"] = code_results
+    row["status"] = "error" if errors else "ok"
+    if errors:
+        row["errors"] = errors
+    row["scored_at"] = time.time()
+    return row
+
+
+async def run(paths, output_path, model, concurrency=8, rps=0.0, kinds=DEFAULT_KINDS, limit=None,
+              progress_interval=5.0, batch=False):
+    """Re-score all sessions under `paths`. Returns a stats dict."""
+    completed = load_completed(output_path)
+    throttled = ThrottledModel(model, concurrency=concurrency, rps=rps)
+    scorer = throttled
+    if batch:
+        from micro_batcher import BatchingModel
+        # Throttle the combined requests, not the individual prompts
+        scorer = BatchingModel(throttled)
+    stats = {"scored": 0, "failed": 0, "skipped": 0}
+    started = time.perf_counter()
+    last_report = started
+
+    # Start on a fresh line if the previous run died mid-write
+    if os.path.exists(output_path) and os.path.getsize(output_path):
+        with open(output_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b"\n"
+    else:
+        needs_newline = False
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        if needs_newline:
+            out.write("\n")
+
+        def write_row(row):
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+            out.flush()
+            stats["scored" if row["status"] == "ok" else "failed"] += 1
+
+        pending = set()
+        submitted = 0
+        for record in iter_sessions(paths):
+            if limit is not None and submitted >= limit:
+                break
+            if record.get("session_id") in completed:
+                stats["skipped"] += 1
+                continue
+            # Keep at most `concurrency` sessions in flight so memory stays flat
+            if len(pending) >= concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    write_row(task.result())
+            pending.add(asyncio.create_task(rescore_session(scorer, record, kinds)))
+            submitted += 1
+
+            now = time.perf_counter()
+            if now - last_report >= progress_interval:
+                last_report = now
+                done_count = stats["scored"] + stats["failed"]
+                print(f"[RESCORE] {done_count} sessions, {done_count / (now - started):.1f} records/s")
+
+        for task in asyncio.as_completed(pending):
+            write_row(await task)
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 2)
+    stats["records_per_second"] = round((stats["scored"] + stats["failed"]) / elapsed, 2) if elapsed else 0.0
+    stats["model_requests"] = throttled.requests
+    if batch:
+        stats["scoring_prompts"] = scorer.stats["items"]
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-score archived interviews")
+    parser.add_argument("paths", nargs="+", help="transcript JSONL files or directories")
+    parser.add_argument("-o", "--output", default="rescored.jsonl", help="output JSONL (also the checkpoint)")
+    parser.add_argument("--concurrency", type=int, default=8, help="max concurrent model requests")
+    parser.add_argument("--rps", type=float, default=5.0, help="max model requests per second (0 = unlimited)")
+    parser.add_argument("--kinds", default=",".join(DEFAULT_KINDS), help=f"comma-separated subset of {','.join(KINDS)}")
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many sessions")
+    parser.add_argument("--model", choices=["gemini", "local"], default="gemini",
+                        help="'local' uses the deterministic stand-in model")
+    parser.add_argument("--batch", action="store_true",
+                        help="combine concurrent same-kind prompts into multi-item requests")
+    parser.add_argument("--local-latency", type=float, default=0.0, help="simulated latency of the local model")
+    args = parser.parse_args(argv)
+
+    kinds = tuple(k.strip() for k in args.kinds.split(",") if k.strip())
+    unknown = set(kinds) - set(KINDS)
+    if unknown:
+        parser.error(f"unknown kinds: {', '.join(sorted(unknown))}")
+
+    if args.model == "local":
+        model = scoring.LocalModel(latency=args.local_latency)
+    else:
+        from dotenv import load_dotenv
+        load_dotenv(".env")
+        model = scoring.GeminiModel()
+
+    stats = asyncio.run(run(args.paths, args.output, model, args.concurrency, args.rps, kinds, args.limit,
+                            batch=args.batch))
+    print(f"[RESCORE] Done: {json.dumps(stats)}")
+    return 0 if stats["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+Warm pool of pre-provisioned interview rooms.
+
+The token server keeps a few rooms per interview type created ahead of time so
+the agent (and its avatar) are already connected and waiting when a candidate
+joins. Handing out a room is a pop from a deque; the pool is refilled in the
+background. A maintenance loop retires rooms that sat idle longer than
+ROOM_POOL_MAX_IDLE (so unused types don't hold a worker slot and a billed
+avatar) and retries refills that admission control refused earlier. The room
+service is pluggable so tests and local runs can use LocalRoomService instead
+of a real LiveKit server.
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+
+ROOM_POOL_SIZE = int(os.environ.get("ROOM_POOL_SIZE", "1"))
+ROOM_POOL_TYPES = [
+    t.strip() for t in os.environ.get("ROOM_POOL_TYPES", "frontend,backend,fullstack,general").split(",")
+    if t.strip()
+]
+# Warm rooms are recycled after this long so idle agents/avatars don't linger forever
+ROOM_POOL_MAX_IDLE = float(os.environ.get("ROOM_POOL_MAX_IDLE", "600"))
+ROOM_POOL_MAINTAIN_INTERVAL = float(os.environ.get("ROOM_POOL_MAINTAIN_INTERVAL", "30"))
+# Set when the agent registers with an explicit agent_name; otherwise rooms rely on automatic dispatch
+ROOM_POOL_AGENT_NAME = os.environ.get("ROOM_POOL_AGENT_NAME", "")
+
+
+def new_room_name(interview_type):
+    # Same shape the agent parses the interview type from
+    return f"{interview_type}-interview-{str(uuid.uuid4())[:8]}"
+
+
+def take_warm_room(pool, admission, interview_type, ticket=None):
+    """Hand out a warm room unless queued candidates are ahead of the caller.
+
+    `ticket` is the caller's queue ticket, if any; a ticket holder served from
+    the pool leaves the admission queue.
+    """
+    if not admission.next_in_line(ticket):
+        return None
+    room_name = pool.acquire(interview_type)
+    if room_name and ticket:
+        admission.leave_queue(ticket)
+    return room_name
+
+
+class LiveKitRoomService:
+    """Creates rooms and dispatches agents through the LiveKit server API."""
+
+    def __init__(self, url=None, api_key=None, api_secret=None, agent_name=ROOM_POOL_AGENT_NAME):
+        self.url = url or os.environ.get("LIVEKIT_URL")
+        self.api_key = api_key or os.environ.get("LIVEKIT_API_KEY")
+        self.api_secret = api_secret or os.environ.get("LIVEKIT_API_SECRET")
+        self.agent_name = agent_name
+        self._api = None
+
+    def _client(self):
+        if self._api is None:
+            from livekit import api
+            self._api = api.LiveKitAPI(self.url, self.api_key, self.api_secret)
+        return self._api
+
+    async def create_room(self, room_name, metadata):
+        from livekit import api
+        await self._client().room.create_room(api.CreateRoomRequest(
+            name=room_name,
+            metadata=json.dumps(metadata),
+            empty_timeout=int(ROOM_POOL_MAX_IDLE),
+        ))
+
+    async def dispatch_agent(self, room_name, metadata):
+        if not self.agent_name:
+            # Automatic dispatch already sends an agent to every new room
+            return
+        from livekit import api
+        await self._client().agent_dispatch.create_dispatch(api.CreateAgentDispatchRequest(
+            agent_name=self.agent_name,
+            room=room_name,
+            metadata=json.dumps(metadata),
+        ))
+
+    async def delete_room(self, room_name):
+        from livekit import api
+        await self._client().room.delete_room(api.DeleteRoomRequest(room=room_name))
+
+
+class LocalRoomService:
+    """In-memory stand-in for the LiveKit room service."""
+
+    def __init__(self, create_delay=0.0):
+        self.create_delay = create_delay
+        self.rooms = {}
+        self.dispatched = []
+        self.deleted = []
+
+    async def create_room(self, room_name, metadata):
+        if self.create_delay:
+            await asyncio.sleep(self.create_delay)
+        self.rooms[room_name] = metadata
+
+    async def dispatch_agent(self, room_name, metadata):
+        self.dispatched.append(room_name)
+
+    async def delete_room(self, room_name):
+        self.rooms.pop(room_name, None)
+        self.deleted.append(room_name)
+
+
+class RoomPool:
+    """Keeps `size` warm rooms per interview type, refilled on a background loop."""
+
+    def __init__(self, service, types=ROOM_POOL_TYPES, size=ROOM_POOL_SIZE,
+                 max_idle=ROOM_POOL_MAX_IDLE, can_provision=None, clock=time.time,
+                 maintain_interval=ROOM_POOL_MAINTAIN_INTERVAL):
+        self.service = service
+        self.types = list(types)
+        self.size = size
+        self.max_idle = max_idle
+        # Optional hook (e.g. admission control) consulted before warming a new room
+        self.can_provision = can_provision
+        self.clock = clock
+        self.maintain_interval = maintain_interval
+        self._rooms = {t: deque() for t in self.types}  # type -> deque of (room_name, created_at)
+        self._pending = {t: 0 for t in self.types}
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._maintainer = None
+
+    def start(self):
+        if self.size <= 0 or self._thread is not None:
+            return
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="room-pool", daemon=True)
+        self._thread.start()
+        print(f"[ROOM_POOL] Warming {self.size} room(s) for: {', '.join(self.types)}")
+        for interview_type in self.types:
+            self.refill(interview_type)
+        self._maintainer = self._submit(self._maintain_loop())
+
+    def stop(self):
+        if self._loop is None:
+            return
+        self._maintainer.cancel()
+        concurrent.futures.wait([self._maintainer], timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+        self._thread = None
+
+    def acquire(self, interview_type):
+        """Hand out a warm room name, or None if the pool for this type is empty."""
+        if interview_type not in self._rooms:
+            return None
+        self._retire_expired(interview_type)
+        with self._lock:
+            rooms = self._rooms[interview_type]
+            room_name = rooms.popleft()[0] if rooms else None
+        self.refill(interview_type)
+        return room_name
+
+    def maintain(self):
+        """Retire rooms idle past `max_idle` and top every type back up to `size`."""
+        retired = []
+        for interview_type in self.types:
+            retired += self._retire_expired(interview_type)
+            self.refill(interview_type)
+        return retired
+
+    def _retire_expired(self, interview_type):
+        now = self.clock()
+        with self._lock:
+            rooms = self._rooms[interview_type]
+            # Rooms are appended as they are created, so the oldest are at the front
+            expired = []
+            while rooms and now - rooms[0][1] > self.max_idle:
+                expired.append(rooms.popleft()[0])
+        for name in expired:
+            self._submit(self._retire(name))
+        return expired
+
+    async def _maintain_loop(self):
+        while True:
+            await asyncio.sleep(self.maintain_interval)
+            try:
+                self.maintain()
+            except Exception as e:
+                print(f"[ROOM_POOL] Maintenance failed: {e}")
+
+    def available(self, interview_type):
+        with self._lock:
+            return len(self._rooms.get(interview_type, ()))
+
+    def refill(self, interview_type):
+        """Schedule enough room creations to bring the type back to `size`."""
+        if self._loop is None or interview_type not in self._rooms:
+            return []
+        futures = []
+        with self._lock:
+            missing = self.size - len(self._rooms[interview_type]) - self._pending[interview_type]
+            self._pending[interview_type] += max(0, missing)
+        for _ in range(max(0, missing)):
+            futures.append(self._submit(self._provision(interview_type)))
+        return futures
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def _provision(self, interview_type):
+        room_name = new_room_name(interview_type)
+        try:
+            if self.can_provision is not None and not self.can_provision(room_name):
+                return None
+            metadata = {"type": interview_type, "pooled": True}
+            await self.service.create_room(room_name, metadata)
+            await self.service.dispatch_agent(room_name, metadata)
+            with self._lock:
+                self._rooms[interview_type].append((room_name, self.clock()))
+            print(f"[ROOM_POOL] Warmed room {room_name}")
+            return room_name
+        except Exception as e:
+            print(f"[ROOM_POOL] Failed to warm room for {interview_type}: {e}")
+            return None
+        finally:
+            with self._lock:
+                self._pending[interview_type] -= 1
+
+    async def _retire(self, room_name):
+        try:
+            await self.service.delete_room(room_name)
+            print(f"[ROOM_POOL] Retired idle room {room_name}")
+        except Exception as e:
+            print(f"[ROOM_POOL] Failed to delete room {room_name}: {e}")
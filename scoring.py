@@ -0,0 +1,403 @@
+"""
+Scoring prompts and helpers shared by the live agent and offline tools.
+
+The agent used to build these prompts inline inside the room callbacks; they
+live here so the same logic can score a live room or a stored transcript. Every
+scorer takes a `model` object with an async `generate(prompt) -> str` method:
+GeminiModel in production, LocalModel as a deterministic stand-in for tests and
+offline dry runs.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+
+from prompt_registry import GeminiContextCache, registry
+
+SCORING_MODEL = os.environ.get("SCORING_MODEL", "gemini-2.5-flash")
+# Combine concurrent same-kind prompts into multi-item requests (see micro_batcher.py)
+SCORING_BATCH = os.environ.get("SCORING_BATCH", "1") != "0"
+# Share model replies between all agent processes on the host (see shared_cache.py)
+SCORING_CACHE = os.environ.get("SCORING_CACHE", "1") != "0"
+SCORING_CACHE_TTL = float(os.environ.get("SCORING_CACHE_TTL", str(24 * 3600)))
+
+PHASE_DESCRIPTIONS = {
+    "resume": "evaluating how well the candidate explained their work experience, projects, and skills from their resume",
+    "github": "evaluating how well the candidate explained their GitHub projects, technical decisions, and coding contributions",
+    "topic": "evaluating the candidate's technical knowledge and depth of understanding on interview topics"
+}
+
+# Result sent to the frontend when code analysis fails
+CODE_ANALYSIS_ERROR_RESULT = {
+    "overallScore": 0,
+    "verdict": "Analysis Error",
+    "summary": "Unable to analyze code. Please try again.",
+    "logic": {"score": 0, "feedback": "Error during analysis"},
+    "edgeCases": {"score": 0, "feedback": "Error during analysis"},
+    "efficiency": {"score": 0, "feedback": "Error during analysis"},
+    "readability": {"score": 0, "feedback": "Error during analysis"},
+    "suggestions": ["Check your code and try again"]
+}
+
+
+class GeminiModel:
+    """Async wrapper around the Gemini text model used for scoring."""
+
+    def __init__(self, model_name=SCORING_MODEL, api_key=None, context_cache=None):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key or os.environ.get("GOOGLE_API_KEY"))
+        self._genai = genai
+        self.model_name = model_name
+        self.context_cache = context_cache
+        self._model = genai.GenerativeModel(model_name)
+        self._cached_models = {}
+
+    async def generate(self, prompt):
+        # Send a registered static prefix as a context cache reference when one is available
+        template = registry.match_prefix(prompt) if self.context_cache else None
+        handle = await self.context_cache.handle_for(self.model_name, template) if template else None
+        if handle is None:
+            response = await self._model.generate_content_async(prompt)
+            return response.text
+        model = self._cached_models.get(handle.name)
+        if model is None:
+            model = self._cached_models[handle.name] = self._genai.GenerativeModel.from_cached_content(handle)
+        response = await model.generate_content_async(prompt[len(template.prefix):])
+        return response.text
+
+
+class LocalModel:
+    """Deterministic stand-in for the scoring model.
+
+    Scores are derived from a hash of the prompt, so repeated runs agree. An
+    optional latency simulates a remote call.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+
+    async def generate(self, prompt):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        from micro_batcher import BATCH_HEADER, split_prompts
+        if BATCH_HEADER in prompt:
+            return json.dumps([json.loads(self._reply(p)) for p in split_prompts(prompt)])
+        return self._reply(prompt)
+
+    def _reply(self, prompt):
+        score = int(hashlib.sha256(prompt.encode()).hexdigest()[:8], 16) % 101
+        if '"questions"' in prompt:
+            return json.dumps({"questions": [f"Local stand-in question {i + 1} ({score})" for i in range(3)]})
+        if '"overallScore"' in prompt:
+            part = {"score": score, "feedback": "Local stand-in analysis."}
+            return json.dumps({
+                "overallScore": score,
+                "verdict": "Good" if score >= 60 else "Needs Work",
+                "summary": "Scored by the local stand-in model.",
+                "logic": part,
+                "edgeCases": part,
+                "efficiency": part,
+                "readability": part,
+                "suggestions": []
+            })
+        return json.dumps({"score": score})
+
+
+class CachedModel:
+    """Serves repeated prompts from the host-wide shared cache (see shared_cache.py).
+
+    Entries are keyed by model and prompt and namespaced by prompt template, so
+    the same answer, document or code scored in any room on the host is only
+    sent to the model once. Only replies that pass `validate` are stored, so a
+    malformed reply is retried on the next call instead of being served to
+    every room for the whole TTL.
+    """
+
+    def __init__(self, model, model_name=SCORING_MODEL, cache=None, ttl=SCORING_CACHE_TTL, validate=None):
+        from shared_cache import get_shared_cache
+        self.model = model
+        self.model_name = model_name
+        self.cache = cache or get_shared_cache()
+        self.ttl = ttl
+        self.validate = validate or usable_reply
+
+    async def generate(self, prompt):
+        template = registry.match_prefix(prompt)
+        namespace = template.name if template else "prompts"
+        key = hashlib.sha256(f"{self.model_name}\0{prompt}".encode()).hexdigest()
+        # Cache reads can write too (recency, stats) and wait on another process's
+        # transaction, so no cache I/O runs on the event loop
+        cached = await asyncio.to_thread(self.cache.get, namespace, key)
+        if cached is not None:
+            return cached
+        text = await self.model.generate(prompt)
+        if self.validate(prompt, text):
+            await asyncio.to_thread(self.cache.set, namespace, key, text, self.ttl)
+        return text
+
+
+def usable_reply(prompt, text):
+    """Whether a scoring reply parses and has the field its prompt asks for."""
+    try:
+        result = parse_model_json(text)
+    except ValueError:
+        return False
+    if not isinstance(result, dict):
+        return False
+    for field in ("overallScore", "score"):
+        if f'"{field}"' in prompt:
+            return field in result
+    return True
+
+
+_default_model = None
+
+
+def get_scoring_model():
+    """Process-wide Gemini scoring model, shared by all rooms in the process."""
+    global _default_model
+    if _default_model is None:
+        _default_model = GeminiModel(context_cache=GeminiContextCache())
+        if SCORING_BATCH:
+            from micro_batcher import SCORING_BATCH_URL, BatchClient, BatchingModel
+            _default_model = BatchingModel(_default_model)
+            if SCORING_BATCH_URL:
+                # One room per job process: batch across rooms in the host service
+                _default_model = BatchClient(SCORING_BATCH_URL, fallback=_default_model)
+        if SCORING_CACHE:
+            # Outermost, so cached prompts never wait in a batch window
+            _default_model = CachedModel(_default_model)
+    return _default_model
+
+
+def get_planning_model():
+    """The scoring model without the shared reply cache, for prompts that must not repeat.
+
+    The topic planning prompt depends only on the role, so a cached reply would
+    hand every candidate for that role the same questions.
+    """
+    model = get_scoring_model()
+    return model.model if isinstance(model, CachedModel) else model
+
+
+_summary_model = None
+
+
+def get_summary_model():
+    """Plain Gemini model for context summaries: no shared reply cache and no batching.
+
+    Summaries are one room's private interview notes. They must not be merged
+    into another room's batch, shared through the host cache, or counted in
+    the scoring stats.
+    """
+    global _summary_model
+    if _summary_model is None:
+        _summary_model = GeminiModel()
+    return _summary_model
+
+
+def parse_model_json(response_text):
+    """Parse a JSON reply, tolerating a surrounding markdown code block."""
+    response_text = response_text.strip()
+    if response_text.startswith("```"):
+        response_text = response_text.split("```")[1]
+        if response_text.startswith("json"):
+            response_text = response_text[4:]
+    return json.loads(response_text.strip())
+
+
+def format_transcript(messages):
+    return "\n".join([f"{msg['role'].upper()}: {msg['content']}" for msg in messages])
+
+
+# Static instructions come first and dynamic content last, so every call of a
+# template shares a byte-identical prefix the provider can cache (see prompt_registry.py)
+registry.register("scoring.code", """You are a code reviewer. Analyze the code submission below and return a JSON response.
+
+Analyze the code and return ONLY a valid JSON object (no markdown, no explanation) with this structure:
+{
+    "overallScore": <0-100>,
+    "verdict": "<Excellent/Good/Needs Work/Incomplete/Failed>",
+    "summary": "<2 sentence summary of the submission>",
+    "logic": {"score": <0-100>, "feedback": "<1 sentence>"},
+    "edgeCases": {"score": <0-100>, "feedback": "<1 sentence>"},
+    "efficiency": {"score": <0-100>, "feedback": "<1 sentence>"},
+    "readability": {"score": <0-100>, "feedback": "<1 sentence>"},
+    "suggestions": ["<suggestion 1>", "<suggestion 2>"]
+}
+
+SCORING RULES:
+- Empty/unchanged code = 0 score
+- No return statement = max 20 score
+- Code that doesn't solve the problem = max 30 score
+- Partial solution = 30-60 score
+- Working solution with issues = 60-80 score
+- Good solution = 80-100 score
+
+EFFICIENCY: when a reference complexity is given, score efficiency against it:
+matching or beating it = 80-100, one complexity class worse = about 55, two or more worse = 40 or less.
+Amortized work (e.g. evicting stale entries from a queue) counts at its amortized cost.
+
+Return ONLY the JSON, nothing else.
+
+""", """QUESTION: {question_title}
+DESCRIPTION: {question_desc}
+REFERENCE COMPLEXITY: {reference}
+
+SUBMITTED CODE:
+```
+{code}
+```""")
+
+registry.register("scoring.resume", """Evaluate the resume below for a technical interview. Score the DOCUMENT QUALITY.
+
+Score from 0-100 based on:
+- Technical skills and technologies listed (30%)
+- Quality and relevance of projects described (35%)
+- Work experience and achievements (20%)
+- Education and certifications (15%)
+
+Return ONLY this JSON (no markdown): {"score": <0-100>}
+
+""", """RESUME CONTENT:
+{resume_content}""")
+
+registry.register("scoring.github", """Evaluate the GitHub profile below for a technical interview. Score the PROFILE QUALITY.
+
+Score from 0-100 based on:
+- Number and quality of repositories (35%)
+- Technical variety and complexity (30%)
+- Project descriptions and documentation (20%)
+- Recent activity and contributions (15%)
+
+Return ONLY this JSON (no markdown): {"score": <0-100>}
+
+""", """GITHUB PROFILE:
+{github_content}""")
+
+registry.register("scoring.topic", """Evaluate the candidate's VERBAL ANSWERS during the interview below.
+
+Score from 0-100 based on:
+- Depth and quality of technical explanations (40%)
+- Knowledge accuracy and understanding (30%)
+- Communication clarity (20%)
+- Engagement and confidence (10%)
+
+Return ONLY this JSON (no markdown): {"score": <0-100>}
+
+""", """INTERVIEW TRANSCRIPT:
+{transcript}""")
+
+
+def _phase_template(kind, phase):
+    """Phase and answer rubrics name the phase, so each phase gets its own template."""
+    description = PHASE_DESCRIPTIONS.get(phase, 'general interview questions')
+    if kind == "phase":
+        prefix = f"""Evaluate the interview conversation below for the {phase.upper()} phase.
+
+PHASE DESCRIPTION: {description}
+
+Score the candidate from 0-100 based on:
+- Clarity and depth of explanations (40%)
+- Technical accuracy and knowledge (30%)
+- Communication skills (20%)
+- Engagement and enthusiasm (10%)
+
+Return ONLY this JSON (no markdown, no explanation):
+{{"score": <0-100>}}
+
+"""
+        template = "CONVERSATION TRANSCRIPT:\n{transcript}"
+    else:
+        prefix = f"""Evaluate ONE answer from a live interview in the {phase.upper()} phase.
+
+PHASE DESCRIPTION: {description}
+
+Score the answer from 0-100 based on:
+- Clarity and depth of explanation (40%)
+- Technical accuracy and knowledge (30%)
+- Communication skills (20%)
+- Engagement and enthusiasm (10%)
+
+Return ONLY this JSON (no markdown, no explanation):
+{{"score": <0-100>}}
+
+"""
+        template = "INTERVIEWER: {question}\nCANDIDATE: {answer}"
+    return registry.register(f"scoring.{kind}.{phase}", prefix, template)
+
+
+def code_analysis_prompt(question_title, question_desc, code, reference=None):
+    return registry.render("scoring.code", question_title=question_title, question_desc=question_desc,
+                           reference=reference or "not given", code=code)
+
+
+def phase_prompt(phase, transcript):
+    return _phase_template("phase", phase).render(transcript=transcript)
+
+
+def resume_prompt(resume_content):
+    return registry.render("scoring.resume", resume_content=resume_content)
+
+
+def github_prompt(github_content):
+    return registry.render("scoring.github", github_content=github_content)
+
+
+def topic_prompt(transcript):
+    return registry.render("scoring.topic", transcript=transcript)
+
+
+def answer_prompt(phase, question, answer):
+    return _phase_template("answer", phase).render(question=question, answer=answer)
+
+
+async def _score(model, prompt):
+    result = parse_model_json(await model.generate(prompt))
+    return result.get("score", 70)
+
+
+async def analyze_code(model, question_title, question_desc, code, reference=None):
+    """Return the full code analysis dict. Raises on model or parse errors.
+
+    `reference` is the declared complexity of a bank question (question_bank.reference_complexity).
+    """
+    prompt = code_analysis_prompt(question_title, question_desc, code, reference)
+    return parse_model_json(await model.generate(prompt))
+
+
+async def score_phase(model, phase, messages):
+    """Score the conversation of one phase. Returns 60 when there is none."""
+    if not messages:
+        return 60
+    return await _score(model, phase_prompt(phase, format_transcript(messages)))
+
+
+async def score_resume(model, resume_content):
+    """Score the resume document. No resume scores 0."""
+    if not resume_content:
+        return 0
+    return await _score(model, resume_prompt(resume_content))
+
+
+async def score_github(model, github_content):
+    """Score the GitHub profile summary. No profile scores 0."""
+    if not github_content:
+        return 0
+    return await _score(model, github_prompt(github_content))
+
+
+async def score_topic(model, messages):
+    """Score the verbal answers across the whole interview. No conversation scores 50."""
+    transcript = format_transcript(messages)
+    if not transcript:
+        return 50
+    return await _score(model, topic_prompt(transcript))
+
+
+async def score_answer(model, phase, question, answer):
+    """Score a single candidate answer to an interviewer question."""
+    return await _score(model, answer_prompt(phase, question, answer))
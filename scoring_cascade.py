@@ -0,0 +1,283 @@
+"""
+Tiered scoring: a local heuristic tier in front of the scoring model.
+
+Many documents and transcripts don't need a model to score: a two-line resume,
+a GitHub profile with no repositories, a phase where the candidate never spoke,
+an answer that is just "I don't know". Short answers are not among them; they
+can be entirely correct, so they always go to the model. The local tier extracts cheap features
+(resume sections, repository counts/languages/stars, answer length and
+technical-term density) and returns a score with a confidence. Only cases below
+CASCADE_CONFIDENCE are escalated to the model tier.
+
+ScoringCascade has the same scorer functions as scoring.py (model first), so
+callers can use either. To keep the local tier honest, a sample of its
+decisions (CASCADE_AUDIT_RATE) is also scored by the model in the background,
+and per-kind hit rates and agreement are reported from `report()`.
+
+`python scoring_cascade.py transcripts/` runs both tiers over archived
+interviews and prints how many calls the cascade would have saved at the
+configured threshold and how often the tiers agree.
+"""
+
+import asyncio
+import math
+import os
+import random
+import re
+
+import scoring
+from log_sink import log
+
+CASCADE_CONFIDENCE = float(os.environ.get("CASCADE_CONFIDENCE", "0.8"))
+CASCADE_AUDIT_RATE = float(os.environ.get("CASCADE_AUDIT_RATE", "0.05"))
+SCORING_CASCADE = os.environ.get("SCORING_CASCADE", "1") != "0"
+# Local and model scores within this many points count as agreeing
+AGREEMENT_TOLERANCE = 15
+
+TECH_TERMS = {
+    "algorithm", "algorithms", "api", "apis", "async", "aws", "azure", "backend", "cache", "caching", "ci",
+    "cloud", "complexity", "concurrency", "container", "css", "database", "databases", "deployment", "django",
+    "docker", "flask", "frontend", "gcp", "git", "go", "graphql", "hash", "html", "http", "index", "java",
+    "javascript", "jwt", "kafka", "kubernetes", "lambda", "latency", "linux", "microservices", "ml", "model",
+    "mongodb", "mysql", "node", "nosql", "numpy", "oauth", "pandas", "performance", "postgres", "postgresql",
+    "python", "pytorch", "queue", "react", "recursion", "redis", "rest", "rust", "scalability", "schema",
+    "sharding", "sql", "tensorflow", "terraform", "testing", "thread", "threads", "throughput", "typescript",
+    "vue", "websocket", "websockets",
+}
+RESUME_SECTIONS = {
+    "experience": ("experience", "employment", "work history"),
+    "education": ("education", "university", "degree", "b.tech", "bachelor", "master"),
+    "skills": ("skills", "technologies", "tech stack"),
+    "projects": ("projects", "project"),
+}
+# A bare "no" is left out: it is a correct answer to plenty of yes/no questions
+NON_ANSWERS = re.compile(r"^\W*(i\s+don'?t\s+know|no\s+idea|not\s+sure|skip|pass)\W*$", re.I)
+REPO_LINE = re.compile(r"^\d+\.\s+(\S+)\s+\(([^)]*)\)\s+-\s+(.*?)\s+\[(\d+) stars\]\s*$")
+
+_WORD = re.compile(r"[a-z][a-z0-9.+#-]*")
+
+
+def _words(text):
+    return _WORD.findall(text.lower())
+
+
+def _tech_density(words):
+    return sum(1 for w in words if w in TECH_TERMS) / len(words) if words else 0.0
+
+
+# ===== LOCAL TIER =====
+# Each returns (score, confidence). High confidence is reserved for cases whose
+# score is evident from the features alone.
+
+def local_resume_score(content):
+    words = _words(content)
+    lowered = content.lower()
+    sections = {name for name, keys in RESUME_SECTIONS.items() if any(k in lowered for k in keys)}
+    tech = len({w for w in words if w in TECH_TERMS})
+    bullets = sum(1 for line in content.splitlines() if line.strip().startswith(("-", "*", "•")))
+    quantified = len(re.findall(r"\d+\s*%|\$\s*\d|\d+x\b|\d{2,}\+?\s+(?:users|customers|requests)", lowered))
+    score = (min(30, 3 * tech)
+             + (35 if "projects" in sections else min(20, 2 * bullets))
+             + (min(20, 14 + 2 * quantified) if "experience" in sections else 0)
+             + (15 if "education" in sections else 0))
+    if len(words) < 40:
+        return min(score, 15), 0.95
+    if len(words) < 120 and len(sections) <= 1:
+        return min(score, 35), 0.85
+    return min(100, score), 0.5
+
+
+def local_github_score(content):
+    repos = [REPO_LINE.match(line.strip()) for line in content.splitlines()]
+    repos = [m for m in repos if m]
+    if not repos:
+        return 5, 0.95
+    # format_summary writes "Not specified" for repos without a detected language
+    languages = {m.group(2) for m in repos if m.group(2) not in ("", "None", "Not specified")}
+    described = sum(1 for m in repos if m.group(3) and m.group(3) != "No description")
+    stars = sum(int(m.group(4)) for m in repos)
+    has_readme = content.count("README:")
+    documented = min(1.0, (described + has_readme) / (2 * len(repos)))
+    score = round(35 * min(1.0, len(repos) / 8)
+                  + 30 * min(1.0, len(languages) / 4)
+                  + 20 * documented
+                  + 15 * min(1.0, math.log10(1 + stars) / 2))
+    if len(repos) <= 2 and stars == 0 and documented == 0:
+        return min(score, 20), 0.85
+    return score, 0.5
+
+
+def local_transcript_score(messages):
+    words = [w for msg in messages if msg.get("role") == "user" for w in _words(msg.get("content", ""))]
+    # Only silence is evident locally; a few words can be a round of correct, terse answers
+    if not words:
+        return 5, 0.95
+    answers = sum(1 for msg in messages if msg.get("role") == "user")
+    # Longer answers with more technical vocabulary score higher; the model judges the rest
+    score = round(30 + 25 * min(1.0, len(words) / answers / 60) + 45 * min(1.0, _tech_density(words) / 0.08))
+    return min(100, score), 0.4
+
+
+def local_answer_score(answer):
+    # Only an explicit non-answer is evident locally; short answers like "O(log n)"
+    # or "Use a hashmap" can be entirely correct, so the model judges them
+    if not answer.strip() or NON_ANSWERS.match(answer.strip()):
+        return 10, 0.9
+    words = _words(answer)
+    return round(30 + 40 * min(1.0, len(words) / 60) + 30 * min(1.0, _tech_density(words) / 0.08)), 0.3
+
+
+class _KindStats:
+    def __init__(self):
+        self.local = 0
+        self.escalated = 0
+        self.audited = 0
+        self.agreed = 0
+        self.abs_error = 0
+
+    def record_agreement(self, local_score, model_score):
+        self.audited += 1
+        self.abs_error += abs(local_score - model_score)
+        self.agreed += abs(local_score - model_score) <= AGREEMENT_TOLERANCE
+
+    def to_dict(self):
+        total = self.local + self.escalated
+        return {
+            "local": self.local,
+            "escalated": self.escalated,
+            "local_hit_rate": round(self.local / total, 3) if total else None,
+            "audited": self.audited,
+            "agreement": round(self.agreed / self.audited, 3) if self.audited else None,
+            "mean_abs_diff": round(self.abs_error / self.audited, 1) if self.audited else None,
+        }
+
+
+class ScoringCascade:
+    """Local heuristic tier with escalation to the model for uncertain cases."""
+
+    def __init__(self, threshold=CASCADE_CONFIDENCE, audit_rate=CASCADE_AUDIT_RATE, seed=None):
+        self.threshold = threshold
+        self.audit_rate = audit_rate
+        self.stats = {}
+        self._rng = random.Random(seed)
+        self._audits = set()
+
+    async def _run(self, kind, local, escalate):
+        score, confidence = local
+        stats = self.stats.setdefault(kind, _KindStats())
+        if confidence < self.threshold:
+            stats.escalated += 1
+            return await escalate()
+        stats.local += 1
+        if self.audit_rate and self._rng.random() < self.audit_rate:
+            task = asyncio.ensure_future(self._audit(stats, score, escalate))
+            self._audits.add(task)
+            task.add_done_callback(self._audits.discard)
+        return score
+
+    async def _audit(self, stats, local_score, escalate):
+        try:
+            stats.record_agreement(local_score, await escalate())
+        except Exception as e:
+            log("CASCADE", f"Audit failed: {e}", level="warning")
+
+    # Same signatures as the scorers in scoring.py
+
+    async def analyze_code(self, model, question_title, question_desc, code, reference=None):
+        return await scoring.analyze_code(model, question_title, question_desc, code, reference)
+
+    async def score_phase(self, model, phase, messages):
+        if not messages:
+            return 60
+        return await self._run("phase", local_transcript_score(messages),
+                               lambda: scoring.score_phase(model, phase, messages))
+
+    async def score_resume(self, model, resume_content):
+        if not resume_content:
+            return 0
+        return await self._run("resume", local_resume_score(resume_content),
+                               lambda: scoring.score_resume(model, resume_content))
+
+    async def score_github(self, model, github_content):
+        if not github_content:
+            return 0
+        return await self._run("github", local_github_score(github_content),
+                               lambda: scoring.score_github(model, github_content))
+
+    async def score_topic(self, model, messages):
+        if not scoring.format_transcript(messages):
+            return 50
+        return await self._run("topic", local_transcript_score(messages),
+                               lambda: scoring.score_topic(model, messages))
+
+    async def score_answer(self, model, phase, question, answer):
+        return await self._run("answer", local_answer_score(answer),
+                               lambda: scoring.score_answer(model, phase, question, answer))
+
+    def report(self):
+        return {kind: stats.to_dict() for kind, stats in sorted(self.stats.items())}
+
+
+_default_scorer = None
+
+
+def get_scorer():
+    """Process-wide scorer: the cascade, or the plain scoring module when SCORING_CASCADE=0."""
+    global _default_scorer
+    if _default_scorer is None:
+        _default_scorer = ScoringCascade() if SCORING_CASCADE else scoring
+    return _default_scorer
+
+
+# ===== OFFLINE EVALUATION =====
+
+async def evaluate(paths, model, threshold=CASCADE_CONFIDENCE, limit=None):
+    """Score archived sessions with both tiers and report hit rates and agreement."""
+    from transcript_store import iter_sessions
+
+    # Audit every local decision so agreement covers all of them
+    cascade = ScoringCascade(threshold=threshold, audit_rate=1.0, seed=0)
+    sessions = 0
+    for record in iter_sessions(paths):
+        if limit is not None and sessions >= limit:
+            break
+        sessions += 1
+        conversation = record.get("conversation", [])
+        jobs = [
+            cascade.score_resume(model, record.get("resume", "")),
+            cascade.score_github(model, record.get("github", "")),
+            cascade.score_topic(model, conversation),
+        ]
+        for phase in ("resume", "github", "topic"):
+            jobs.append(cascade.score_phase(model, phase, [m for m in conversation if m.get("phase") == phase]))
+        question = ""
+        for msg in conversation:
+            if msg.get("role") == "agent":
+                question = msg.get("content", "")
+            elif msg.get("role") == "user":
+                jobs.append(cascade.score_answer(model, msg.get("phase", "topic"), question, msg.get("content", "")))
+        await asyncio.gather(*jobs, return_exceptions=True)
+    await asyncio.gather(*list(cascade._audits), return_exceptions=True)
+    return sessions, cascade.report()
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Measure the scoring cascade on archived interviews")
+    parser.add_argument("paths", nargs="+", help="Transcript files or directories")
+    parser.add_argument("--model", choices=("gemini", "local"), default="gemini")
+    parser.add_argument("--threshold", type=float, default=CASCADE_CONFIDENCE)
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.model == "local":
+        model = scoring.LocalModel()
+    else:
+        from dotenv import load_dotenv
+        load_dotenv(".env")
+        model = scoring.GeminiModel()
+    sessions, report = asyncio.run(evaluate(args.paths, model, args.threshold, args.limit))
+    print(f"[CASCADE] {sessions} sessions at confidence >= {args.threshold}")
+    print(json.dumps(report, indent=2))
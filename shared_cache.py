@@ -0,0 +1,326 @@
+"""
+Host-local cache shared by every agent process on the machine.
+
+`agents.cli.run_app` runs each room in its own job process, so an in-memory
+cache only ever sees the rooms of one process and every process warms up on
+its own. This cache is one SQLite file in shared memory (/dev/shm when
+available), opened with a large mmap window and WAL. Reads are served straight
+from the mapped pages, and every process on the host sees every write. Hit
+rates therefore grow with the number of rooms on the host, not per process.
+
+- get/set/delete are each a single transaction, so readers never see a torn entry.
+- Entries carry an optional TTL. When the total size goes over the limit, the
+  least recently used entries are evicted in the same transaction as the set.
+- Hits, misses, sets and evictions are counted per namespace. Counts are
+  collected in-process and flushed to the shared file in batches.
+
+Run `python shared_cache.py --bench` to compare hit rates of per-process and
+shared caching across several worker processes.
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter
+
+_DEFAULT_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+SHARED_CACHE_PATH = os.environ.get("SHARED_CACHE_PATH", os.path.join(_DEFAULT_DIR, "practerviews_cache.sqlite3"))
+SHARED_CACHE_MAX_BYTES = int(os.environ.get("SHARED_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+SHARED_CACHE_MMAP_BYTES = int(os.environ.get("SHARED_CACHE_MMAP_BYTES", str(512 * 1024 * 1024)))
+# Recency is only written back when it is older than this, so hot reads stay read-only
+ACCESS_RESOLUTION = 30.0
+# Evict down to this fraction of the limit so sets near the limit don't evict every time
+EVICT_TO = 0.9
+STATS_FLUSH_EVERY = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed_at);
+
+CREATE TABLE IF NOT EXISTS usage (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO usage (id, bytes) VALUES (0, 0);
+
+CREATE TABLE IF NOT EXISTS namespace_stats (
+    namespace TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0,
+    sets INTEGER NOT NULL DEFAULT 0,
+    evictions INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+"""
+
+_STAT_FIELDS = ("hits", "misses", "sets", "evictions")
+
+
+class SharedCache:
+    """Cross-process key/value cache in one mmap-backed SQLite file."""
+
+    def __init__(self, path=SHARED_CACHE_PATH, max_bytes=SHARED_CACHE_MAX_BYTES,
+                 mmap_bytes=SHARED_CACHE_MMAP_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.mmap_bytes = mmap_bytes
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._pending = {}  # namespace -> Counter of stat deltas not yet flushed
+        self._pending_ops = 0
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+        atexit.register(self.flush_stats)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_bytes)}")
+        return conn
+
+    @property
+    def _conn(self):
+        # sqlite3 connections are per thread; rooms call from the loop and from worker threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _count(self, namespace, field, n=1):
+        with self._stats_lock:
+            self._pending.setdefault(namespace, Counter())[field] += n
+            self._pending_ops += 1
+            due = self._pending_ops >= STATS_FLUSH_EVERY
+        if due:
+            self.flush_stats()
+
+    def flush_stats(self):
+        with self._stats_lock:
+            pending, self._pending, self._pending_ops = self._pending, {}, 0
+        if not pending:
+            return
+        rows = [(ns, *(c[f] for f in _STAT_FIELDS)) for ns, c in pending.items()]
+        try:
+            self._conn.executemany(
+                """INSERT INTO namespace_stats (namespace, hits, misses, sets, evictions)
+                   VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT (namespace) DO UPDATE SET
+                       hits = hits + excluded.hits, misses = misses + excluded.misses,
+                       sets = sets + excluded.sets, evictions = evictions + excluded.evictions""",
+                rows,
+            )
+        except sqlite3.Error as e:
+            print(f"[CACHE] Could not flush stats: {e}")
+
+    def get(self, namespace, key, default=None):
+        now = time.time()
+        try:
+            row = self._conn.execute(
+                "SELECT value, expires_at, accessed_at FROM entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+            if row is not None and row[1] is not None and row[1] <= now:
+                self.delete(namespace, key)
+                row = None
+            if row is not None and now - row[2] > ACCESS_RESOLUTION:
+                self._conn.execute(
+                    "UPDATE entries SET accessed_at = ? WHERE namespace = ? AND key = ?", (now, namespace, key)
+                )
+        except sqlite3.Error as e:
+            # A busy or damaged cache must never fail the caller; treat it as a miss
+            print(f"[CACHE] get {namespace} failed: {e}")
+            row = None
+        if row is None:
+            self._count(namespace, "misses")
+            return default
+        self._count(namespace, "hits")
+        return json.loads(row[0])
+
+    def set(self, namespace, key, value, ttl=None):
+        now = time.time()
+        encoded = json.dumps(value)
+        size = len(key) + len(encoded)
+        if size > self.max_bytes:
+            return False
+        conn = self._conn
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                old = conn.execute(
+                    "SELECT size FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+                ).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (namespace, key, value, size, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (namespace, key, encoded, size, now + ttl if ttl else None, now),
+                )
+                conn.execute("UPDATE usage SET bytes = bytes + ? WHERE id = 0", (size - (old[0] if old else 0),))
+                evicted = self._evict(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            print(f"[CACHE] set {namespace} failed: {e}")
+            return False
+        self._count(namespace, "sets")
+        for evicted_namespace, n in evicted.items():
+            self._count(evicted_namespace, "evictions", n)
+        return True
+
+    def _evict(self, conn):
+        """Drop least recently used entries until under the limit. Runs inside the set transaction."""
+        evicted = Counter()
+        total = conn.execute("SELECT bytes FROM usage WHERE id = 0").fetchone()[0]
+        if total <= self.max_bytes:
+            return evicted
+        target = self.max_bytes * EVICT_TO
+        while total > target:
+            victims = conn.execute(
+                "SELECT namespace, key, size FROM entries ORDER BY accessed_at LIMIT 64"
+            ).fetchall()
+            if not victims:
+                break
+            conn.executemany("DELETE FROM entries WHERE namespace = ? AND key = ?", [(ns, k) for ns, k, _ in victims])
+            for ns, _, size in victims:
+                evicted[ns] += 1
+                total -= size
+        conn.execute("UPDATE usage SET bytes = ? WHERE id = 0", (max(0, total),))
+        return evicted
+
+    def delete(self, namespace, key):
+        conn = self._conn
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND key = ? RETURNING size", (namespace, key)
+                ).fetchone()
+                if row:
+                    conn.execute("UPDATE usage SET bytes = bytes - ? WHERE id = 0", (row[0],))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            print(f"[CACHE] delete {namespace} failed: {e}")
+
+    def clear(self, namespace=None):
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        if namespace is None:
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM namespace_stats")
+        else:
+            conn.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+            conn.execute("DELETE FROM namespace_stats WHERE namespace = ?", (namespace,))
+        conn.execute("UPDATE usage SET bytes = (SELECT COALESCE(SUM(size), 0) FROM entries) WHERE id = 0")
+        conn.execute("COMMIT")
+
+    def stats(self):
+        """Host-wide per-namespace counters, entry counts and sizes."""
+        self.flush_stats()
+        conn = self._conn
+        namespaces = {}
+        for ns, hits, misses, sets, evictions in conn.execute(
+            "SELECT namespace, hits, misses, sets, evictions FROM namespace_stats"
+        ):
+            lookups = hits + misses
+            namespaces[ns] = {"hits": hits, "misses": misses, "sets": sets, "evictions": evictions,
+                              "hit_rate": round(hits / lookups, 3) if lookups else None,
+                              "entries": 0, "bytes": 0}
+        for ns, entries, size in conn.execute("SELECT namespace, COUNT(*), SUM(size) FROM entries GROUP BY namespace"):
+            namespaces.setdefault(ns, {"hits": 0, "misses": 0, "sets": 0, "evictions": 0, "hit_rate": None})
+            namespaces[ns].update(entries=entries, bytes=size)
+        total = conn.execute("SELECT bytes FROM usage WHERE id = 0").fetchone()[0]
+        return {"bytes": total, "max_bytes": self.max_bytes, "namespaces": namespaces}
+
+
+_shared_cache = None
+
+
+def get_shared_cache():
+    """Process-wide handle on the host cache."""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = SharedCache()
+    return _shared_cache
+
+
+# ===== BENCHMARK =====
+
+def _bench_worker(path, worker, rooms, lookups, keyspace, shared, results):
+    import random
+
+    rng = random.Random(worker)
+    cache = SharedCache(path) if shared else None
+    local = {}
+    hits = 0
+    latencies = []
+    for _ in range(rooms * lookups):
+        # Popular documents and profiles recur across candidates (Zipf-like)
+        key = str(int(keyspace * rng.random() ** 3))
+        start = time.perf_counter()
+        if shared:
+            value = cache.get("bench", key)
+            if value is None:
+                cache.set("bench", key, {"score": len(key)})
+            else:
+                hits += 1
+        else:
+            if key in local:
+                hits += 1
+            else:
+                local[key] = {"score": len(key)}
+        latencies.append(time.perf_counter() - start)
+    if cache is not None:
+        cache.flush_stats()
+    latencies.sort()
+    results.put((hits, rooms * lookups, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]))
+
+
+def benchmark(workers=4, rooms=50, lookups=20, keyspace=2000):
+    import multiprocessing
+
+    path = os.path.join(tempfile.mkdtemp(dir=_DEFAULT_DIR), "bench_cache.sqlite3")
+    for shared in (False, True):
+        results = multiprocessing.Queue()
+        procs = [multiprocessing.Process(target=_bench_worker,
+                                         args=(path, w, rooms, lookups, keyspace, shared, results))
+                 for w in range(workers)]
+        if shared:
+            SharedCache(path)  # create the schema once before the workers race
+        for p in procs:
+            p.start()
+        rows = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+        hits = sum(r[0] for r in rows)
+        total = sum(r[1] for r in rows)
+        p50 = max(r[2] for r in rows) * 1e6
+        p99 = max(r[3] for r in rows) * 1e6
+        label = "shared cache " if shared else "per-process  "
+        print(f"[CACHE] {label} {workers} workers x {rooms} rooms: hit rate {hits / total:.1%}, "
+              f"lookup p50 {p50:.0f}us p99 {p99:.0f}us")
+    print(f"[CACHE] {json.dumps(SharedCache(path).stats()['namespaces'])}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--bench" in sys.argv:
+        benchmark()
+    else:
+        print(json.dumps(get_shared_cache().stats(), indent=2))
@@ -0,0 +1,89 @@
+"""Admission control and rate limiting with a fake clock and worker list."""
+
+from admission import (ADMITTED, QUEUED, REJECTED, AdmissionController, RateLimiter, _percentile,
+                       simulate)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def controller(workers, clock, **kwargs):
+    return AdmissionController(read_workers=lambda: workers, clock=clock, **kwargs)
+
+
+def worker(max_rooms=1, rooms=()):
+    return {"worker_id": "w0", "max_rooms": max_rooms, "active_rooms": len(rooms), "rooms": list(rooms),
+            "loop_lag_ms": 0, "cpu_percent": 0}
+
+
+def test_admitted_sessions_have_bounded_join_latency_under_overload():
+    # 2 arrivals/s for 20s against 4 single-room, one-minute workers is ~10x overload
+    without = simulate(surge_seconds=20, session_seconds=60, use_admission=False)
+    admitted = simulate(surge_seconds=20, session_seconds=60, use_admission=True)
+    assert len(admitted) == len(without) == 40
+    assert _percentile(admitted, 99) <= 1.0
+    assert _percentile(without, 99) > 100 * _percentile(admitted, 99)
+
+
+def test_rate_limiter_refills_over_time():
+    clock = Clock()
+    limiter = RateLimiter(rate_per_minute=60, burst=2, clock=clock)
+    assert limiter.allow("a") == (True, 0.0)
+    assert limiter.allow("a") == (True, 0.0)
+    allowed, retry_after = limiter.allow("a")
+    assert not allowed and retry_after == 1.0
+    # Other clients have their own bucket
+    assert limiter.allow("b")[0]
+    clock.now += 1.0
+    assert limiter.allow("a")[0]
+    assert not limiter.allow("a")[0]
+    # Never refills above the burst
+    clock.now += 60
+    assert [limiter.allow("a")[0] for _ in range(3)] == [True, True, False]
+
+
+def test_queue_is_served_in_order_and_abandoned_tickets_expire():
+    clock = Clock()
+    workers = [worker()]
+    admission = controller(workers, clock, queue_abandon_seconds=30, reservation_ttl=1000)
+    assert admission.decide("room-0").status == ADMITTED
+    first = admission.decide("room-1")
+    second = admission.decide("room-2")
+    assert (first.status, first.position, second.position) == (QUEUED, 1, 2)
+    assert admission.next_in_line(first.ticket) and not admission.next_in_line(second.ticket)
+
+    # The first ticket stops polling and is dropped; the second keeps polling
+    clock.now += 20
+    assert admission.decide("room-2", ticket=second.ticket).status == QUEUED
+    clock.now += 15
+    assert not admission.is_queued(first.ticket)
+    assert admission.next_in_line(second.ticket)
+    # An expired ticket is a fresh arrival and goes to the back of the queue
+    again = admission.decide("room-1", ticket=first.ticket)
+    assert again.ticket != first.ticket and again.position == 2
+
+
+def test_reservations_release_when_agent_reports_or_times_out():
+    clock = Clock()
+    workers = [worker(max_rooms=2)]
+    admission = controller(workers, clock, reservation_ttl=30, max_queue=0)
+    assert admission.decide("room-0").status == ADMITTED
+    assert admission.decide("room-1").status == ADMITTED
+    # Both slots are reserved for agents that haven't joined yet
+    assert admission.decide("room-2").status == REJECTED
+
+    # room-0's agent reports in: its reservation turns into an active room
+    workers[0].update(worker(max_rooms=2, rooms=["room-0"]))
+    assert admission.stats()["reserved"] == 1
+    assert admission.decide("room-2").status == REJECTED
+
+    # room-1's agent never shows up; its slot is released after the TTL
+    clock.now += 31
+    assert admission.stats() == {"free_slots": 1, "total_slots": 2, "reserved": 0, "queued": 0}
+    assert admission.decide("room-2").status == ADMITTED
+    assert not admission.reserve("warm-0")
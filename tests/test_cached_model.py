@@ -0,0 +1,53 @@
+"""CachedModel only shares replies that parse."""
+
+import asyncio
+import json
+
+import scoring
+from shared_cache import SharedCache
+
+
+class ScriptedModel:
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    async def generate(self, prompt):
+        self.calls += 1
+        return self.replies.pop(0)
+
+
+def run(model, cache, prompts):
+    cached = scoring.CachedModel(model, cache=cache)
+
+    async def main():
+        return [await cached.generate(prompt) for prompt in prompts]
+    return asyncio.run(main())
+
+
+def test_malformed_replies_are_not_cached(tmp_path):
+    cache = SharedCache(str(tmp_path / "cache.sqlite3"))
+    prompt = scoring.code_analysis_prompt("Two Sum", "desc", "return [];")
+    good = json.dumps({"overallScore": 40, "verdict": "Needs Work"})
+    model = ScriptedModel(['{"overallScore": 4', json.dumps({"verdict": "Good"}), good])
+
+    replies = run(model, cache, [prompt] * 4)
+    # Truncated and incomplete replies are retried; the first usable one is shared
+    assert replies == ['{"overallScore": 4', json.dumps({"verdict": "Good"}), good, good]
+    assert model.calls == 3
+
+
+def test_score_replies_are_cached(tmp_path):
+    cache = SharedCache(str(tmp_path / "cache.sqlite3"))
+    prompt = scoring.resume_prompt("Python, Postgres")
+    model = ScriptedModel(["```json\n{\"score\": 72}\n```"])
+    assert run(model, cache, [prompt, prompt]) == ["```json\n{\"score\": 72}\n```"] * 2
+    assert model.calls == 1
+
+
+def test_usable_reply():
+    score_prompt = scoring.resume_prompt("x")
+    assert scoring.usable_reply(score_prompt, '{"score": 50}')
+    assert not scoring.usable_reply(score_prompt, '{"rating": 50}')
+    assert not scoring.usable_reply(score_prompt, "[50]")
+    assert not scoring.usable_reply(score_prompt, "I cannot score this.")
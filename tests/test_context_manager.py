@@ -0,0 +1,51 @@
+"""ContextManager against the stand-in chat context in context_manager.py."""
+
+import asyncio
+import types
+
+from context_manager import SUMMARY_ID, ContextManager, _SimAgent
+
+
+class CountingSummarizer:
+    def __init__(self):
+        self.calls = 0
+
+    async def generate(self, prompt):
+        self.calls += 1
+        return f"notes {self.calls}"
+
+
+def replay(turns, reported_tokens=0, keep_turns=4):
+    async def main():
+        agent = _SimAgent()
+        agent.chat_ctx.add_message("system", "You are the interviewer.", id="instructions")
+        summarizer = CountingSummarizer()
+        manager = ContextManager(agent, core_tokens=100, summarizer=summarizer, budget=1000, keep_turns=keep_turns)
+        for i in range(turns):
+            text = f"Turn {i}: " + "word " * 60
+            agent.chat_ctx.add_message("user" if i % 2 else "assistant", text, id=f"item-{i}")
+            manager.turn_added(text)
+            if manager._compacting:
+                await manager._compacting
+            manager.record_metrics(types.SimpleNamespace(ttft=0.4, input_tokens=reported_tokens))
+        return agent, manager, summarizer
+
+    return asyncio.run(main())
+
+
+def test_reported_tokens_do_not_retrigger_every_turn():
+    # The session reports more than the budget no matter what compaction does
+    agent, manager, summarizer = replay(40, reported_tokens=5000, keep_turns=4)
+    assert manager.compactions <= 40 // 4
+    assert summarizer.calls == manager.compactions
+
+
+def test_instructions_are_kept_and_notes_sent_as_new_items():
+    agent, manager, summarizer = replay(40)
+    ids = [item.id for item in agent.chat_ctx.items]
+    assert manager.compactions >= 2
+    assert "instructions" in ids
+    notes = [i for i in ids if i.startswith(SUMMARY_ID)]
+    # Only the latest notes stay locally, under a round-specific id the session hasn't seen
+    assert notes == [f"{SUMMARY_ID}-{manager.compactions}"]
+    assert len([i for i in ids if i.startswith("item-")]) <= 4 + manager.keep_turns
@@ -0,0 +1,183 @@
+"""GithubService against a local stand-in for the GitHub REST API."""
+
+import asyncio
+import hashlib
+import json
+
+import pytest
+from aiohttp import web
+
+from github_service import GithubError, GithubService, ResponseCache, format_summary
+from shared_cache import SharedCache
+
+REPOS = {
+    "alice": [
+        {"name": "api", "description": "REST API", "language": "Python", "stargazers_count": 12},
+        {"name": "notes", "description": None, "language": None, "stargazers_count": 0},
+    ],
+    "busy": [{"name": f"repo{i}", "language": "Go", "stargazers_count": i} for i in range(8)],
+}
+LANGUAGES = {"api": {"Python": 900, "Shell": 100}}
+READMES = {"api": "# api\nA small REST API."}
+
+
+class StandInGithub:
+    """Serves the three endpoints GithubService uses, with ETags and a rate-limit switch."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.rate_limited = False
+        self.requests = []  # (path, If-None-Match)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.url = None
+        self._runner = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/users/{user}/repos", self.repos)
+        app.router.add_get("/repos/{owner}/{repo}/languages", self.languages)
+        app.router.add_get("/repos/{owner}/{repo}/readme", self.readme)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+    def hits(self, suffix):
+        return sum(1 for path, _ in self.requests if path.endswith(suffix))
+
+    async def _respond(self, request, body, raw=False):
+        self.requests.append((request.path, request.headers.get("If-None-Match")))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            if self.rate_limited:
+                return web.json_response({"message": "API rate limit exceeded"}, status=403)
+            if body is None:
+                return web.json_response({"message": "Not Found"}, status=404)
+            text = body if raw else json.dumps(body)
+            etag = '"' + hashlib.sha1(text.encode()).hexdigest() + '"'
+            if request.headers.get("If-None-Match") == etag:
+                return web.Response(status=304, headers={"ETag": etag})
+            content_type = "text/plain" if raw else "application/json"
+            return web.Response(text=text, content_type=content_type, headers={"ETag": etag})
+        finally:
+            self.in_flight -= 1
+
+    async def repos(self, request):
+        return await self._respond(request, REPOS.get(request.match_info["user"]))
+
+    async def languages(self, request):
+        return await self._respond(request, LANGUAGES.get(request.match_info["repo"], {}))
+
+    async def readme(self, request):
+        return await self._respond(request, READMES.get(request.match_info["repo"]), raw=True)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(SharedCache(str(tmp_path / "cache.sqlite3")))
+
+
+def run(test, cache, delay=0.0, **service_args):
+    async def main():
+        server = await StandInGithub(delay=delay).start()
+        service = GithubService(base_url=server.url, token="", cache=cache, **service_args)
+        try:
+            return await test(server, service)
+        finally:
+            await service.close()
+            await server.stop()
+    return asyncio.run(main())
+
+
+def test_fetch_and_fresh_cache_hit(cache):
+    async def test(server, service):
+        first = await service.fetch_summary("alice")
+        requests = len(server.requests)
+        second = await service.fetch_summary("alice")
+        return first, second, requests, len(server.requests), service.stats
+
+    first, second, requests, total, stats = run(test, cache)
+    assert "1. api (Python) - REST API [12 stars]" in first
+    assert "Languages: Python 90%, Shell 10%" in first
+    assert "README: # api A small REST API." in first
+    assert "2. notes (Not specified) - No description [0 stars]" in first
+    assert second == first
+    # One repo list plus languages and README for each of the two repos
+    assert requests == 5
+    assert total == requests
+    assert stats["fresh_hits"] == 5
+
+
+def test_revalidates_with_etag_after_ttl(cache):
+    async def test(server, service):
+        first = await service.fetch_summary("alice")
+        server.requests.clear()
+        second = await service.fetch_summary("alice")
+        return first, second, list(server.requests), service.stats
+
+    first, second, requests, stats = run(test, cache, ttl=0)
+    assert second == first
+    assert requests and all(etag for path, etag in requests if not path.endswith("/notes/readme"))
+    assert stats["not_modified"] == 4
+
+
+def test_unknown_user(cache):
+    async def test(server, service):
+        with pytest.raises(GithubError, match="User not found"):
+            await service.fetch_summary("nobody")
+
+    run(test, cache)
+
+
+def test_rate_limit_serves_stale_cache(cache, tmp_path):
+    async def test(server, service):
+        first = await service.fetch_summary("alice")
+        server.rate_limited = True
+        stale = await service.fetch_summary("alice")
+        cold = GithubService(base_url=server.url, token="", ttl=0,
+                             cache=ResponseCache(SharedCache(str(tmp_path / "cold.sqlite3"))))
+        try:
+            with pytest.raises(GithubError, match="rate limit"):
+                await cold.fetch_summary("alice")
+        finally:
+            await cold.close()
+        return first, stale
+
+    first, stale = run(test, cache, ttl=0)
+    assert stale == first
+
+
+def test_missing_readme_is_cached(cache):
+    async def test(server, service):
+        await service.fetch_profile("alice")
+        await service.fetch_profile("alice")
+        return server.hits("/notes/readme")
+
+    assert run(test, cache) == 1
+
+
+def test_concurrency_bound(cache):
+    async def test(server, service):
+        profile = await service.fetch_profile("busy")
+        return profile, server.max_in_flight
+
+    profile, max_in_flight = run(test, cache, delay=0.02, max_concurrency=2)
+    assert len(profile["repos"]) == 8
+    assert max_in_flight == 2
+
+
+def test_format_summary_matches_profile():
+    profile = {"username": "bob", "repos": [{
+        "name": "x", "language": "Rust", "description": "d", "stars": 1, "languages": {}, "readme": "",
+    }]}
+    assert format_summary(profile) == "GitHub Username: bob\nTop Repositories:\n1. x (Rust) - d [1 stars]"
@@ -0,0 +1,81 @@
+"""GeminiModel's explicit context-cache path, with LocalContextCache and a recording SDK stand-in."""
+
+import asyncio
+import json
+import sys
+import types
+
+import pytest
+
+from prompt_registry import LocalContextCache, registry
+
+
+class RecordingModel:
+    def __init__(self, calls, cached_content=None):
+        self.calls = calls
+        self.cached_content = cached_content
+
+    async def generate_content_async(self, prompt):
+        self.calls.append((self.cached_content, prompt))
+        return types.SimpleNamespace(text=json.dumps({"score": 70}))
+
+
+@pytest.fixture
+def genai(monkeypatch):
+    """Records what GeminiModel sends instead of calling the API."""
+    calls = []
+    module = types.ModuleType("google.generativeai")
+    module.configure = lambda api_key=None: None
+
+    class GenerativeModel(RecordingModel):
+        def __init__(self, model_name):
+            super().__init__(calls)
+
+        @classmethod
+        def from_cached_content(cls, cached_content):
+            return RecordingModel(calls, cached_content)
+
+    module.GenerativeModel = GenerativeModel
+    module.calls = calls
+    google = types.ModuleType("google")
+    google.generativeai = module
+    monkeypatch.setitem(sys.modules, "google", google)
+    monkeypatch.setitem(sys.modules, "google.generativeai", module)
+    return module
+
+
+def test_registered_prefix_is_sent_as_cached_content(genai):
+    import scoring
+
+    cache = LocalContextCache()
+    model = scoring.GeminiModel(model_name="gemini-test", api_key="test", context_cache=cache)
+
+    async def main():
+        first = await scoring.score_answer(model, "topic", "What is a hash map?", "Key value pairs, O(1) lookups.")
+        second = await scoring.score_answer(model, "topic", "What is a heap?", "A tree with the heap property.")
+        return first, second
+
+    assert asyncio.run(main()) == (70, 70)
+    # Phase templates are registered on first use
+    template = registry.get("scoring.answer.topic")
+    assert cache.stats == {"uploads": 1, "hits": 1, "prefix_tokens_saved": template.prefix_tokens}
+    assert len(genai.calls) == 2
+    for handle, remainder in genai.calls:
+        # Only the dynamic part goes over the wire; the prefix lives in the cache
+        assert handle is not None
+        assert handle.name == f"cachedContents/local-{template.name}-{template.version}"
+        assert handle.system_instruction == template.prefix
+        assert not remainder.startswith(template.prefix)
+    assert "What is a hash map?" in genai.calls[0][1]
+
+
+def test_small_prefix_is_sent_inline(genai):
+    import scoring
+
+    cache = LocalContextCache(min_tokens=10 ** 6)
+    model = scoring.GeminiModel(model_name="gemini-test", api_key="test", context_cache=cache)
+    assert asyncio.run(scoring.score_answer(model, "topic", "Q?", "An answer.")) == 70
+    handle, prompt = genai.calls[0]
+    assert handle is None
+    assert prompt.startswith(registry.get("scoring.answer.topic").prefix)
+    assert cache.stats["uploads"] == 0
@@ -0,0 +1,166 @@
+"""Static complexity estimate and efficiency scoring for bank questions."""
+
+import inspect
+
+import pytest
+
+from question_bank import (QUESTIONS, QuestionBank, apply_efficiency_baseline, complexity_label,
+                           estimate_complexity, reference_complexity)
+
+
+@pytest.mark.parametrize("question", QUESTIONS, ids=[q["id"] for q in QUESTIONS])
+def test_reference_solutions_match_declared_rank(question):
+    solve, _ = question["reference"]
+    # References of design questions drive n calls, which adds one loop level
+    calls = 1 if question["unit"].startswith("per ") else 0
+    assert estimate_complexity(inspect.getsource(solve)) == question["rank"] + calls
+
+
+JS_SOLUTIONS = {
+    "sliding_window": ("""class RateLimiter {
+  constructor(limit, windowMs) { this.limit = limit; this.windowMs = windowMs; this.log = []; }
+  allow(t) {
+    while (this.log.length && this.log[0] <= t - this.windowMs) this.log.shift();
+    if (this.log.length < this.limit) { this.log.push(t); return true; }
+    return false;
+  }
+}""", 0),
+    "debounce": ("""function debounce(func, wait) {
+  let timer;
+  return function(...args) {
+    clearTimeout(timer);
+    timer = setTimeout(() => func.apply(this, args), wait);
+  };
+}""", 0),
+    "lru": ("""class LRUCache {
+  constructor(capacity) { this.capacity = capacity; this.map = new Map(); }
+  get(key) {
+    if (!this.map.has(key)) return -1;
+    const value = this.map.get(key);
+    this.map.delete(key);
+    this.map.set(key, value);
+    return value;
+  }
+  put(key, value) {
+    this.map.delete(key);
+    this.map.set(key, value);
+    if (this.map.size > this.capacity) this.map.delete(this.map.keys().next().value);
+  }
+}""", 0),
+    "nested_loops": ("""function twoSum(nums, target) {
+  for (let i = 0; i < nums.length; i++) {
+    for (let j = i + 1; j < nums.length; j++) {
+      if (nums[i] + nums[j] === target) return [i, j];
+    }
+  }
+}""", 2),
+    "braceless_nested": ("""function f(a) {
+  let c = 0;
+  for (let i = 0; i < a.length; i++)
+    for (let j = 0; j < a.length; j++)
+      c += a[i] * a[j];
+  return c;
+}""", 2),
+    "allman": ("""function f(a)
+{
+  for (let i = 0; i < a.length; i++)
+  {
+    for (let j = 0; j < a.length; j++)
+    {
+      c++;
+    }
+  }
+}""", 2),
+    "do_while": ("""function f(a) {
+  let i = 0;
+  do {
+    i++;
+  } while (i < a.length);
+}""", 1),
+    "scan_in_callback": ("""function dedupe(a) {
+  const out = [];
+  a.forEach(x => { if (!out.includes(x)) out.push(x); });
+  return out;
+}""", 2),
+    "binary_search": ("""function search(a, x) {
+  let lo = 0, hi = a.length - 1;
+  while (lo <= hi) {
+    const mid = (lo + hi) >> 1;
+    if (a[mid] === x) return mid;
+    if (a[mid] < x) lo = mid + 1; else hi = mid - 1;
+  }
+  return -1;
+}""", 0.5),
+    "bfs": ("""function findByClass(root, cls) {
+  const out = [], queue = [root];
+  while (queue.length) {
+    const node = queue.shift();
+    if (node.classList.contains(cls)) out.push(node);
+    for (const child of node.children) queue.push(child);
+  }
+  return out;
+}""", 1),
+    "sort_then_scan": ("""function merge(intervals) {
+  intervals.sort((a, b) => a[0] - b[0]);
+  const out = [];
+  for (const x of intervals) { out.push(x); }
+  return out;
+}""", 1.5),
+}
+
+
+@pytest.mark.parametrize("name", JS_SOLUTIONS)
+def test_candidate_style_solutions(name):
+    code, rank = JS_SOLUTIONS[name]
+    assert estimate_complexity(code) == rank
+
+
+@pytest.mark.parametrize("code", [
+    "function fib(n) {\n  if (n < 2) return n;\n  return fib(n - 1) + fib(n - 2);\n}",
+    "const fib = n => n < 2 ? n : fib(n - 1) + fib(n - 2);",
+    "def fib(n):\n    return n if n < 2 else fib(n - 1) + fib(n - 2)",
+])
+def test_recursion_is_not_estimated(code):
+    assert estimate_complexity(code) is None
+
+
+def analysis(efficiency=90, overall=80):
+    return {"overallScore": overall, "efficiency": {"score": efficiency, "feedback": "model"}}
+
+
+@pytest.fixture
+def bank():
+    return QuestionBank(baselines={})
+
+
+def test_estimate_overrides_per_input_questions(bank):
+    code, _ = JS_SOLUTIONS["nested_loops"]
+    result = apply_efficiency_baseline(analysis(), "dsa-two-sum", code, bank=bank)
+    assert result["efficiency"]["score"] == 55
+    assert result["overallScore"] == 71
+    assert complexity_label(2) in result["efficiency"]["feedback"]
+
+
+@pytest.mark.parametrize("question_id, code", [
+    # Design questions: the model scored against the declared O(1) per call
+    ("be-rate-limiter", JS_SOLUTIONS["sliding_window"][0]),
+    ("dsa-lru-cache", JS_SOLUTIONS["lru"][0]),
+    # Recursion can't be estimated from loops
+    ("dsa-two-sum", "function f(a, i) { return i >= a.length ? [] : f(a, i + 1) }"),
+])
+def test_model_score_stands_when_estimate_is_unreliable(bank, question_id, code):
+    assert apply_efficiency_baseline(analysis(), question_id, code, bank=bank) == analysis()
+
+
+def test_reference_complexity_for_prompt(bank):
+    assert reference_complexity("be-rate-limiter", bank=bank) == "O(1) per request (amortized)"
+    assert reference_complexity("unknown", bank=bank) is None
+    assert reference_complexity(None, bank=bank) is None
+
+
+def test_analysis_prompt_carries_reference():
+    import scoring
+
+    prompt = scoring.code_analysis_prompt("Two Sum", "desc", "code", "O(n) elements")
+    assert "REFERENCE COMPLEXITY: O(n) elements" in prompt
+    assert "REFERENCE COMPLEXITY: not given" in scoring.code_analysis_prompt("Custom", "desc", "code")
@@ -0,0 +1,75 @@
+"""rescore.run against the deterministic local model."""
+
+import asyncio
+import json
+
+import scoring
+from rescore import load_completed, run
+
+
+def session(i):
+    return {
+        "session_id": f"s{i}",
+        "candidate": f"c{i}",
+        "interview_type": "backend",
+        "ended_at": 1000.0 + i,
+        "resume": "Backend engineer. Experience: Python, Postgres, Redis.",
+        "github": "GitHub Username: c\nTop Repositories:\n1. api (Python) - REST API [3 stars]",
+        "conversation": [
+            {"role": "agent", "content": "How would you cache this endpoint?", "phase": "topic"},
+            {"role": "user", "content": "Redis with a TTL and invalidation on writes.", "phase": "topic"},
+        ],
+        "code_submissions": [],
+    }
+
+
+def write_transcripts(path, count):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            f.write(json.dumps(session(i)) + "\n")
+
+
+def test_resumes_after_interruption(tmp_path):
+    transcripts = tmp_path / "sessions.jsonl"
+    output = tmp_path / "rescored.jsonl"
+    write_transcripts(transcripts, 5)
+    # A previous run scored s0, failed s1 and died while writing s2
+    partial = '{"session_id": "s2", "status": "o'
+    output.write_text(json.dumps({"session_id": "s0", "status": "ok"}) + "\n"
+                      + json.dumps({"session_id": "s1", "status": "error"}) + "\n"
+                      + partial, encoding="utf-8")
+
+    # Enough latency that the elapsed time dominates rounding in the stats
+    model = scoring.LocalModel(latency=0.02)
+    stats = asyncio.run(run([str(transcripts)], str(output), model, concurrency=2, rps=0))
+    assert (stats["scored"], stats["failed"], stats["skipped"]) == (4, 0, 1)
+    # Throughput counts the sessions scored in this run, not the skipped ones
+    assert abs(stats["records_per_second"] * stats["seconds"] - 4) < 0.2
+    assert stats["model_requests"] == model.calls > 0
+
+    lines = output.read_text(encoding="utf-8").splitlines()
+    # The partial line is left alone and new rows start on a fresh line
+    assert lines[2] == partial
+    rows = [json.loads(line) for line in lines[3:]]
+    assert sorted(row["session_id"] for row in rows) == ["s1", "s2", "s3", "s4"]
+    assert all(row["status"] == "ok" and "topic_score" in row for row in rows)
+    assert load_completed(str(output)) == {"s0", "s1", "s2", "s3", "s4"}
+
+    # A rerun has nothing left to do
+    again = scoring.LocalModel()
+    stats = asyncio.run(run([str(transcripts)], str(output), again, rps=0))
+    assert (stats["scored"], stats["skipped"], again.calls) == (0, 5, 0)
+
+
+def test_limit_counts_only_new_sessions(tmp_path):
+    transcripts = tmp_path / "sessions.jsonl"
+    output = tmp_path / "rescored.jsonl"
+    write_transcripts(transcripts, 6)
+    output.write_text(json.dumps({"session_id": "s0", "status": "ok"}) + "\n", encoding="utf-8")
+
+    stats = asyncio.run(run([str(transcripts)], str(output), scoring.LocalModel(), rps=0,
+                            kinds=("resume",), limit=2))
+    assert (stats["scored"], stats["skipped"]) == (2, 1)
+    rows = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()[1:]]
+    assert [sorted(row) for row in rows][0] == sorted(
+        ["session_id", "candidate", "interview_type", "ended_at", "resume_score", "status", "scored_at"])
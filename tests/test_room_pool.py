@@ -0,0 +1,112 @@
+"""RoomPool against LocalRoomService, and the warm-room queue rule the token server applies."""
+
+import time
+
+import pytest
+
+from admission import ADMITTED, QUEUED, AdmissionController
+from room_pool import LocalRoomService, RoomPool, take_warm_room
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def make(**kwargs):
+        kwargs.setdefault("types", ["backend"])
+        kwargs.setdefault("size", 2)
+        # Maintenance is driven by the tests
+        pool = RoomPool(LocalRoomService(), maintain_interval=3600, **kwargs)
+        pools.append(pool)
+        pool.start()
+        return pool
+
+    yield make
+    for pool in pools:
+        wait_for(lambda: not any(pool._pending.values()))
+        pool.stop()
+
+
+def settled(pool, interview_type="backend"):
+    return pool._pending[interview_type] == 0
+
+
+def test_acquire_hands_out_warm_rooms_and_refills(make_pool):
+    pool = make_pool()
+    wait_for(lambda: pool.available("backend") == 2)
+    room = pool.acquire("backend")
+    assert room.startswith("backend-interview-")
+    assert room in pool.service.rooms and room in pool.service.dispatched
+    wait_for(lambda: pool.available("backend") == 2)
+    assert pool.acquire("backend") != room
+    assert pool.acquire("frontend") is None
+    wait_for(lambda: pool.available("backend") == 2)
+
+
+def test_refused_refill_is_retried_by_maintain(make_pool):
+    allowed = [False]
+    pool = make_pool(can_provision=lambda room_name: allowed[0])
+    wait_for(lambda: settled(pool))
+    assert pool.available("backend") == 0
+    assert pool.acquire("backend") is None
+    wait_for(lambda: settled(pool))
+
+    allowed[0] = True
+    pool.maintain()
+    wait_for(lambda: pool.available("backend") == 2)
+
+
+def test_maintain_retires_idle_rooms(make_pool):
+    clock = Clock()
+    pool = make_pool(max_idle=600, clock=clock)
+    wait_for(lambda: pool.available("backend") == 2)
+    assert pool.maintain() == []
+
+    clock.now += 601
+    retired = pool.maintain()
+    assert len(retired) == 2
+    wait_for(lambda: set(retired) <= set(pool.service.deleted))
+    # Fresh rooms replace the retired ones
+    wait_for(lambda: pool.available("backend") == 2)
+    assert not set(retired) & set(pool.service.rooms)
+
+
+def test_warm_room_never_jumps_the_queue(make_pool):
+    clock = Clock()
+    workers = [{"worker_id": "w0", "max_rooms": 2, "active_rooms": 0, "rooms": [],
+                "loop_lag_ms": 0, "cpu_percent": 0}]
+    admission = AdmissionController(read_workers=lambda: workers, clock=clock)
+    # As in token_server: warm rooms only take slots admission control reports free
+    pool = make_pool(size=1, can_provision=admission.reserve)
+    wait_for(lambda: pool.available("backend") == 1)
+
+    assert admission.decide("backend-interview-a").status == ADMITTED
+    queued = admission.decide("backend-interview-b")
+    assert queued.status == QUEUED
+
+    # A fresh arrival may not take the warm room while someone is queued
+    assert take_warm_room(pool, admission, "backend") is None
+    assert pool.available("backend") == 1
+    # The queued candidate gets it and leaves the queue
+    room = take_warm_room(pool, admission, "backend", queued.ticket)
+    assert room in pool.service.rooms
+    assert not admission.is_queued(queued.ticket)
+    # No slot is free, so the refill is refused rather than overbooking the worker
+    wait_for(lambda: settled(pool))
+    assert pool.available("backend") == 0
@@ -0,0 +1,46 @@
+"""Local tier decisions in scoring_cascade.py."""
+
+import pytest
+
+from scoring_cascade import CASCADE_CONFIDENCE, local_answer_score, local_github_score, local_transcript_score
+
+
+@pytest.mark.parametrize("answer", ["I don't know", "no idea.", "Pass", "   "])
+def test_non_answers_are_scored_locally(answer):
+    assert local_answer_score(answer) == (10, 0.9)
+
+
+@pytest.mark.parametrize("answer", ["Binary search tree.", "Use a hashmap", "O(log n)", "Sure, go ahead", "No", "no."])
+def test_short_answers_are_escalated(answer):
+    score, confidence = local_answer_score(answer)
+    assert confidence < CASCADE_CONFIDENCE
+
+
+def test_unknown_language_is_not_counted():
+    summary = "\n".join([
+        "GitHub Username: bob",
+        "Top Repositories:",
+        "1. a (Not specified) - d [0 stars]",
+        "2. b (Not specified) - d [0 stars]",
+        "3. c (Python) - d [0 stars]",
+    ])
+    known = summary.replace("(Not specified)", "(Python)")
+    assert local_github_score(summary) == local_github_score(known)
+
+
+def test_terse_phase_is_escalated():
+    messages = [
+        {"role": "agent", "content": "Lookup cost in a balanced BST?"},
+        {"role": "user", "content": "O(log n)"},
+        {"role": "agent", "content": "How would you dedupe a stream?"},
+        {"role": "user", "content": "Use a hashmap"},
+        {"role": "agent", "content": "Is a hash map ordered?"},
+        {"role": "user", "content": "No"},
+    ]
+    score, confidence = local_transcript_score(messages)
+    assert confidence < CASCADE_CONFIDENCE
+
+
+def test_silent_phase_is_scored_locally():
+    messages = [{"role": "agent", "content": "Tell me about your project."}, {"role": "user", "content": ""}]
+    assert local_transcript_score(messages) == (5, 0.95)
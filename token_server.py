@@ -3,14 +3,39 @@ from livekit import api
 import json
 import os
 from dotenv import load_dotenv
+from admission import AdmissionController, RateLimiter, ADMITTED, QUEUED
+from room_pool import RoomPool, LiveKitRoomService, new_room_name, take_warm_room
+from history_store import HistoryStore
+from question_bank import get_question_bank, public_question
+from log_sink import log, log_sink
 
 load_dotenv()
 
 LIVEKIT_URL = os.environ.get("LIVEKIT_URL")
 LIVEKIT_API_KEY = os.environ.get("LIVEKIT_API_KEY")
 LIVEKIT_API_SECRET = os.environ.get("LIVEKIT_API_SECRET")
+# Upper bound on rows returned by /history/candidate
+HISTORY_MAX_LIMIT = 500
+
+admission = AdmissionController()
+rate_limiter = RateLimiter()
+# Warm rooms only take worker slots that admission control says are free
+room_pool = RoomPool(LiveKitRoomService(LIVEKIT_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET),
+                     can_provision=admission.reserve)
+history_store = None
+
+
+def get_history_store():
+    global history_store
+    if history_store is None:
+        history_store = HistoryStore()
+    return history_store
 
 class TokenHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        # The default access log writes to stderr synchronously on every request
+        log("HTTP", format % args, client=self.client_address[0])
+
     def do_OPTIONS(self):
         self.send_response(200)
         self.send_header('Access-Control-Allow-Origin', '*')
@@ -18,13 +43,53 @@ class TokenHandler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         self.end_headers()
 
+    def send_json(self, status, body, retry_after=None):
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        if retry_after is not None:
+            self.send_header('Retry-After', str(int(retry_after + 0.999)))
+        self.end_headers()
+        self.wfile.write(json.dumps(body).encode())
+
     def do_GET(self):
+        if self.path.startswith('/capacity'):
+            stats = admission.stats()
+            stats["warm_rooms"] = {t: room_pool.available(t) for t in room_pool.types}
+            stats["log_sink"] = log_sink.stats()
+            self.send_json(200, stats)
+            return
+
+        if self.path.startswith('/history/'):
+            self.handle_history()
+            return
+
+        if self.path.startswith('/questions/'):
+            self.handle_questions()
+            return
+
         if self.path.startswith('/getToken'):
             try:
-                
                 from urllib.parse import urlparse, parse_qs
                 query_components = parse_qs(urlparse(self.path).query)
                 interview_type = query_components.get('type', ['default'])[0]
+                ticket = query_components.get('ticket', [None])[0]
+
+                # Queued clients poll at the pace we tell them to; only fresh arrivals are rate limited
+                client_id = self.client_address[0]
+                if not (ticket and admission.is_queued(ticket)):
+                    allowed, retry_after = rate_limiter.allow(client_id)
+                    if not allowed:
+                        log("TOKEN_SERVER", f"Rate limited client {client_id}")
+                        body = {
+                            "status": "rate_limited",
+                            "error": "Too many requests, please slow down",
+                            "retryAfter": round(retry_after, 1)
+                        }
+                        if ticket:
+                            body["ticket"] = ticket
+                        self.send_json(429, body, retry_after=retry_after)
+                        return
 
                 # Validate interview type
                 VALID_TYPES = [
@@ -33,7 +98,7 @@ class TokenHandler(BaseHTTPRequestHandler):
                 ]
                 
                 if interview_type not in VALID_TYPES:
-                    print(f"[TOKEN_SERVER] Invalid type '{interview_type}', defaulting to 'default'")
+                    log("TOKEN_SERVER", f"Invalid type '{interview_type}', defaulting to 'default'")
                     interview_type = "default"
 
                 
@@ -45,12 +110,31 @@ class TokenHandler(BaseHTTPRequestHandler):
                 participant_identity = f"user-{session_id}"
                 participant_name = "Candidate"
 
-                metadata = json.dumps({"type": interview_type})
+                participant_metadata = {"type": interview_type}
+                candidate = query_components.get('candidate', [None])[0]
+                if candidate:
+                    # Lets the interview history group sessions by candidate
+                    participant_metadata["candidate"] = candidate[:128]
+                metadata = json.dumps(participant_metadata)
                 
-                # Unique room name for each session
-                room_name = f"{interview_type}-interview-{session_id}"
-                
-                print(f"[TOKEN_SERVER] New session: {room_name}")
+                # Prefer a warm room whose agent is already connected and waiting,
+                # but never to someone who would jump the queue
+                room_name = take_warm_room(room_pool, admission, interview_type, ticket)
+                if room_name:
+                    log("TOKEN_SERVER", f"Using warm room: {room_name}")
+                else:
+                    # Unique room name for each session
+                    room_name = new_room_name(interview_type)
+
+                    # Only hand out a room when an agent worker can actually pick it up
+                    decision = admission.decide(room_name, ticket=ticket)
+                    if decision.status != ADMITTED:
+                        status_code = 202 if decision.status == QUEUED else 503
+                        log("TOKEN_SERVER", f"Session {decision.status}: {decision.to_dict()}")
+                        self.send_json(status_code, decision.to_dict(), retry_after=decision.retry_after)
+                        return
+
+                log("TOKEN_SERVER", f"New session: {room_name}")
 
                 token.with_identity(participant_identity) \
                     .with_name(participant_name) \
@@ -68,6 +152,7 @@ class TokenHandler(BaseHTTPRequestHandler):
                 self.end_headers()
                 
                 response = {
+                    "status": ADMITTED,
                     "token": jwt_token,
                     "url": LIVEKIT_URL,
                     "identity": participant_identity,
@@ -75,11 +160,11 @@ class TokenHandler(BaseHTTPRequestHandler):
                     "room": room_name
                 }
                 
-                print(f"[TOKEN_SERVER] Returning URL: {LIVEKIT_URL}")
-                print(f"[TOKEN_SERVER] Room: {room_name}")
+                log("TOKEN_SERVER", f"Returning URL: {LIVEKIT_URL}")
+                log("TOKEN_SERVER", f"Room: {room_name}")
                 self.wfile.write(json.dumps(response).encode())
             except Exception as e:
-                print(f"Error generating token: {str(e)}")
+                log("TOKEN_SERVER", f"Error generating token: {str(e)}", level="error")
                 self.send_response(500)
                 self.send_header('Content-type', 'application/json')
                 self.send_header('Access-Control-Allow-Origin', '*')
@@ -87,10 +172,67 @@ class TokenHandler(BaseHTTPRequestHandler):
                 error_response = {"error": str(e)}
                 self.wfile.write(json.dumps(error_response).encode())
 
+    def handle_history(self):
+        from urllib.parse import urlparse, parse_qs
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        try:
+            since = float(query["since"]) if "since" in query else None
+            until = float(query["until"]) if "until" in query else None
+            store = get_history_store()
+
+            if url.path == '/history/averages':
+                result = store.averages_by_type(phase=query.get("phase"), since=since, until=until)
+            elif url.path == '/history/percentiles':
+                if "type" not in query or "phase" not in query:
+                    self.send_json(400, {"error": "type and phase are required"})
+                    return
+                pcts = tuple(int(p) for p in query.get("p", "50,90,99").split(","))
+                result = store.percentiles(query["type"], query["phase"], pcts, since=since, until=until)
+            elif url.path == '/history/candidate':
+                if "id" not in query:
+                    self.send_json(400, {"error": "id is required"})
+                    return
+                try:
+                    limit = int(query.get("limit", 50))
+                except ValueError:
+                    self.send_json(400, {"error": "limit must be an integer"})
+                    return
+                result = store.candidate_history(query["id"], limit=max(1, min(limit, HISTORY_MAX_LIMIT)))
+            else:
+                self.send_json(404, {"error": "Unknown history query"})
+                return
+            self.send_json(200, result)
+        except ValueError as e:
+            self.send_json(400, {"error": str(e)})
+        except Exception as e:
+            log("TOKEN_SERVER", f"History query error: {e}", level="error")
+            self.send_json(500, {"error": str(e)})
+
+    def handle_questions(self):
+        from urllib.parse import urlparse, parse_qs
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        bank = get_question_bank()
+        if url.path == '/questions/index':
+            self.send_json(200, bank.index())
+        elif url.path == '/questions/next':
+            # Without a candidate id, fall back to the client address so repeats are still avoided
+            candidate = query.get("candidate") or self.client_address[0]
+            question = bank.sample(candidate[:128], query.get("track", "default"),
+                                   difficulty=query.get("difficulty"), tag=query.get("tag"))
+            if question is None:
+                self.send_json(404, {"error": "No question matches"})
+                return
+            self.send_json(200, public_question(question))
+        else:
+            self.send_json(404, {"error": "Unknown question query"})
+
 def run(server_class=HTTPServer, handler_class=TokenHandler, port=3000):
     server_address = ('', port)
     httpd = server_class(server_address, handler_class)
     print(f'Token server running on port {port}')
+    room_pool.start()
     httpd.serve_forever()
 
 if __name__ == '__main__':
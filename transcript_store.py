@@ -0,0 +1,48 @@
+"""
+On-disk archive of finished interview sessions.
+
+Each session is appended as one JSON line to TRANSCRIPT_DIR/YYYY-MM-DD.jsonl
+when the agent shuts down. The record holds everything needed to re-score the
+interview offline (see rescore.py): documents, the conversation with phase
+tags, and code submissions.
+"""
+
+import glob
+import json
+import os
+import time
+
+TRANSCRIPT_DIR = os.environ.get("TRANSCRIPT_DIR", "transcripts")
+
+
+def save_session(record, directory=TRANSCRIPT_DIR):
+    """Append a session record to today's transcript file."""
+    os.makedirs(directory, exist_ok=True)
+    record = dict(record)
+    record.setdefault("ended_at", time.time())
+    path = os.path.join(directory, time.strftime("%Y-%m-%d", time.gmtime(record["ended_at"])) + ".jsonl")
+    # One write per record so concurrent agent processes don't interleave lines
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return path
+
+
+def iter_sessions(paths):
+    """Stream session records from JSONL files or directories of them."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.jsonl"))))
+        else:
+            files.append(path)
+
+    for path in files:
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    print(f"[TRANSCRIPTS] Skipping malformed line {path}:{line_number}")
@@ -0,0 +1,158 @@
+"""
+Local worker load registry shared by agent processes and the token server.
+
+Every agent process writes a small JSON heartbeat file describing its load
+(active rooms, event-loop lag, CPU). The token server reads the directory to
+decide whether a new session can be admitted.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+REGISTRY_DIR = os.environ.get(
+    "WORKER_REGISTRY_DIR",
+    os.path.join(tempfile.gettempdir(), "practerviews-workers"),
+)
+HEARTBEAT_INTERVAL = float(os.environ.get("WORKER_HEARTBEAT_INTERVAL", "2"))
+# Heartbeats older than this are treated as dead workers
+HEARTBEAT_TTL = float(os.environ.get("WORKER_HEARTBEAT_TTL", "10"))
+# One job runs per agent process by default
+WORKER_MAX_ROOMS = int(os.environ.get("WORKER_MAX_ROOMS", "1"))
+
+
+def write_report(report, registry_dir=REGISTRY_DIR):
+    """Atomically write a worker heartbeat so readers never see a partial file."""
+    os.makedirs(registry_dir, exist_ok=True)
+    path = os.path.join(registry_dir, f"{report['worker_id']}.json")
+    fd, tmp_path = tempfile.mkstemp(dir=registry_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(report, f)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def remove_report(worker_id, registry_dir=REGISTRY_DIR):
+    try:
+        os.remove(os.path.join(registry_dir, f"{worker_id}.json"))
+    except FileNotFoundError:
+        pass
+
+
+def read_workers(registry_dir=REGISTRY_DIR, max_age=HEARTBEAT_TTL, now=None):
+    """Return the reports of all workers whose heartbeat is still fresh."""
+    now = time.time() if now is None else now
+    workers = []
+    try:
+        names = os.listdir(registry_dir)
+    except FileNotFoundError:
+        return workers
+
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(registry_dir, name)) as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            # File vanished or is being replaced; skip it this round
+            continue
+        if now - report.get("updated_at", 0) <= max_age:
+            workers.append(report)
+    return workers
+
+
+class LoadReporter:
+    """Publishes this process's load to the registry from a daemon thread."""
+
+    def __init__(self, registry_dir=REGISTRY_DIR, max_rooms=WORKER_MAX_ROOMS,
+                 interval=HEARTBEAT_INTERVAL):
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.registry_dir = registry_dir
+        self.max_rooms = max_rooms
+        self.interval = interval
+        self.rooms = set()
+        self.loop_lag_ms = 0.0
+        self.cpu_percent = 0.0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        """Start heartbeating. Safe to call more than once."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="load-reporter", daemon=True)
+        self._thread.start()
+        print(f"[REGISTRY] Worker {self.worker_id} reporting load to {self.registry_dir}")
+
+    def stop(self):
+        self._stopped.set()
+        remove_report(self.worker_id, self.registry_dir)
+
+    def room_started(self, room_name):
+        with self._lock:
+            self.rooms.add(room_name)
+        self.publish()
+
+    def room_ended(self, room_name):
+        with self._lock:
+            self.rooms.discard(room_name)
+        self.publish()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "worker_id": self.worker_id,
+                "pid": os.getpid(),
+                "max_rooms": self.max_rooms,
+                "active_rooms": len(self.rooms),
+                "rooms": sorted(self.rooms),
+                "loop_lag_ms": round(self.loop_lag_ms, 2),
+                "cpu_percent": round(self.cpu_percent, 1),
+                "updated_at": time.time(),
+            }
+
+    def publish(self):
+        try:
+            write_report(self.snapshot(), self.registry_dir)
+        except OSError as e:
+            print(f"[REGISTRY] Failed to write heartbeat: {e}")
+
+    async def monitor_loop_lag(self, interval=0.5):
+        """Measure event-loop lag as the overshoot of a short sleep.
+
+        Runs inside the job's event loop until cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            lag_ms = max(0.0, (loop.time() - started - interval) * 1000)
+            # Smooth so a single slow tick does not flap admission decisions
+            self.loop_lag_ms = 0.7 * self.loop_lag_ms + 0.3 * lag_ms
+
+    def _run(self):
+        last_wall = time.monotonic()
+        last_cpu = time.process_time()
+        while not self._stopped.is_set():
+            now_wall = time.monotonic()
+            now_cpu = time.process_time()
+            elapsed = now_wall - last_wall
+            if elapsed > 0:
+                self.cpu_percent = (now_cpu - last_cpu) / elapsed * 100
+            last_wall, last_cpu = now_wall, now_cpu
+            self.publish()
+            self._stopped.wait(self.interval)
+
+
+# Process-wide reporter used by agent.py
+load_reporter = LoadReporter()